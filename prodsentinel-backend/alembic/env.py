@@ -11,6 +11,7 @@ from logging.config import fileConfig
 from app.models.base import Base
 from app.models.raw_signal import RawSignal
 from app.models.incident import Incident, AnalysisResult  # Import new models
+from app.models.metric_rollup import MetricRollup
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
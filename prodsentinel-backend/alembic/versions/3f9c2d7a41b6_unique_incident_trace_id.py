@@ -0,0 +1,75 @@
+"""Make incidents.trace_id unique for atomic upserts
+
+Revision ID: 3f9c2d7a41b6
+Revises: 81b044fb1a12
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7a41b6'
+down_revision: Union[str, Sequence[str], None] = '81b044fb1a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent select-then-insert could create several incidents for one
+    # trace. Fold them into the earliest one before enforcing uniqueness.
+    op.execute("""
+        CREATE TEMPORARY TABLE incident_merge ON COMMIT DROP AS
+        SELECT i.id AS duplicate_id, k.id AS keep_id
+        FROM incidents i
+        JOIN (
+            SELECT DISTINCT ON (trace_id) id, trace_id
+            FROM incidents
+            ORDER BY trace_id, detected_at, id
+        ) k ON k.trace_id = i.trace_id
+        WHERE i.id <> k.id
+    """)
+    op.execute("""
+        UPDATE incidents k
+        SET error_count = agg.error_count,
+            severity = agg.severity,
+            affected_services = agg.affected_services
+        FROM (
+            SELECT i.trace_id,
+                   sum(i.error_count) AS error_count,
+                   max(i.severity) AS severity,
+                   ARRAY(
+                       SELECT DISTINCT s
+                       FROM incidents i2, unnest(i2.affected_services) s
+                       WHERE i2.trace_id = i.trace_id
+                   ) AS affected_services
+            FROM incidents i
+            WHERE i.trace_id IN (
+                SELECT trace_id FROM incidents
+                WHERE id IN (SELECT duplicate_id FROM incident_merge)
+            )
+            GROUP BY i.trace_id
+        ) agg
+        WHERE k.trace_id = agg.trace_id
+          AND k.id IN (SELECT keep_id FROM incident_merge)
+    """)
+    op.execute("""
+        UPDATE analysis_results a
+        SET incident_id = m.keep_id
+        FROM incident_merge m
+        WHERE a.incident_id = m.duplicate_id
+    """)
+    op.execute("DELETE FROM incidents WHERE id IN (SELECT duplicate_id FROM incident_merge)")
+
+    op.drop_index(op.f('ix_incidents_trace_id'), table_name='incidents')
+    op.create_index(op.f('ix_incidents_trace_id'), 'incidents', ['trace_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_incidents_trace_id'), table_name='incidents')
+    op.create_index(op.f('ix_incidents_trace_id'), 'incidents', ['trace_id'], unique=False)
@@ -0,0 +1,60 @@
+"""Convert raw_signals.payload to JSONB and index filtered payload fields
+
+Revision ID: 5b2e8c1d9f47
+Revises: 3f9c2d7a41b6
+Create Date: 2026-10-17 11:04:19.552130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8c1d9f47'
+down_revision: Union[str, Sequence[str], None] = '3f9c2d7a41b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Expressions must match what query_service generates for the filters
+PAYLOAD_INDEXES = {
+    'ix_raw_signals_payload_level': "(payload ->> 'level')",
+    'ix_raw_signals_payload_error_code': "((payload -> 'attributes') ->> 'error_code')",
+    'ix_raw_signals_payload_order_id': "((payload -> 'attributes') ->> 'order_id')",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rewrites the table once; JSONB is stored pre-parsed from here on
+    op.alter_column(
+        'raw_signals', 'payload',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using='payload::jsonb',
+    )
+    # Partial: most signals carry none of these keys, so they stay out of the
+    # index. Equality filters on the expression imply IS NOT NULL, so the
+    # planner can still use them.
+    for name, expression in PAYLOAD_INDEXES.items():
+        op.execute(
+            f"CREATE INDEX {name} ON raw_signals ({expression}) "
+            f"WHERE {expression} IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in PAYLOAD_INDEXES:
+        op.drop_index(name, table_name='raw_signals')
+    op.alter_column(
+        'raw_signals', 'payload',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='payload::json',
+    )
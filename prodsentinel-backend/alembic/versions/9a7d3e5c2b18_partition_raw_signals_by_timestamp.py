@@ -0,0 +1,137 @@
+"""Range-partition raw_signals by timestamp
+
+Revision ID: 9a7d3e5c2b18
+Revises: 5b2e8c1d9f47
+Create Date: 2026-10-17 13:27:51.804417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7d3e5c2b18'
+down_revision: Union[str, Sequence[str], None] = '5b2e8c1d9f47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMN_INDEXES = ['signal_type', 'trace_id', 'service_name', 'timestamp']
+
+PAYLOAD_INDEXES = {
+    'ix_raw_signals_payload_level': "(payload ->> 'level')",
+    'ix_raw_signals_payload_error_code': "((payload -> 'attributes') ->> 'error_code')",
+    'ix_raw_signals_payload_order_id': "((payload -> 'attributes') ->> 'order_id')",
+}
+
+
+def _drop_indexes(table: str) -> None:
+    for column in COLUMN_INDEXES:
+        op.drop_index(f'ix_raw_signals_{column}', table_name=table)
+    for name in PAYLOAD_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def _create_indexes() -> None:
+    # Created on the parent, so every partition (present and future) gets them
+    for column in COLUMN_INDEXES:
+        op.create_index(f'ix_raw_signals_{column}', 'raw_signals', [column], unique=False)
+    for name, expression in PAYLOAD_INDEXES.items():
+        op.execute(
+            f"CREATE INDEX {name} ON raw_signals ({expression}) "
+            f"WHERE {expression} IS NOT NULL"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Names are reused by the partitioned table
+    op.rename_table('raw_signals', 'raw_signals_unpartitioned')
+    op.execute(
+        "ALTER TABLE raw_signals_unpartitioned "
+        "RENAME CONSTRAINT raw_signals_pkey TO raw_signals_unpartitioned_pkey"
+    )
+    _drop_indexes('raw_signals_unpartitioned')
+
+    # The partition key must be part of the primary key
+    op.execute("""
+        CREATE TABLE raw_signals (
+            id UUID NOT NULL,
+            signal_type signaltypeenum,
+            trace_id VARCHAR,
+            service_name VARCHAR,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+            payload JSONB NOT NULL,
+            CONSTRAINT raw_signals_pkey PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+
+    # Daily partitions for every day that holds data plus the next three;
+    # the backend's partition maintainer takes over from here (and adds
+    # hourly partitions if RAW_SIGNALS_PARTITION_INTERVAL=hour)
+    op.execute("""
+        DO $$
+        DECLARE
+            day date;
+        BEGIN
+            FOR day IN
+                SELECT DISTINCT (timestamp AT TIME ZONE 'UTC')::date
+                FROM raw_signals_unpartitioned
+                WHERE timestamp IS NOT NULL
+                UNION
+                SELECT (now() AT TIME ZONE 'UTC')::date + offset_days
+                FROM generate_series(0, 3) AS offset_days
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF raw_signals FOR VALUES FROM (%L) TO (%L)',
+                    'raw_signals_p' || to_char(day, 'YYYYMMDD'),
+                    day::timestamp AT TIME ZONE 'UTC',
+                    (day + 1)::timestamp AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE raw_signals_default PARTITION OF raw_signals DEFAULT")
+
+    op.execute("""
+        INSERT INTO raw_signals (id, signal_type, trace_id, service_name, timestamp, payload)
+        SELECT id, signal_type, trace_id, service_name, COALESCE(timestamp, now()), payload
+        FROM raw_signals_unpartitioned
+    """)
+    op.drop_table('raw_signals_unpartitioned')
+
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows of partitions detached by retention are not brought back
+    op.rename_table('raw_signals', 'raw_signals_partitioned')
+    op.execute(
+        "ALTER TABLE raw_signals_partitioned "
+        "RENAME CONSTRAINT raw_signals_pkey TO raw_signals_partitioned_pkey"
+    )
+    _drop_indexes('raw_signals_partitioned')
+
+    op.execute("""
+        CREATE TABLE raw_signals (
+            id UUID NOT NULL,
+            signal_type signaltypeenum,
+            trace_id VARCHAR,
+            service_name VARCHAR,
+            timestamp TIMESTAMP WITH TIME ZONE,
+            payload JSONB NOT NULL,
+            CONSTRAINT raw_signals_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO raw_signals (id, signal_type, trace_id, service_name, timestamp, payload)
+        SELECT DISTINCT ON (id) id, signal_type, trace_id, service_name, timestamp, payload
+        FROM raw_signals_partitioned
+        ORDER BY id, timestamp
+    """)
+    op.drop_table('raw_signals_partitioned')
+
+    _create_indexes()
@@ -0,0 +1,41 @@
+"""create metric_rollups table
+
+Revision ID: c4e1f7a92d30
+Revises: 9a7d3e5c2b18
+Create Date: 2026-10-17 15:02:36.118924
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1f7a92d30'
+down_revision: Union[str, Sequence[str], None] = '9a7d3e5c2b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The primary key doubles as the index for series range scans
+    op.create_table('metric_rollups',
+    sa.Column('resolution', sa.String(), nullable=False),
+    sa.Column('service_name', sa.String(), nullable=False),
+    sa.Column('metric_name', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('sum', sa.Float(), nullable=False),
+    sa.Column('min', sa.Float(), nullable=False),
+    sa.Column('max', sa.Float(), nullable=False),
+    sa.Column('sketch', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.PrimaryKeyConstraint('resolution', 'service_name', 'metric_name', 'bucket_start')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('metric_rollups')
@@ -0,0 +1,57 @@
+"""Drop column-duplicated fields from raw_signals.payload
+
+Revision ID: d8a2f6b31e57
+Revises: c4e1f7a92d30
+Create Date: 2026-10-17 12:02:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a2f6b31e57'
+down_revision: Union[str, Sequence[str], None] = 'c4e1f7a92d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same set as app.schemas.common.COLUMN_FIELDS
+COLUMN_FIELDS = "ARRAY['signal_id', 'trace_id', 'service_name', 'timestamp', 'signal_type']"
+
+
+def _partitions():
+    """raw_signals partitions (default included), so each UPDATE stays one partition wide."""
+    rows = op.get_bind().exec_driver_sql(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'raw_signals'::regclass ORDER BY c.relname"
+    )
+    return [name for name, in rows]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows already compact (inserted by new code during a rolling deploy) are skipped.
+    # The old row versions are only reclaimed by VACUUM (FULL to shrink the files).
+    for partition in _partitions():
+        op.execute(
+            f"UPDATE {partition} SET payload = payload - {COLUMN_FIELDS} "
+            f"WHERE payload ?| {COLUMN_FIELDS}"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Timestamps come back in the `model_dump(mode='json')` UTC format
+    for partition in _partitions():
+        op.execute(f"""
+            UPDATE {partition} SET payload = jsonb_build_object(
+                'signal_id', id::text,
+                'trace_id', trace_id,
+                'service_name', service_name,
+                'timestamp', to_char(timestamp AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
+                'signal_type', signal_type::text
+            ) || payload
+            WHERE NOT payload ? 'signal_id'
+        """)
@@ -0,0 +1,31 @@
+"""Composite indexes for keyset pagination
+
+Revision ID: e3b7c9a15d42
+Revises: d8a2f6b31e57
+Create Date: 2026-10-17 13:26:08.415937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7c9a15d42'
+down_revision: Union[str, Sequence[str], None] = 'd8a2f6b31e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # `(ts, id) < (:ts, :id) ORDER BY ts DESC, id DESC` is a backward range
+    # scan of these. Created on the parent, so every partition gets it.
+    op.create_index('ix_raw_signals_timestamp_id', 'raw_signals', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_incidents_detected_at_id', 'incidents', ['detected_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_incidents_detected_at_id', table_name='incidents')
+    op.drop_index('ix_raw_signals_timestamp_id', table_name='raw_signals')
@@ -0,0 +1,53 @@
+"""Replace single-column raw_signals indexes with composites per query shape
+
+Revision ID: f1c4a8e27b93
+Revises: e3b7c9a15d42
+Create Date: 2026-10-17 14:08:37.562190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c4a8e27b93'
+down_revision: Union[str, Sequence[str], None] = 'e3b7c9a15d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Query shape -> index. Plain ascending columns: btrees are scanned backwards
+# for the DESC orders, and row comparisons of keyset pages need the columns
+# in one direction.
+COMPOSITE_INDEXES = {
+    # get_trace_signals, pipeline _analyze_trace_async: trace ordered by time
+    'ix_raw_signals_trace_id_timestamp': ('raw_signals', ['trace_id', 'timestamp']),
+    # /query/signals?service_name=: newest first, keyset on (timestamp, id)
+    'ix_raw_signals_service_name_timestamp_id': ('raw_signals', ['service_name', 'timestamp', 'id']),
+    # /query/incidents?status= / ?severity=: newest first, keyset on (detected_at, id)
+    'ix_incidents_status_detected_at_id': ('incidents', ['status', 'detected_at', 'id']),
+    'ix_incidents_severity_detected_at_id': ('incidents', ['severity', 'detected_at', 'id']),
+}
+
+# Superseded by the composites above, or by ix_raw_signals_timestamp_id for
+# timestamp; signal_type has three values and is never selective enough.
+# Every insert into raw_signals paid for all four.
+REDUNDANT_INDEXES = ['signal_type', 'trace_id', 'service_name', 'timestamp']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On the partitioned parent, so every partition (present and future) gets them
+    for name, (table, columns) in COMPOSITE_INDEXES.items():
+        op.create_index(name, table, columns, unique=False)
+    for column in REDUNDANT_INDEXES:
+        op.drop_index(f'ix_raw_signals_{column}', table_name='raw_signals')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in REDUNDANT_INDEXES:
+        op.create_index(f'ix_raw_signals_{column}', 'raw_signals', [column], unique=False)
+    for name, (table, columns) in COMPOSITE_INDEXES.items():
+        op.drop_index(name, table_name=table)
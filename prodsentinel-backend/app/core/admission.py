@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Dict, Iterable
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.common import BaseSignal
+
+logger = get_logger(__name__)
+
+HIGH = "high"
+LOW = "low"
+
+HIGH_PRIORITY_LEVELS = frozenset({"ERROR", "CRITICAL", "FATAL"})
+
+# Half-life of the pool wait average once no new samples arrive, so a
+# shedding controller sees the pool recover even while it admits nothing
+_POOL_WAIT_HALF_LIFE_SECONDS = 1.0
+_POOL_WAIT_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; surfaced as `429 Too Many Requests`."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"ingest overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def signal_priority(signals: Iterable[BaseSignal]) -> str:
+    """HIGH if any signal is an ERROR/CRITICAL log or an errored span, else LOW."""
+    for signal in signals:
+        level = getattr(signal, "level", None) or getattr(signal, "status", None)
+        if level and level.upper() in HIGH_PRIORITY_LEVELS:
+            return HIGH
+    return LOW
+
+
+class AdmissionController:
+    """
+    Bounded admission for database-bound ingest work.
+
+    At most `max_in_flight` requests hold a database session at once; up to
+    `max_queue` more wait briefly (`queue_timeout_ms`) for a slot, and
+    everything beyond that is rejected immediately so clients back off
+    instead of piling up behind the connection pool.
+
+    High-priority work (ERROR/CRITICAL signals) is favoured in two ways:
+    low-priority requests may only use `low_priority_share` of the slots,
+    and while the average connection-pool wait exceeds `pool_wait_shed_ms`
+    low-priority requests are shed outright. Queued high-priority requests
+    are always woken first.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout_ms: int,
+        low_priority_share: float,
+        pool_wait_shed_ms: float,
+        retry_after_seconds: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_in_flight = max_in_flight
+        self.low_priority_limit = max(1, int(max_in_flight * low_priority_share))
+        self.max_queue = max_queue
+        self.queue_timeout_ms = queue_timeout_ms
+        self.pool_wait_shed_ms = pool_wait_shed_ms
+        self.retry_after_seconds = retry_after_seconds
+        self._clock = clock
+
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {HIGH: deque(), LOW: deque()}
+        self._pool_wait_ms = 0.0
+        self._pool_wait_at = clock()
+
+        self.admitted = {HIGH: 0, LOW: 0}
+        self.shed: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def admit(self, priority: str = LOW):
+        """
+        Hold an ingest slot for the duration of the block.
+
+        Raises:
+            AdmissionRejected: If the request is shed.
+        """
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def checkout(self, db: AsyncSession):
+        """Check out the session's connection, recording how long the pool made us wait."""
+        started = time.perf_counter()
+        await db.connection()
+        self.record_pool_wait((time.perf_counter() - started) * 1000)
+
+    def record_pool_wait(self, wait_ms: float):
+        self._pool_wait_ms = self.pool_wait_ms() * (1 - _POOL_WAIT_ALPHA) + wait_ms * _POOL_WAIT_ALPHA
+        self._pool_wait_at = self._clock()
+
+    def pool_wait_ms(self) -> float:
+        """Moving average of connection-pool wait, decayed since the last sample."""
+        idle = self._clock() - self._pool_wait_at
+        return self._pool_wait_ms * 0.5 ** (idle / _POOL_WAIT_HALF_LIFE_SECONDS)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters[HIGH]) + len(self._waiters[LOW])
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "low_priority_limit": self.low_priority_limit,
+            "queued": {HIGH: len(self._waiters[HIGH]), LOW: len(self._waiters[LOW])},
+            "max_queue": self.max_queue,
+            "pool_wait_ms": round(self.pool_wait_ms(), 2),
+            "pool_wait_shed_ms": self.pool_wait_shed_ms,
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+        }
+
+    def _limit(self, priority: str) -> int:
+        return self.max_in_flight if priority == HIGH else self.low_priority_limit
+
+    def _reject(self, priority: str, reason: str):
+        key = f"{priority}:{reason}"
+        self.shed[key] = self.shed.get(key, 0) + 1
+        logger.warning(
+            f"Shedding {priority}-priority ingest request: {reason} "
+            f"(in_flight={self.in_flight}, queued={self.queued})"
+        )
+        raise AdmissionRejected(reason, self.retry_after_seconds)
+
+    async def _acquire(self, priority: str):
+        if priority == LOW and self.pool_wait_ms() > self.pool_wait_shed_ms:
+            self._reject(priority, "pool_wait")
+
+        # Waiters of equal or higher priority go first
+        ahead = self._waiters[HIGH] if priority == HIGH else self.queued
+        if self.in_flight < self._limit(priority) and not ahead:
+            self.in_flight += 1
+            self.admitted[priority] += 1
+            return
+
+        if self.queued >= self.max_queue:
+            self._reject(priority, "queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout_ms / 1000)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter in self._waiters[priority]:
+                self._waiters[priority].remove(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the wait was abandoned: hand it back
+                self._release()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self._reject(priority, "queue_timeout")
+        self.admitted[priority] += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        for priority in (HIGH, LOW):
+            waiters = self._waiters[priority]
+            while waiters and self.in_flight < self._limit(priority):
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+admission = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout_ms=settings.ADMISSION_QUEUE_TIMEOUT_MS,
+    low_priority_share=settings.ADMISSION_LOW_PRIORITY_SHARE,
+    pool_wait_shed_ms=settings.ADMISSION_POOL_WAIT_SHED_MS,
+    retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -33,6 +34,115 @@ class Settings(BaseSettings):
             return v.replace("ssl_cert_reqs=CERT_NONE", "ssl_cert_reqs=none")
         return v
     
+    REDIS_MAX_CONNECTIONS: int = 20
+    REDIS_POOL_TIMEOUT: int = 5
+    CELERY_BROKER_POOL_LIMIT: int = 10
+    
+    # Analysis trigger dedup (Redis key expiry and local cache)
+    ANALYSIS_DEDUP_TTL_SECONDS: int = 300
+    ANALYSIS_DEDUP_CACHE_SIZE: int = 10000
+    
+    # Triage rules (JSON file, see app/services/triage.py); built-in rules if unset
+    TRIAGE_RULES_PATH: Optional[str] = None
+    
+    # Ingestion
+    # "direct": commit each signal in its request (default)
+    # "buffered": queue in-process and commit in micro-batches
+    # "redis_stream": XADD to a Redis Stream consumed by separate writer processes
+    INGEST_MODE: str = "direct"
+    INGEST_BUFFER_MAX_BATCH: int = 500
+    INGEST_BUFFER_FLUSH_MS: int = 50
+    INGEST_BUFFER_MAX_QUEUE: int = 10000
+    INGEST_BATCH_MAX_ITEMS: int = 1000
+    # redis_stream mode (see app/services/signal_stream.py)
+    INGEST_REDIS_STREAM_KEY: str = "signals:ingest"
+    INGEST_REDIS_STREAM_GROUP: str = "raw-signal-writers"
+    # Backlog beyond which publishing answers 503
+    INGEST_REDIS_STREAM_MAX_LEN: int = 1_000_000
+    INGEST_REDIS_STREAM_BATCH: int = 1000
+    INGEST_REDIS_STREAM_BLOCK_MS: int = 1000
+    # Entries pending this long on another writer are taken over
+    INGEST_REDIS_STREAM_CLAIM_IDLE_MS: int = 60000
+    INGEST_REDIS_STREAM_CLAIM_INTERVAL_SECONDS: float = 15.0
+    # Writer consumer name; host-pid if unset
+    INGEST_REDIS_STREAM_CONSUMER: Optional[str] = None
+    INGEST_REDIS_STREAM_WRITER_METRICS_PORT: int = 0
+    # Cap on the inflated size of a gzip/zstd request body (decompression bomb guard)
+    INGEST_MAX_DECOMPRESSED_BYTES: int = 268_435_456
+    INGEST_STREAM_CHUNK_SIZE: int = 500
+    INGEST_STREAM_MAX_LINE_BYTES: int = 1_048_576
+    INGEST_STREAM_MAX_ERRORS: int = 100
+    
+    # Admission control for database-bound ingest requests (see app/core/admission.py)
+    ADMISSION_MAX_IN_FLIGHT: int = 30
+    ADMISSION_MAX_QUEUE: int = 100
+    ADMISSION_QUEUE_TIMEOUT_MS: int = 2000
+    # Share of in-flight slots INFO/DEBUG work may use; the rest is kept for errors
+    ADMISSION_LOW_PRIORITY_SHARE: float = 0.8
+    # Shed INFO/DEBUG work while the average pool checkout wait exceeds this
+    ADMISSION_POOL_WAIT_SHED_MS: float = 500.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    
+    # Ingest sampling (see app/services/sampling.py): "off", "head" or "tail"
+    SAMPLING_MODE: str = "off"
+    # "<service>:<level>" -> kept fraction, e.g. {"*:INFO": 0.1}; "*" matches any
+    SAMPLING_HEAD_RATES: Dict[str, float] = {}
+    SAMPLING_TAIL_WINDOW_SECONDS: float = 30.0
+    SAMPLING_TAIL_MAX_TRACES: int = 10000
+    
+    # raw_signals range partitioning (see app/services/partitions.py)
+    RAW_SIGNALS_PARTITION_INTERVAL: str = "day"  # "day" or "hour"
+    RAW_SIGNALS_PARTITIONS_AHEAD: int = 3
+    # Partitions older than this are removed; 0 keeps everything
+    RAW_SIGNALS_RETENTION_DAYS: int = 0
+    RAW_SIGNALS_RETENTION_ACTION: str = "drop"  # "drop", "detach" or "archive"
+    RAW_SIGNALS_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    
+    # Local spool for signals while Postgres is unavailable (see app/services/spool.py)
+    SPOOL_ENABLED: bool = True
+    SPOOL_PATH: str = "spool"
+    SPOOL_SEGMENT_MAX_BYTES: int = 67_108_864
+    SPOOL_MAX_BYTES: int = 1_073_741_824
+    # Appends within this window share one fsync
+    SPOOL_FSYNC_MS: int = 5
+    # Writes slower than this are spooled instead; 0 waits for the database
+    SPOOL_DB_TIMEOUT_MS: int = 5000
+    SPOOL_REPLAY_BATCH: int = 1000
+    SPOOL_REPLAY_INTERVAL_SECONDS: float = 5.0
+    
+    # Parquet cold tier (see app/services/archive.py); requires pyarrow
+    ARCHIVE_PATH: str = "archive"
+    ARCHIVE_ROW_GROUP_SIZE: int = 50000
+    
+    # Metric rollups at 1m/1h/1d (see app/services/rollups.py); retention 0 keeps forever
+    METRIC_ROLLUPS_ENABLED: bool = True
+    METRIC_ROLLUP_1M_RETENTION_DAYS: int = 7
+    METRIC_ROLLUP_1H_RETENTION_DAYS: int = 90
+    METRIC_ROLLUP_1D_RETENTION_DAYS: int = 0
+    METRIC_ROLLUP_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    METRIC_SERIES_MAX_POINTS: int = 500
+    
+    # Totals of paginated queries (see app/services/counts.py): exact, estimated or none
+    QUERY_COUNT_DEFAULT: str = "exact"
+    QUERY_COUNT_ESTIMATE_TTL_SECONDS: float = 10.0
+    QUERY_COUNT_ESTIMATE_CACHE_SIZE: int = 1024
+    # Estimates below this are replaced by the exact count
+    QUERY_COUNT_EXACT_BELOW: int = 1000
+    
+    # Versioned cache of incident reads with ETag/304 (see app/services/response_cache.py)
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_MAX_ENTRIES: int = 1024
+    QUERY_CACHE_TTL_SECONDS: float = 300.0
+    # Share cached bodies between replicas through Redis
+    QUERY_CACHE_REDIS: bool = False
+    # Must match the pipeline's, which bumps it after each analysis
+    INCIDENTS_VERSION_KEY: str = "prodsentinel:incidents:version"
+    # Ingest bumps the version at most this often
+    INCIDENTS_VERSION_BUMP_INTERVAL_MS: int = 500
+    
+    # Prometheus exposition on /metrics (see app/core/metrics.py); requires prometheus_client
+    METRICS_ENABLED: bool = True
+    
     class Config:
         env_file = ".env"
 
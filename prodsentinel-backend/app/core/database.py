@@ -3,6 +3,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from .config import settings
 from app.core.logging import get_logger
+from app.core.metrics import instrument_pool
 
 logger = get_logger(__name__)
 
@@ -22,6 +23,8 @@ engine = create_async_engine(
     }
 )
 
+instrument_pool(engine)
+
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
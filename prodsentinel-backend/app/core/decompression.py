@@ -0,0 +1,181 @@
+import json
+import zlib
+from typing import Iterable, Optional
+from fastapi import HTTPException, status
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Largest piece of decompressed body handed to the app per receive() call
+_OUTPUT_CHUNK = 1024 * 1024
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Decompressed body exceeds {limit} bytes",
+    )
+
+
+class _GzipDecoder:
+    def __init__(self, limit: int):
+        self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._limit = limit
+        self._total = 0
+        self._pending = b""
+
+    def feed(self, data: bytes):
+        self._pending = data
+
+    def read(self) -> bytes:
+        """Decompress at most _OUTPUT_CHUNK bytes of the pending input."""
+        try:
+            out = self._zlib.decompress(self._pending, _OUTPUT_CHUNK)
+        except zlib.error as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed gzip body: {exc}")
+        self._pending = self._zlib.unconsumed_tail
+        self._total += len(out)
+        if self._total > self._limit:
+            raise _too_large(self._limit)
+        return out
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def finish(self):
+        if not self._zlib.eof:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Truncated gzip body")
+
+
+class _BoundedSink:
+    """File-like target for zstd's stream_writer that enforces the size cap."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.total = 0
+        self.chunks = []
+
+    def write(self, data: bytes) -> int:
+        self.total += len(data)
+        if self.total > self.limit:
+            raise _too_large(self.limit)
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+class _ZstdDecoder:
+    def __init__(self, limit: int):
+        self._sink = _BoundedSink(limit)
+        # Output is pushed to the sink in write_size pieces as it is produced,
+        # so a bomb is aborted at the cap instead of after full expansion
+        self._writer = zstandard.ZstdDecompressor().stream_writer(
+            self._sink, write_size=_OUTPUT_CHUNK, closefd=False
+        )
+
+    def feed(self, data: bytes):
+        try:
+            self._writer.write(data)
+        except zstandard.ZstdError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed zstd body: {exc}")
+
+    def read(self) -> bytes:
+        out = b"".join(self._sink.chunks)
+        self._sink.chunks.clear()
+        return out
+
+    @property
+    def has_pending(self) -> bool:
+        return False
+
+    def finish(self):
+        pass
+
+
+class RequestDecompressionMiddleware:
+    """
+    ASGI middleware that transparently inflates `Content-Encoding: gzip` or
+    `zstd` request bodies on selected path prefixes.
+
+    Decompression is incremental: the app receives the body as a stream of
+    decompressed pieces, so streaming routes keep flat memory. The total
+    decompressed size is capped to defuse decompression bombs (`413`).
+    Unsupported encodings are rejected with `415`.
+    """
+
+    def __init__(self, app, path_prefixes: Iterable[str], max_decompressed_bytes: int):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.max_decompressed_bytes = max_decompressed_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        encoding: Optional[str] = None
+        for name, value in scope["headers"]:
+            if name == b"content-encoding":
+                encoding = value.decode("latin-1").strip().lower()
+
+        if encoding in (None, "", "identity"):
+            await self.app(scope, receive, send)
+            return
+
+        if encoding == "gzip":
+            decoder = _GzipDecoder(self.max_decompressed_bytes)
+        elif encoding == "zstd" and zstandard is not None:
+            decoder = _ZstdDecoder(self.max_decompressed_bytes)
+        else:
+            await self._reject_encoding(encoding, send)
+            return
+
+        # Downstream sees a plain body of unknown length
+        scope = dict(scope, headers=[
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ])
+        upstream_more = True
+        body_done = False
+
+        async def receive_decompressed():
+            nonlocal upstream_more, body_done
+            if body_done:
+                return await receive()
+
+            if not decoder.has_pending:
+                message = await receive()
+                if message["type"] != "http.request":
+                    return message
+                decoder.feed(message.get("body", b""))
+                upstream_more = message.get("more_body", False)
+
+            out = decoder.read()
+            more_body = decoder.has_pending or upstream_more
+            if not more_body:
+                decoder.finish()
+                body_done = True
+            return {"type": "http.request", "body": out, "more_body": more_body}
+
+        await self.app(scope, receive_decompressed, send)
+
+    async def _reject_encoding(self, encoding: str, send):
+        logger.warning(f"Rejected request with unsupported Content-Encoding: {encoding}")
+        supported = "gzip, zstd" if zstandard is not None else "gzip"
+        body = json.dumps(
+            {"detail": f"Unsupported Content-Encoding '{encoding}' (supported: {supported})"}
+        ).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
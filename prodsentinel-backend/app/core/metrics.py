@@ -0,0 +1,198 @@
+"""
+Prometheus metrics for the ingestion API, exposed on `/metrics`.
+
+Everything here is on the hot path, so it is kept to what prometheus_client
+does per observation (a lock and a few float adds): request latency is
+labelled by route template rather than raw path, and the pool gauges are
+updated from SQLAlchemy checkout/checkin events instead of being polled.
+
+With several worker processes (uvicorn --workers, gunicorn), set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers; each
+one then writes its samples there and `/metrics` on any worker reports the
+sum. Without prometheus_client installed every metric is a no-op.
+"""
+import os
+import time
+from contextlib import nullcontext
+from typing import Tuple
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # optional dependency
+    prometheus_client = None
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Statement-level timings sit well below the request buckets
+_DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, amount):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def time(self):
+        return nullcontext()
+
+
+def _metric(kind: str, name: str, documentation: str, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+HTTP_REQUEST_SECONDS = _metric(
+    "Histogram", "prodsentinel_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+INGEST_DB_SECONDS = _metric(
+    "Histogram", "prodsentinel_ingest_db_duration_seconds",
+    "Database time of one ingest write, by statement",
+    ("statement",), buckets=_DB_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = _metric(
+    "Gauge", "prodsentinel_db_pool_checked_out",
+    "SQLAlchemy pool connections currently checked out",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = _metric(
+    "Gauge", "prodsentinel_db_pool_overflow",
+    "SQLAlchemy pool connections open beyond pool_size (negative while the pool is filling)",
+    multiprocess_mode="livesum",
+)
+ANALYSIS_TRIGGERS = _metric(
+    "Counter", "prodsentinel_analysis_triggers_total",
+    "Analysis triggers by outcome: queued, dedup_local and dedup_redis (dedup hits), failed",
+    ("outcome",),
+)
+QUERY_CACHE_REQUESTS = _metric(
+    "Counter", "prodsentinel_query_cache_requests_total",
+    "Cached incident reads by outcome: not_modified (304), hit_local, hit_redis, miss, bypass (Redis down)",
+    ("outcome",),
+)
+
+STREAM_LAG = _metric(
+    "Gauge", "prodsentinel_ingest_stream_lag",
+    "Ingest stream entries not yet delivered to a writer (INGEST_MODE=redis_stream)",
+    multiprocess_mode="max",
+)
+STREAM_PENDING = _metric(
+    "Gauge", "prodsentinel_ingest_stream_pending",
+    "Ingest stream entries delivered to a writer but not yet stored",
+    multiprocess_mode="max",
+)
+STREAM_ENTRIES = _metric(
+    "Counter", "prodsentinel_ingest_stream_entries_total",
+    "Ingest stream entries handled by writers: written, dead (moved to the dead-letter stream)",
+    ("outcome",),
+)
+STREAM_WRITE_SECONDS = _metric(
+    "Histogram", "prodsentinel_ingest_stream_write_duration_seconds",
+    "Time to store one batch of ingest stream entries",
+    buckets=_DB_BUCKETS,
+)
+
+
+def available() -> bool:
+    return prometheus_client is not None
+
+
+def instrument_pool(engine):
+    """Keep the pool gauges current from `engine`'s checkout/checkin events."""
+    if prometheus_client is None:
+        return
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not hasattr(sync_engine.pool, "checkedout"):
+        return  # NullPool and friends keep no counts
+
+    def on_checkout(*args):
+        pool = sync_engine.pool
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(pool.overflow())
+
+    def on_checkin(*args):
+        # Fires before the pool takes the connection back: it still counts
+        # as checked out, and is discarded (overflow drops) if the queue is full
+        pool = sync_engine.pool
+        DB_POOL_CHECKED_OUT.set(pool.checkedout() - 1)
+        DB_POOL_OVERFLOW.set(pool.overflow() - (pool.checkedin() >= pool.size()))
+
+    event.listen(sync_engine, "checkout", on_checkout)
+    event.listen(sync_engine, "checkin", on_checkin)
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition body and content type for every metric of every worker."""
+    if MULTIPROCESS:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def start_http_server(port: int):
+    """Serve `/metrics` from a background thread, for processes without the API (stream writers)."""
+    if prometheus_client is not None:
+        registry = prometheus_client.REGISTRY
+        if MULTIPROCESS:
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        prometheus_client.start_http_server(port, registry=registry)
+
+
+def mark_process_dead():
+    """Drop this worker's live gauges from the multiprocess totals."""
+    if prometheus_client is not None and MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording HTTP_REQUEST_SECONDS.
+
+    The route label is the matched path template (`/query/traces/{trace_id}`),
+    read from the scope after routing, so label cardinality stays bounded;
+    requests that match no route share `unmatched`. Must sit inside any
+    middleware that copies the scope, so it sees the router's update.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path_format", None) or "unmatched",
+                str(status_code),
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,83 @@
+import redis.asyncio as aioredis
+from celery import Celery
+from typing import Optional
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Long-lived clients shared by every request; created on application startup
+_redis_pool: Optional[aioredis.BlockingConnectionPool] = None
+_redis: Optional[aioredis.Redis] = None
+_celery: Optional[Celery] = None
+
+
+def init_task_queue():
+    """Create the shared Redis connection pool and Celery producer."""
+    global _redis_pool, _redis, _celery
+
+    if _redis is None:
+        # Blocking pool: callers wait briefly for a free connection instead
+        # of opening one per request or failing outright at the limit
+        _redis_pool = aioredis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            decode_responses=True,
+        )
+        _redis = aioredis.Redis(connection_pool=_redis_pool)
+
+    if _celery is None:
+        # Producer only: never consumes, so no result backend or task imports
+        _celery = Celery(broker=settings.REDIS_URL)
+        _celery.conf.broker_pool_limit = settings.CELERY_BROKER_POOL_LIMIT
+        _celery.conf.broker_connection_retry_on_startup = True
+
+    logger.info(
+        f"Task queue clients ready: redis max_connections={settings.REDIS_MAX_CONNECTIONS}, "
+        f"celery broker_pool_limit={settings.CELERY_BROKER_POOL_LIMIT}"
+    )
+
+
+async def close_task_queue():
+    """Release pooled connections on application shutdown."""
+    global _redis_pool, _redis, _celery
+
+    if _redis is not None:
+        await _redis.aclose()
+        await _redis_pool.disconnect()
+        _redis, _redis_pool = None, None
+
+    if _celery is not None:
+        _celery.close()
+        _celery = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Shared async Redis client (initialised lazily outside the app lifecycle)."""
+    if _redis is None:
+        init_task_queue()
+    return _redis
+
+
+def get_celery() -> Celery:
+    """Shared Celery producer (initialised lazily outside the app lifecycle)."""
+    if _celery is None:
+        init_task_queue()
+    return _celery
+
+
+def pool_stats() -> dict:
+    """Connection reuse statistics of the shared Redis pool."""
+    if _redis_pool is None:
+        return {"initialized": False}
+
+    available = len(_redis_pool._available_connections)
+    in_use = len(_redis_pool._in_use_connections)
+    return {
+        "initialized": True,
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "created_connections": available + in_use,
+        "in_use_connections": in_use,
+        "available_connections": available,
+    }
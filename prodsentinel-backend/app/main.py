@@ -1,5 +1,5 @@
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 # from app.routers import ingest  # Moved to bottom with query router
 from app.core.logging import setup_logging, get_logger
@@ -10,9 +10,16 @@ setup_logging(log_level=settings.LOG_LEVEL)
 logger = get_logger(__name__)
 
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.decompression import RequestDecompressionMiddleware
+from app.core.admission import AdmissionRejected
+from app.core import metrics
 
 app = FastAPI(title="ProdSentinel Ingestion API")
 
+# Innermost, so it sees the route the router matched
+if settings.METRICS_ENABLED and metrics.available():
+    app.add_middleware(metrics.RequestMetricsMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +29,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Accept gzip/zstd compressed ingest bodies
+app.add_middleware(
+    RequestDecompressionMiddleware,
+    path_prefixes=["/ingest", "/v1"],
+    max_decompressed_bytes=settings.INGEST_MAX_DECOMPRESSED_BYTES,
+)
+
 
 
 # Exception handlers
@@ -38,6 +52,16 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Shed overloaded ingest requests fast so clients back off and retry."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected errors with proper logging."""
@@ -60,15 +84,65 @@ async def startup_event():
         extra={"app_name": settings.APP_NAME, "environment": settings.APP_ENV},
     )
 
+    from app.core.task_queue import init_task_queue
+    init_task_queue()
+
+    from app.services.spool import spool
+    await spool.start()
+
+    if settings.INGEST_MODE == "buffered":
+        from app.services.write_buffer import write_buffer
+        await write_buffer.start()
+
+    from app.services.partitions import partition_maintainer
+    await partition_maintainer.start()
+
+    if settings.METRIC_ROLLUPS_ENABLED:
+        from app.services.rollups import rollup_maintainer
+        await rollup_maintainer.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Log application shutdown."""
+    """Flush buffered signals and log application shutdown."""
+    from app.services.rollups import rollup_maintainer
+    await rollup_maintainer.stop()
+
+    from app.services.partitions import partition_maintainer
+    await partition_maintainer.stop()
+
+    from app.services.write_buffer import write_buffer
+    await write_buffer.stop()
+
+    # After the write buffer, whose last flush may still spool
+    from app.services.spool import spool
+    await spool.stop()
+
+    from app.core.task_queue import close_task_queue
+    await close_task_queue()
+
+    metrics.mark_process_dead()
+
     logger.info(f"Shutting down {settings.APP_NAME}")
 
 
-from app.routers import ingest, query
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus exposition of the ingestion metrics."""
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": "Not Found"})
+    if not metrics.available():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "prometheus_client is not installed"},
+        )
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+from app.routers import ingest, otlp, query
 
 app.include_router(ingest.router)
+app.include_router(otlp.router)
 app.include_router(query.router)
 
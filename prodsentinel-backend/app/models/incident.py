@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, Float, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, DateTime, Text, Float, Enum as SQLEnum, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.sql import func
 from .base import Base
@@ -27,7 +27,7 @@ class Incident(Base):
     __tablename__ = "incidents"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    trace_id = Column(String, index=True, nullable=False)
+    trace_id = Column(String, index=True, unique=True, nullable=False)
     status = Column(SQLEnum(IncidentStatus), default=IncidentStatus.OPEN)
     severity = Column(SQLEnum(IncidentSeverity), default=IncidentSeverity.MEDIUM)
     detected_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -35,6 +35,17 @@ class Incident(Base):
     affected_services = Column(ARRAY(String), nullable=False)
     error_count = Column(Float, default=1)
 
+    __table_args__ = (
+        # Keyset pagination order of /query/incidents (scanned backwards),
+        # alone and under the status / severity filters; each covers the
+        # other filter, so totals under both are index-only
+        Index("ix_incidents_detected_at_id", detected_at, id),
+        Index("ix_incidents_status_detected_at_id", status, detected_at, id,
+              postgresql_include=["severity"]),
+        Index("ix_incidents_severity_detected_at_id", severity, detected_at, id,
+              postgresql_include=["status"]),
+    )
+
 
 class AnalysisResult(Base):
     """
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime, Float, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
+from .base import Base
+
+
+class MetricRollup(Base):
+    """
+    Pre-aggregated metric samples per (service_name, metric_name) and time
+    bucket, at several resolutions (see app/services/rollups.py).
+    """
+    __tablename__ = "metric_rollups"
+
+    resolution = Column(String, primary_key=True)  # "1m", "1h" or "1d"
+    service_name = Column(String, primary_key=True)
+    metric_name = Column(String, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    count = Column(BigInteger, nullable=False)
+    sum = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+    # LogBucketSketch buckets ({key: count}) for quantile estimates
+    sketch = Column(JSONB, nullable=False)
@@ -1,7 +1,7 @@
 from sqlalchemy import (
-    Column, String, DateTime, Enum, JSON
+    Column, String, DateTime, Enum, Index, literal_column
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from .base import Base
 import enum
 
@@ -12,6 +12,36 @@ class SignalTypeEnum(str, enum.Enum):
     metric = "metric"
 
 
+# Filterable payload fields (see query_service.get_signals)
+PAYLOAD_FILTER_PATHS = {
+    "level": ("level",),
+    "error_code": ("attributes", "error_code"),
+    "order_id": ("attributes", "order_id"),
+}
+
+
+def payload_field(payload, *path: str):
+    """
+    `payload -> 'a' ->> 'b'` for a path of literal keys.
+
+    Keys are rendered inline rather than bound so the expression matches the
+    expression indexes under prepared (generic) plans too.
+    """
+    expr = payload
+    for key in path[:-1]:
+        expr = expr.op("->")(literal_column(f"'{key}'"))
+    return expr.op("->>", return_type=String)(literal_column(f"'{path[-1]}'"))
+
+
+def _payload_indexes(payload) -> tuple:
+    # Partial, as most signals do not carry these fields
+    indexes = []
+    for name, path in PAYLOAD_FILTER_PATHS.items():
+        expr = payload_field(payload, *path)
+        indexes.append(Index(f"ix_raw_signals_payload_{name}", expr, postgresql_where=expr.isnot(None)))
+    return tuple(indexes)
+
+
 class RawSignal(Base):
     """
     Immutable raw signal store.
@@ -19,9 +49,23 @@ class RawSignal(Base):
     """
     __tablename__ = "raw_signals"
 
+    # Range-partitioned on timestamp (app/services/partitions.py), which
+    # therefore has to be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True)
-    signal_type = Column(Enum(SignalTypeEnum), index=True)
-    trace_id = Column(String, index=True)
-    service_name = Column(String, index=True)
-    timestamp = Column(DateTime(timezone=True), index=True)
-    payload = Column(JSON, nullable=False)
+    signal_type = Column(Enum(SignalTypeEnum))
+    trace_id = Column(String)
+    service_name = Column(String)
+    timestamp = Column(DateTime(timezone=True), primary_key=True)
+    payload = Column(JSONB, nullable=False)
+
+    # One composite per query shape (migration f1c4a8e27b93); the DESC
+    # orders scan them backwards
+    __table_args__ = _payload_indexes(payload) + (
+        # Keyset pagination order of /query/signals
+        Index("ix_raw_signals_timestamp_id", timestamp, id),
+        # A trace ordered by time (trace view, analysis)
+        Index("ix_raw_signals_trace_id_timestamp", trace_id, timestamp),
+        # One service, newest first
+        Index("ix_raw_signals_service_name_timestamp_id", service_name, timestamp, id),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
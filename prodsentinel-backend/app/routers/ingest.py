@@ -1,17 +1,92 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from functools import partial
+from typing import Any, List
+import json
 from app.schemas.signals import LogSignalV1
-from app.services.ingestion_service import ingest_signal
+from app.services.ingestion_service import (
+    ingest_signal, ingest_signals_batch, signal_payload, trigger_dedup_stats,
+)
+from app.services.sampling import sampler
+from app.services.partitions import partition_maintainer
+from app.services.rollups import rollup_maintainer
+from app.services.spool import spool, db_unavailable
+from app.services.signal_stream import publisher, publish_or_write, StreamFull
+from app.services.response_cache import response_cache, incidents_version
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.admission import admission, signal_priority, AdmissionRejected, LOW
+from app.core.task_queue import pool_stats
 from app.core.logging import get_logger
-from app.schemas.signals import LogSignalV1, TraceSpanV1, MetricSampleV1
+from app.schemas.signals import LogSignalV1, TraceSpanV1, MetricSampleV1, parse_signal
+from app.schemas.ingest import BatchIngestResponse, StreamIngestResponse
+from app.services.write_buffer import write_buffer, WriteBufferFull
+from app.schemas.common import BaseSignal
+from app.utils.ndjson import iter_ndjson_lines
 from fastapi.responses import JSONResponse
+from redis.exceptions import RedisError
 
 router = APIRouter(prefix="/ingest", tags=["ingest"])
 logger = get_logger(__name__)
 
 
+async def _store_signal(signal: BaseSignal, db: AsyncSession):
+    """
+    Persist a single signal according to INGEST_MODE.
+
+    The signal first passes the ingest sampler: it may be sampled out (still
+    acknowledged), held for tail sampling, or released together with held
+    signals of the same trace.
+
+    In buffered mode the signal is only queued; the write buffer commits it
+    shortly after the 202 response has been sent. In redis_stream mode it is
+    added to the ingest stream for the writer processes. In direct mode the
+    write goes through admission control and may be shed with `429`; if
+    Postgres is unavailable it is spooled to disk instead.
+    """
+    signals = sampler.sample([signal])
+    if not signals:
+        return
+
+    if settings.INGEST_MODE == "buffered":
+        try:
+            for sampled in signals:
+                write_buffer.enqueue(sampled)
+        except WriteBufferFull as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(exc),
+                headers={"Retry-After": "1"},
+            )
+        return
+
+    async def write():
+        async with admission.admit(signal_priority(signals)):
+            await admission.checkout(db)
+            if len(signals) > 1:
+                await ingest_signals_batch(db=db, signals=signals)
+                return
+            await ingest_signal(
+                db=db,
+                signal_id=signal.signal_id,
+                signal_type=signal.signal_type.value,
+                trace_id=signal.trace_id,
+                service_name=signal.service_name,
+                timestamp=signal.timestamp,
+                payload=signal_payload(signal),
+            )
+
+    try:
+        await publish_or_write(signals, write)
+    except (StreamFull, RedisError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"ingest stream unavailable: {exc}",
+            headers={"Retry-After": "1"},
+        )
+
+
 @router.post("/logs", status_code=status.HTTP_202_ACCEPTED)
 async def ingest_log(
     signal: LogSignalV1,
@@ -34,15 +109,7 @@ async def ingest_log(
     )
     
     try:
-        await ingest_signal(
-            db=db,
-            signal_id=signal.signal_id,
-            signal_type=signal.signal_type.value,
-            trace_id=signal.trace_id,
-            service_name=signal.service_name,
-            timestamp=signal.timestamp,
-            payload=signal.model_dump(mode='json'),
-        )
+        await _store_signal(signal, db)
         
         logger.info(f"Log signal accepted: signal_id={signal.signal_id}")
         return {"status": "accepted"}
@@ -64,15 +131,7 @@ async def ingest_trace(
     )
     
     try:
-        await ingest_signal(
-            db=db,
-            signal_id=signal.signal_id,
-            signal_type=signal.signal_type.value,
-            trace_id=signal.trace_id,
-            service_name=signal.service_name,
-            timestamp=signal.timestamp,
-            payload=signal.model_dump(mode='json'),
-        )
+        await _store_signal(signal, db)
         
         logger.info(f"Trace span accepted: signal_id={signal.signal_id}")
         return {"status": "accepted"}
@@ -94,15 +153,7 @@ async def ingest_metric(
     )
     
     try:
-        await ingest_signal(
-            db=db,
-            signal_id=signal.signal_id,
-            signal_type=signal.signal_type.value,
-            trace_id=signal.trace_id,
-            service_name=signal.service_name,
-            timestamp=signal.timestamp,
-            payload=signal.model_dump(mode='json'),
-        )
+        await _store_signal(signal, db)
         
         logger.info(f"Metric accepted: signal_id={signal.signal_id}")
         return {"status": "accepted"}
@@ -111,6 +162,247 @@ async def ingest_metric(
         logger.error(f"Failed to ingest metric: {exc}", exc_info=True)
         raise
 
+@router.post(
+    "/batch",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BatchIngestResponse,
+)
+async def ingest_batch(
+    items: List[Any] = Body(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ingest a mixed array of logs, trace spans and metrics in one request.
+
+    Each item is validated against the schema named by its `signal_type`.
+    Valid items are written with one multi-row insert; the response reports
+    a per-item status so clients can resend only what was not accepted:
+
+    - `accepted`: stored (or already stored under the same signal_id),
+      spooled to disk while Postgres is unavailable, or queued on the
+      ingest stream in redis_stream mode
+    - `rejected`: invalid item, or refused by the database on its own; do
+      not retry as-is
+    - `failed`: valid item that could not be stored, safe to retry
+
+    If the database refuses the batch for reasons other than availability,
+    its signals are stored one by one so only the offending ones are
+    rejected.
+    """
+    if len(items) > settings.INGEST_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.INGEST_BATCH_MAX_ITEMS} items",
+        )
+
+    logger.info(f"Received signal batch: {len(items)} items")
+
+    results = []
+    valid = []
+    seen_ids = set()
+    for index, item in enumerate(items):
+        try:
+            signal = parse_signal(item)
+        except ValueError as exc:
+            results.append({"index": index, "status": "rejected", "error": str(exc)})
+            continue
+
+        # Stored at most once either way; skipping keeps the insert smaller
+        if signal.signal_id not in seen_ids:
+            seen_ids.add(signal.signal_id)
+            valid.append(signal)
+        results.append({"index": index, "signal_id": signal.signal_id, "status": "accepted"})
+
+    sampled = sampler.sample(valid)
+
+    async def write(signals: List[BaseSignal]):
+        async with admission.admit(signal_priority(signals)):
+            await admission.checkout(db)
+            await ingest_signals_batch(db=db, signals=signals)
+
+    # signal_id -> (status, error) for signals that were not stored
+    outcomes = {}
+    try:
+        await publish_or_write(sampled, partial(write, sampled))
+    except AdmissionRejected:
+        raise
+    except Exception as exc:
+        if _storage_unavailable(exc):
+            logger.error(f"Failed to ingest signal batch: {exc}", exc_info=True)
+            outcomes = {signal.signal_id: ("failed", "storage unavailable") for signal in sampled}
+        else:
+            # Something in the batch is refused: store one by one to isolate it
+            logger.warning(f"Batch of {len(sampled)} signals refused ({exc!r}); retrying one by one")
+            outcomes = await _store_one_by_one(sampled, write)
+
+    for result in results:
+        outcome = outcomes.get(result.get("signal_id"))
+        if result["status"] == "accepted" and outcome:
+            result["status"], result["error"] = outcome
+    response_status = status.HTTP_202_ACCEPTED
+    if any(result["status"] == "failed" for result in results):
+        response_status = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    body = BatchIngestResponse(
+        accepted=sum(r["status"] == "accepted" for r in results),
+        rejected=sum(r["status"] == "rejected" for r in results),
+        failed=sum(r["status"] == "failed" for r in results),
+        results=results,
+    )
+    logger.info(
+        f"Signal batch processed: accepted={body.accepted}, "
+        f"rejected={body.rejected}, failed={body.failed}"
+    )
+    return JSONResponse(status_code=response_status, content=body.model_dump(mode="json"))
+
+
+def _storage_unavailable(exc: BaseException) -> bool:
+    """Failures worth retrying as-is, as opposed to signals the database refuses."""
+    return db_unavailable(exc) or isinstance(exc, (AdmissionRejected, StreamFull, RedisError))
+
+
+async def _store_one_by_one(signals: List[BaseSignal], write) -> dict:
+    """
+    Store `signals` individually after their batch was refused.
+
+    Returns:
+        signal_id -> ("rejected" | "failed", error) for each signal not stored
+    """
+    outcomes = {}
+    unavailable = False
+    for signal in signals:
+        if unavailable:
+            outcomes[signal.signal_id] = ("failed", "storage unavailable")
+            continue
+        try:
+            await publish_or_write([signal], partial(write, [signal]))
+        except Exception as exc:
+            if _storage_unavailable(exc):
+                # The rest would fail the same way
+                unavailable = True
+                outcomes[signal.signal_id] = ("failed", "storage unavailable")
+            else:
+                logger.warning(f"Signal {signal.signal_id} refused: {exc!r}")
+                error = getattr(exc, "orig", None) or exc
+                outcomes[signal.signal_id] = ("rejected", f"refused by storage: {error}"[:500])
+    return outcomes
+
+
+@router.post(
+    "/stream",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=StreamIngestResponse,
+)
+async def ingest_stream(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ingest a newline-delimited JSON (NDJSON) body of arbitrary size.
+
+    The body is parsed incrementally: each line is validated against the
+    schema named by its `signal_type` and valid signals are flushed to the
+    database every `INGEST_STREAM_CHUNK_SIZE` lines, so memory stays flat
+    regardless of body size. If storage fails mid-stream the request stops
+    with `503`; lines up to the last flushed chunk are already stored.
+
+    Each chunk write is admitted at low priority on its own; a stream shed
+    before its first chunk is stored gets `429`.
+    """
+    logger.info("Receiving NDJSON signal stream")
+
+    counts = {"lines": 0, "accepted": 0, "rejected": 0, "failed": 0, "chunks_flushed": 0}
+    errors = []
+    chunk = []
+
+    def reject(line_number: int, error: str):
+        counts["rejected"] += 1
+        if len(errors) < settings.INGEST_STREAM_MAX_ERRORS:
+            errors.append({"line": line_number, "error": error})
+
+    async def write(signals: List[BaseSignal]):
+        # Bulk work: each chunk is admitted at low priority, so the stream
+        # holds a slot and a connection only while a chunk is written
+        async with admission.admit(LOW):
+            await admission.checkout(db)
+            await ingest_signals_batch(db=db, signals=signals)
+
+    async def flush() -> bool:
+        sampled = sampler.sample(chunk)
+        try:
+            await publish_or_write(sampled, partial(write, sampled))
+        except AdmissionRejected:
+            if not counts["chunks_flushed"]:
+                raise  # nothing stored yet: shed the whole request with 429
+            logger.warning("NDJSON chunk shed by admission control")
+            counts["failed"] += len(chunk)
+            return False
+        except Exception as exc:
+            logger.error(f"Failed to flush NDJSON chunk: {exc}", exc_info=True)
+            counts["failed"] += len(chunk)
+            return False
+        counts["accepted"] += len(chunk)
+        counts["chunks_flushed"] += 1
+        logger.info(
+            f"NDJSON stream progress: lines={counts['lines']}, "
+            f"accepted={counts['accepted']}, rejected={counts['rejected']}"
+        )
+        chunk.clear()
+        return True
+
+    response_status = status.HTTP_202_ACCEPTED
+    async for line_number, line in iter_ndjson_lines(
+        request.stream(), settings.INGEST_STREAM_MAX_LINE_BYTES
+    ):
+        counts["lines"] = line_number
+        if line is None:
+            reject(line_number, f"line exceeds {settings.INGEST_STREAM_MAX_LINE_BYTES} bytes")
+            continue
+
+        try:
+            signal = parse_signal(json.loads(line))
+        except ValueError as exc:
+            reject(line_number, str(exc))
+            continue
+
+        chunk.append(signal)
+        if len(chunk) >= settings.INGEST_STREAM_CHUNK_SIZE and not await flush():
+            response_status = status.HTTP_503_SERVICE_UNAVAILABLE
+            break
+
+    if chunk and response_status == status.HTTP_202_ACCEPTED and not await flush():
+        response_status = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    body = StreamIngestResponse(
+        **counts,
+        errors=errors,
+        errors_truncated=counts["rejected"] > len(errors),
+    )
+    logger.info(
+        f"NDJSON stream finished: lines={body.lines}, accepted={body.accepted}, "
+        f"rejected={body.rejected}, failed={body.failed}"
+    )
+    return JSONResponse(status_code=response_status, content=body.model_dump(mode="json"))
+
+
+@router.get("/stats")
+async def ingest_stats():
+    """Runtime statistics of the ingestion path, for tuning."""
+    return {
+        "mode": settings.INGEST_MODE,
+        "write_buffer": write_buffer.stats(),
+        "redis_pool": pool_stats(),
+        "trigger_dedup": trigger_dedup_stats(),
+        "admission": admission.stats(),
+        "sampling": sampler.stats(),
+        "partitions": partition_maintainer.stats(),
+        "metric_rollups": rollup_maintainer.stats(),
+        "spool": spool.stats(),
+        "redis_stream": publisher.stats(),
+        "query_cache": {**response_cache.stats(), "version_bumps": incidents_version.stats()},
+    }
+
+
 @router.get("/health")
 async def health_check(db: AsyncSession = Depends(get_db)):
     """Health check endpoint."""
@@ -120,7 +412,8 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         return {
             "status": "healthy",
             "database": "connected",
-            "service": "ingestion-api"
+            "service": "ingestion-api",
+            "spool": spool.stats(),
         }
     except Exception as exc:
         logger.error(f"Health check failed: {exc}")
@@ -129,7 +422,9 @@ async def health_check(db: AsyncSession = Depends(get_db)):
             content={
                 "status": "unhealthy",
                 "database": "disconnected",
-                "error": str(exc)
+                "error": str(exc),
+                # Signals are still accepted into the spool while it has room
+                "spool": spool.stats(),
             }
         )
 
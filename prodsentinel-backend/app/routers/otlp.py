@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import json
+from app.core.admission import admission, signal_priority, AdmissionRejected
+from app.core.database import get_db
+from app.core.logging import get_logger
+from app.services.ingestion_service import ingest_signals_batch
+from app.services.otlp_mapping import map_logs, map_traces, map_metrics
+from app.services.sampling import sampler
+from app.services.signal_stream import publish_or_write
+
+try:
+    from google.protobuf.json_format import MessageToDict, ParseDict
+    from opentelemetry.proto.collector.logs.v1 import logs_service_pb2
+    from opentelemetry.proto.collector.trace.v1 import trace_service_pb2
+    from opentelemetry.proto.collector.metrics.v1 import metrics_service_pb2
+except ImportError:  # optional dependency: JSON encoding still works
+    logs_service_pb2 = trace_service_pb2 = metrics_service_pb2 = None
+
+router = APIRouter(prefix="/v1", tags=["otlp"])
+logger = get_logger(__name__)
+
+PROTOBUF = "application/x-protobuf"
+
+# signal kind -> (mapper, request message, response message, partial-success counter field)
+_EXPORTS = {
+    "logs": (map_logs, "ExportLogsServiceRequest", "ExportLogsServiceResponse", "rejectedLogRecords"),
+    "traces": (map_traces, "ExportTraceServiceRequest", "ExportTraceServiceResponse", "rejectedSpans"),
+    "metrics": (map_metrics, "ExportMetricsServiceRequest", "ExportMetricsServiceResponse", "rejectedDataPoints"),
+}
+
+
+def _pb_module(kind: str):
+    return {"logs": logs_service_pb2, "traces": trace_service_pb2, "metrics": metrics_service_pb2}[kind]
+
+
+def _respond(kind: str, is_protobuf: bool, rejected: int = 0, error: str = "", status_code: int = 200):
+    """Build an Export*ServiceResponse in the request's encoding."""
+    _, _, response_name, rejected_field = _EXPORTS[kind]
+    body = {}
+    if rejected or error:
+        body["partialSuccess"] = {rejected_field: rejected, "errorMessage": error}
+
+    if not is_protobuf:
+        return JSONResponse(status_code=status_code, content=body)
+
+    message = ParseDict(body, getattr(_pb_module(kind), response_name)())
+    return Response(status_code=status_code, content=message.SerializeToString(), media_type=PROTOBUF)
+
+
+async def _export(kind: str, request: Request, db: AsyncSession):
+    """
+    Decode one OTLP/HTTP export request and store it through the batch path:
+    one multi-row insert and one incident upsert for the whole request.
+    """
+    mapper, request_name, _, _ = _EXPORTS[kind]
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    is_protobuf = content_type == PROTOBUF
+    body = await request.body()
+
+    try:
+        if is_protobuf:
+            if _pb_module(kind) is None:
+                return JSONResponse(
+                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    content={"detail": "protobuf encoding requires the opentelemetry-proto package"},
+                )
+            message = getattr(_pb_module(kind), request_name).FromString(body)
+            mapped = mapper(MessageToDict(message), id_encoding="base64")
+        elif content_type == "application/json":
+            mapped = mapper(json.loads(body or b"{}"), id_encoding="hex")
+        else:
+            return JSONResponse(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                content={"detail": f"Content-Type must be {PROTOBUF} or application/json"},
+            )
+    except Exception as exc:
+        logger.warning(f"Malformed OTLP {kind} export: {exc}")
+        return _respond(kind, is_protobuf, error=f"malformed request: {exc}", status_code=400)
+
+    # Identical records map to the same deterministic signal_id
+    signals = sampler.sample(list({signal.signal_id: signal for signal in mapped.signals}.values()))
+    logger.info(
+        f"Received OTLP {kind} export: {len(signals)} signals, {mapped.rejected} rejected"
+    )
+
+    async def write():
+        async with admission.admit(signal_priority(signals)):
+            await admission.checkout(db)
+            await ingest_signals_batch(db=db, signals=signals)
+
+    try:
+        await publish_or_write(signals, write)
+    except AdmissionRejected as exc:
+        # OTLP exporters retry 429 after Retry-After
+        response = _respond(kind, is_protobuf, error=str(exc), status_code=429)
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response
+    except Exception as exc:
+        logger.error(f"Failed to store OTLP {kind} export: {exc}", exc_info=True)
+        response = _respond(kind, is_protobuf, error="storage unavailable", status_code=503)
+        response.headers["Retry-After"] = "5"
+        return response
+
+    return _respond(kind, is_protobuf, rejected=mapped.rejected, error="; ".join(mapped.errors))
+
+
+@router.post("/logs")
+async def export_logs(request: Request, db: AsyncSession = Depends(get_db)):
+    """OTLP/HTTP logs receiver (protobuf or JSON)."""
+    return await _export("logs", request, db)
+
+
+@router.post("/traces")
+async def export_traces(request: Request, db: AsyncSession = Depends(get_db)):
+    """OTLP/HTTP traces receiver (protobuf or JSON)."""
+    return await _export("traces", request, db)
+
+
+@router.post("/metrics")
+async def export_metrics(request: Request, db: AsyncSession = Depends(get_db)):
+    """OTLP/HTTP metrics receiver (protobuf or JSON)."""
+    return await _export("metrics", request, db)
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Literal
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from app.core.config import settings
 from app.core.database import get_db
-from app.schemas.query import SignalRead, PaginatedSignalResponse
+from app.schemas.query import SignalRead, PaginatedSignalResponse, MetricSeriesResponse
 from app.schemas.incident_schemas import PaginatedIncidentResponse, IncidentRead, AnalysisResultRead
 
-from app.services import query_service
+from app.services import query_service, rollups
+from app.services.response_cache import response_cache
 from app.core.logging import get_logger
 
 router = APIRouter(prefix="/query", tags=["query"])
@@ -19,8 +22,13 @@ async def list_signals(
     signal_type: Optional[str] = Query(None),
     start_time: Optional[datetime] = Query(None),
     end_time: Optional[datetime] = Query(None),
+    level: Optional[str] = Query(None, description="Log level, e.g. ERROR"),
+    error_code: Optional[str] = Query(None, description="attributes.error_code"),
+    order_id: Optional[str] = Query(None, description="attributes.order_id"),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: Literal["exact", "estimated", "none"] = Query(settings.QUERY_COUNT_DEFAULT, description="How `total` is computed"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -28,27 +36,39 @@ async def list_signals(
     """
     logger.info(f"Querying signals: trace_id={trace_id}, service={service_name}")
     
-    signals, total = await query_service.get_signals(
-        db=db,
-        trace_id=trace_id,
-        service_name=service_name,
-        signal_type=signal_type,
-        start_time=start_time,
-        end_time=end_time,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        signals, total, next_cursor = await query_service.get_signals(
+            db=db,
+            trace_id=trace_id,
+            service_name=service_name,
+            signal_type=signal_type,
+            start_time=start_time,
+            end_time=end_time,
+            level=level,
+            error_code=error_code,
+            order_id=order_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            count=count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "items": signals,
         "total": total,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
     }
 
 @router.get("/traces/{trace_id}", response_model=List[SignalRead])
 async def get_trace(
     trace_id: str,
+    start_time: Optional[datetime] = Query(None, description="Optional lower bound; limits the partitions scanned"),
+    end_time: Optional[datetime] = Query(None, description="Optional upper bound; limits the partitions scanned"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -56,7 +76,7 @@ async def get_trace(
     """
     logger.info(f"Retrieving trace: {trace_id}")
     
-    signals = await query_service.get_trace_signals(db, trace_id)
+    signals = await query_service.get_trace_signals(db, trace_id, start_time=start_time, end_time=end_time)
     
     if not signals:
         logger.warning(f"No signals found for trace_id: {trace_id}")
@@ -65,48 +85,107 @@ async def get_trace(
         
     return signals
 
+@router.get("/metrics/series", response_model=MetricSeriesResponse)
+async def get_metric_series(
+    service_name: str = Query(...),
+    metric_name: str = Query(...),
+    start_time: Optional[datetime] = Query(None, description="Defaults to one hour before end_time"),
+    end_time: Optional[datetime] = Query(None, description="Defaults to now"),
+    max_points: int = Query(settings.METRIC_SERIES_MAX_POINTS, ge=1, le=10000),
+    resolution: Optional[str] = Query(None, description="1m, 1h or 1d; picked from the range and max_points if omitted"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Retrieve a downsampled metric series from the rollup tables.
+    """
+    end_time = end_time or datetime.now(timezone.utc)
+    start_time = start_time or end_time - timedelta(hours=1)
+    # Naive bounds are taken as UTC, like stored timestamps
+    start_time, end_time = (t if t.tzinfo else t.replace(tzinfo=timezone.utc) for t in (start_time, end_time))
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="start_time must be before end_time")
+    if resolution is None:
+        resolution = rollups.choose_resolution(start_time, end_time, max_points)
+    elif resolution not in rollups.RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution must be one of {list(rollups.RESOLUTIONS)}")
+
+    logger.info(f"Querying metric series: {service_name}/{metric_name} at {resolution}")
+
+    points = await rollups.get_metric_series(
+        db, service_name, metric_name, start_time, end_time, resolution
+    )
+    return {
+        "service_name": service_name,
+        "metric_name": metric_name,
+        "resolution": resolution,
+        "points": points,
+    }
+
 @router.get("/incidents", response_model=PaginatedIncidentResponse)
 async def list_incidents(
+    request: Request,
     status: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: Literal["exact", "estimated", "none"] = Query(settings.QUERY_COUNT_DEFAULT, description="How `total` is computed"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve detected incidents.
+
+    Served from the versioned response cache; send the `ETag` back as
+    `If-None-Match` to get `304 Not Modified` while nothing changed.
     """
-    logger.info(f"Querying incidents: status={status}, severity={severity}")
-    
-    incidents, total = await query_service.get_incidents(
-        db=db,
-        status=status,
-        severity=severity,
-        limit=limit,
-        offset=offset
-    )
-    
-    return {
-        "items": incidents,
-        "total": total,
-        "limit": limit,
-        "offset": offset
-    }
+    async def load():
+        logger.info(f"Querying incidents: status={status}, severity={severity}")
+        try:
+            incidents, total, next_cursor = await query_service.get_incidents(
+                db=db,
+                status=status,
+                severity=severity,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                count=count
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return PaginatedIncidentResponse.model_validate({
+            "items": incidents,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        })
+
+    key = ("incidents", status, severity, limit, offset, cursor, count)
+    return await response_cache.respond(request, key, load)
 
 @router.get("/incidents/{incident_id}/analysis", response_model=Optional[AnalysisResultRead])
 async def get_incident_analysis(
+    request: Request,
     incident_id: str,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve root cause analysis for a specific incident.
+
+    Cached like `/query/incidents`, including the 404 while the analysis is
+    pending.
     """
-    logger.info(f"Retrieving analysis for incident: {incident_id}")
-    
-    analysis = await query_service.get_incident_analysis(db, incident_id)
-    
-    if not analysis:
-        raise HTTPException(status_code=404, detail="Analysis not found for this incident")
-        
-    return analysis
+    async def load():
+        logger.info(f"Retrieving analysis for incident: {incident_id}")
+        analysis = await query_service.get_incident_analysis(db, incident_id)
+        return AnalysisResultRead.model_validate(analysis) if analysis else None
 
+    try:
+        key = ("analysis", str(UUID(incident_id)))
+    except ValueError:
+        key = ("analysis", incident_id)
+    return await response_cache.respond(
+        request, key, load, not_found="Analysis not found for this incident"
+    )
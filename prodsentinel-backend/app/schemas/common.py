@@ -1,6 +1,16 @@
 from datetime import datetime
+from typing import Any, Dict
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Fields stored in their own raw_signals columns (signal_id as `id`); the
+# stored payload leaves them out and reads add them back (`full_payload`)
+COLUMN_FIELDS = frozenset({"signal_id", "trace_id", "service_name", "timestamp", "signal_type"})
+
+# trace_id prefix of signals received without one (OTLP records with no
+# trace context): each gets its own ID, and they are stored without
+# incident tracking or analysis, as there is no trace to correlate
+UNTRACED_TRACE_PREFIX = "untraced:"
 
 
 class BaseSignal(BaseModel):
@@ -13,5 +23,37 @@ class BaseSignal(BaseModel):
     service_name: str
     timestamp: datetime
 
+    # Probability this signal survived ingest sampling (app/services/sampling.py)
+    _sample_rate: float = PrivateAttr(default=1.0)
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate
+
     class Config:
         extra = "forbid"
+
+
+def full_payload(
+    payload: Dict[str, Any],
+    signal_id: Any,
+    trace_id: str,
+    service_name: str,
+    timestamp: Any,
+    signal_type: str,
+) -> Dict[str, Any]:
+    """
+    Canonical payload shape of a stored signal: the column values in the
+    field order of `model_dump()`, then the stored type-specific fields.
+
+    Rows stored before payloads were compacted still carry the column
+    fields; their stored values win, and are identical anyway.
+    """
+    return {
+        "signal_id": signal_id,
+        "trace_id": trace_id,
+        "service_name": service_name,
+        "timestamp": timestamp,
+        "signal_type": signal_type,
+        **payload,
+    }
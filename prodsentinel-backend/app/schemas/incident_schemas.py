@@ -35,9 +35,13 @@ class IncidentRead(BaseModel):
 
 class PaginatedIncidentResponse(BaseModel):
     items: List[IncidentRead]
-    total: int
+    # None with `count=none`; an estimate with `count=estimated`
+    total: Optional[int]
     limit: int
     offset: int
+    # Pass as `cursor` for the next page; None on the last page
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 class AnalysisResultRead(BaseModel):
     id: UUID
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    signal_id: Optional[UUID] = None
+    status: str  # "accepted" | "rejected" | "failed"
+    error: Optional[str] = None
+
+
+class BatchIngestResponse(BaseModel):
+    accepted: int
+    rejected: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+class StreamLineError(BaseModel):
+    line: int
+    error: str
+
+
+class StreamIngestResponse(BaseModel):
+    lines: int
+    accepted: int
+    rejected: int
+    failed: int
+    chunks_flushed: int
+    errors: List[StreamLineError]
+    errors_truncated: bool = False
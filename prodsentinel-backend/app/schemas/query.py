@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import List, Optional, Any
 from datetime import datetime
 from uuid import UUID
+from .common import full_payload
 from .signals import SignalType
 
 class SignalRead(BaseModel):
@@ -15,8 +16,39 @@ class SignalRead(BaseModel):
     class Config:
         from_attributes = True
 
+    @model_validator(mode="after")
+    def _expand_payload(self):
+        # Stored payloads omit the column fields; responses keep the full signal shape
+        if isinstance(self.payload, dict):
+            self.payload = full_payload(
+                self.payload, self.id, self.trace_id, self.service_name,
+                self.timestamp, self.signal_type.value,
+            )
+        return self
+
 class PaginatedSignalResponse(BaseModel):
     items: List[SignalRead]
-    total: int
+    # None with `count=none`; an estimate with `count=estimated`
+    total: Optional[int]
     limit: int
     offset: int
+    # Pass as `cursor` for the next page; None on the last page
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+class MetricPoint(BaseModel):
+    bucket_start: datetime
+    count: int
+    sum: float
+    min: float
+    max: float
+    avg: Optional[float]
+    p50: Optional[float]
+    p95: Optional[float]
+    p99: Optional[float]
+
+class MetricSeriesResponse(BaseModel):
+    service_name: str
+    metric_name: str
+    resolution: str
+    points: List[MetricPoint]
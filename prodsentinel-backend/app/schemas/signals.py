@@ -32,3 +32,30 @@ class MetricSampleV1(BaseSignal):
     value: float
     unit: str
     attributes: Dict[str, Any] = Field(default_factory=dict)
+
+
+# Schema lookup for payloads tagged by `signal_type` (batch / stream ingest)
+SIGNAL_SCHEMAS = {
+    SignalType.LOG: LogSignalV1,
+    SignalType.TRACE: TraceSpanV1,
+    SignalType.METRIC: MetricSampleV1,
+}
+
+
+def parse_signal(data: Any) -> BaseSignal:
+    """
+    Validate a raw object against the schema selected by its `signal_type` tag.
+
+    Raises:
+        ValueError: If the tag is missing/unknown or the object fails validation
+            (pydantic's ValidationError is a ValueError subclass).
+    """
+    if not isinstance(data, dict):
+        raise ValueError("signal must be a JSON object")
+    try:
+        schema = SIGNAL_SCHEMAS[SignalType(data.get("signal_type"))]
+    except ValueError:
+        raise ValueError(
+            f"signal_type must be one of {[t.value for t in SignalType]}"
+        )
+    return schema.model_validate(data)
@@ -0,0 +1,410 @@
+"""
+Cold-tier archive of raw signals as local Parquet files.
+
+Aged raw_signals rows are exported to
+
+    {ARCHIVE_PATH}/raw_signals/day=YYYY-MM-DD/service_name=<service>/<source>.parquet
+
+(hive layout, service names URI-encoded) and then removed from Postgres:
+by the partition maintainer when RAW_SIGNALS_RETENTION_ACTION=archive, or
+for an arbitrary range with
+`python -m app.services.archive --start 2026-01-01 --end 2026-02-01`.
+
+Files are sorted by (trace_id, timestamp) and written in row groups of at
+most ARCHIVE_ROW_GROUP_SIZE rows, so a trace lookup only decodes the row groups whose
+trace_id statistics can match. The payload filter fields of `/query/signals`
+(level, error_code, order_id) are stored as their own columns next to the
+payload JSON, so they prune the same way. The file name is derived from the
+exported range: re-running an interrupted export overwrites instead of
+duplicating.
+
+`query_service` falls through to the archive when a requested range reaches
+back to archived days (see `covers`). Requires `pyarrow`.
+"""
+import asyncio
+import argparse
+import json
+import os
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.raw_signal import RawSignal, PAYLOAD_FILTER_PATHS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency: no archive
+    pa = None
+
+logger = get_logger(__name__)
+
+# service_name is a directory key, not a file column
+SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("signal_type", pa.string()),
+    ("trace_id", pa.string()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("payload", pa.string()),
+] + [(name, pa.string()) for name in PAYLOAD_FILTER_PATHS]) if pa else None
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("day", pa.string()), ("service_name", pa.string())]), flavor="hive",
+) if pa else None
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def _root(base: Optional[str] = None) -> str:
+    return os.path.join(base or settings.ARCHIVE_PATH, "raw_signals")
+
+
+def archived_days(base: Optional[str] = None) -> List[date]:
+    """Days present in the archive, oldest first."""
+    root = _root(base)
+    if not available() or not os.path.isdir(root):
+        return []
+    days = []
+    for entry in os.scandir(root):
+        if entry.is_dir() and entry.name.startswith("day="):
+            days.append(date.fromisoformat(entry.name[len("day="):]))
+    return sorted(days)
+
+
+def newest_end(base: Optional[str] = None) -> Optional[datetime]:
+    """End of the newest archived day: every archived signal is older. None without an archive."""
+    days = archived_days(base)
+    if not days:
+        return None
+    return datetime.combine(days[-1] + timedelta(days=1), time(), tzinfo=timezone.utc)
+
+
+def covers(start_time: Optional[datetime], base: Optional[str] = None) -> bool:
+    """True if a range starting at `start_time` (None: unbounded) reaches archived days."""
+    end = newest_end(base)
+    if end is None:
+        return False
+    return start_time is None or _utc(start_time) < end
+
+
+def _utc(ts: datetime) -> datetime:
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+# -- Export -----------------------------------------------------------------
+
+def _payload_column_sql(path: Tuple[str, ...]) -> str:
+    expr = "payload"
+    for key in path[:-1]:
+        expr += f" -> '{key}'"
+    return f"{expr} ->> '{path[-1]}'"
+
+
+class _Writer:
+    """
+    One Parquet file per (day, service), fed in row-group sized slices.
+
+    Each file is written under a temporary name, fsynced and renamed into
+    place when the next (day, service) starts or the export ends, so
+    readers never see a partial file.
+    """
+
+    def __init__(self, base: str, source: str):
+        self.base = base
+        self.source = source
+        self.files: List[str] = []
+        self._key: Optional[Tuple[str, str]] = None
+        self._writer = None
+        self._paths: Optional[Tuple[str, str]] = None
+        self._rows: List[dict] = []
+
+    def add(self, day: str, service_name: str, row: dict):
+        if (day, service_name) != self._key:
+            self.write_pending()
+            self._close()
+            self._key = (day, service_name)
+        self._rows.append(row)
+
+    def write_pending(self):
+        if not self._rows:
+            return
+        if self._writer is None:
+            day, service_name = self._key
+            directory = os.path.join(
+                _root(self.base), f"day={day}", f"service_name={quote(service_name, safe='')}"
+            )
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{self.source}.parquet")
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            self._writer = pq.ParquetWriter(tmp, SCHEMA, compression="zstd")
+            self._paths = (tmp, path)
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=SCHEMA))
+        self._rows = []
+
+    def close(self):
+        self.write_pending()
+        self._close()
+
+    def _close(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        tmp, path = self._paths
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self.files.append(path)
+        self._writer = self._paths = None
+
+
+async def export_range(
+    conn: AsyncConnection,
+    table: str,
+    source: str,
+    start: Optional[datetime],
+    end: datetime,
+    base: Optional[str] = None,
+) -> int:
+    """
+    Write the rows of `table` with start <= timestamp < end to the archive.
+
+    Does not delete them; callers drop or delete in the same transaction
+    once this returns. `source` names the files, so the same range always
+    maps to the same files. Returns the number of rows exported.
+    """
+    filter_columns = ", ".join(
+        f"{_payload_column_sql(path)} AS {name}" for name, path in PAYLOAD_FILTER_PATHS.items()
+    )
+    params = {"end": end}
+    where = "timestamp < :end"
+    if start:
+        params["start"] = start
+        where += " AND timestamp >= :start"
+    result = await conn.stream(text(f"""
+        SELECT id::text AS id, signal_type::text AS signal_type, trace_id, service_name,
+               timestamp, payload::text AS payload, {filter_columns},
+               to_char(timestamp AT TIME ZONE 'UTC', 'YYYY-MM-DD') AS day
+        FROM {table}
+        WHERE {where}
+        ORDER BY day, service_name, trace_id, timestamp
+    """), params)
+
+    writer = _Writer(base or settings.ARCHIVE_PATH, source)
+    exported = 0
+    # One fetched chunk becomes (at most) one row group
+    async for chunk in result.mappings().partitions(settings.ARCHIVE_ROW_GROUP_SIZE):
+        for row in chunk:
+            row = dict(row)
+            day, service_name = row.pop("day"), row.pop("service_name")
+            writer.add(day, service_name or "", row)
+        # Parquet encoding is CPU-bound: keep it off the event loop
+        await asyncio.to_thread(writer.write_pending)
+        exported += len(chunk)
+    await asyncio.to_thread(writer.close)
+    return exported
+
+
+async def archive_partition(conn: AsyncConnection, name: str, start: datetime, end: datetime) -> int:
+    """Export a whole raw_signals partition before the caller drops it."""
+    exported = await export_range(conn, name, name, start, end)
+    logger.info(f"Archived {exported} rows of {name} to {settings.ARCHIVE_PATH}")
+    return exported
+
+
+# -- Read -------------------------------------------------------------------
+
+_SIGNAL_COLUMNS = ["id", "signal_type", "trace_id", "service_name", "timestamp", "payload"]
+# Same order as `/query/signals` pages (timestamp DESC, id DESC)
+_NEWEST_FIRST = [("timestamp", "descending"), ("id", "descending")]
+_TS = pa.timestamp("us", tz="UTC") if pa else None
+
+
+def _filter(
+    by_day: bool,
+    trace_id: Optional[str] = None,
+    service_name: Optional[str] = None,
+    signal_type: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    **payload_filters: Optional[str],
+):
+    """Dataset filter; with `by_day`, the time bounds also prune day directories."""
+    expr = pc.scalar(True)
+    if start_time:
+        start_time = _utc(start_time)
+        expr &= ds.field("timestamp") >= pa.scalar(start_time, _TS)
+        if by_day:
+            expr &= ds.field("day") >= start_time.astimezone(timezone.utc).date().isoformat()
+    if end_time:
+        end_time = _utc(end_time)
+        expr &= ds.field("timestamp") <= pa.scalar(end_time, _TS)
+        if by_day:
+            expr &= ds.field("day") <= end_time.astimezone(timezone.utc).date().isoformat()
+    if trace_id:
+        expr &= ds.field("trace_id") == trace_id
+    if service_name:
+        expr &= ds.field("service_name") == service_name
+    if signal_type:
+        expr &= ds.field("signal_type") == signal_type
+    for name, value in payload_filters.items():
+        if value:
+            expr &= ds.field(name) == value
+    return expr
+
+
+def _dataset(base: Optional[str], day: Optional[date] = None):
+    schema = SCHEMA.append(pa.field("service_name", pa.string()))
+    if day is None:
+        return ds.dataset(
+            _root(base), format="parquet", partitioning=PARTITIONING,
+            schema=schema.append(pa.field("day", pa.string())),
+        )
+    # Inside a day directory only the service key remains
+    return ds.dataset(
+        os.path.join(_root(base), f"day={day.isoformat()}"), format="parquet",
+        partitioning=ds.partitioning(pa.schema([("service_name", pa.string())]), flavor="hive"),
+        schema=schema,
+    )
+
+
+def _to_signals(rows: List[dict]) -> List[RawSignal]:
+    return [
+        RawSignal(
+            id=uuid.UUID(row["id"]),
+            signal_type=row["signal_type"],
+            trace_id=row["trace_id"],
+            service_name=row["service_name"],
+            timestamp=row["timestamp"],
+            payload=json.loads(row["payload"]),
+        )
+        for row in rows
+    ]
+
+
+def read_signals(
+    limit: int,
+    base: Optional[str] = None,
+    before: Optional[Tuple[datetime, uuid.UUID]] = None,
+    with_total: bool = True,
+    **filters,
+) -> Tuple[List[RawSignal], Optional[int]]:
+    """
+    Newest `limit` archived signals matching `filters`, newest first, and
+    the total number of matches (None without `with_total`).
+
+    Walks archived days newest first. Once `limit` rows are collected, the
+    remaining days are only counted, which reads the filter columns alone
+    (or just the file footers when unfiltered); without `with_total` the
+    walk stops there.
+
+    With `before` (a keyset cursor's `(timestamp, id)`), only signals
+    strictly older in `(timestamp, id)` order are returned; the total still
+    counts every match.
+    """
+    start_time, end_time = filters.get("start_time"), filters.get("end_time")
+    collected: List[dict] = []
+    total = 0
+    for day in reversed(archived_days(base)):
+        day_start = datetime.combine(day, time(), tzinfo=timezone.utc)
+        if end_time and day_start > _utc(end_time):
+            continue
+        if start_time and day_start + timedelta(days=1) <= _utc(start_time):
+            break
+
+        if not with_total:
+            if len(collected) >= limit:
+                break
+            if before and day_start > _utc(before[0]):
+                continue
+
+        dataset = _dataset(base, day)
+        expr = _filter(False, **filters)
+        if len(collected) >= limit or (before and day_start > _utc(before[0])):
+            total += dataset.count_rows(filter=expr)
+            continue
+        if before:
+            if with_total:
+                total += dataset.count_rows(filter=expr)
+            table = dataset.to_table(columns=_SIGNAL_COLUMNS, filter=expr & _before(*before))
+        else:
+            table = dataset.to_table(columns=_SIGNAL_COLUMNS, filter=expr)
+            total += table.num_rows
+        need = limit - len(collected)
+        if table.num_rows > need:
+            table = table.take(pc.select_k_unstable(table, need, sort_keys=_NEWEST_FIRST))
+        collected.extend(table.sort_by(_NEWEST_FIRST).to_pylist())
+    return _to_signals(collected), total if with_total else None
+
+
+def _before(timestamp: datetime, row_id: uuid.UUID):
+    # Canonical UUID strings order like Postgres' bytewise uuid comparison
+    timestamp = pa.scalar(_utc(timestamp), _TS)
+    return (ds.field("timestamp") < timestamp) | (
+        (ds.field("timestamp") == timestamp) & (ds.field("id") < str(row_id))
+    )
+
+
+def read_trace(
+    trace_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    base: Optional[str] = None,
+) -> List[RawSignal]:
+    """Archived signals of one trace, oldest first."""
+    if not archived_days(base):
+        return []
+    table = _dataset(base).to_table(
+        columns=_SIGNAL_COLUMNS,
+        filter=_filter(True, trace_id=trace_id, start_time=start_time, end_time=end_time),
+    )
+    return _to_signals(table.sort_by([("timestamp", "ascending")]).to_pylist())
+
+
+# -- Range archival ---------------------------------------------------------
+
+async def archive_range(start: datetime, end: datetime, base: Optional[str] = None) -> int:
+    """
+    Export raw_signals rows in [start, end) and delete them, in one transaction.
+
+    For ranges that are not whole partitions (whole partitions are archived
+    and dropped by the partition maintainer).
+    """
+    from app.core.database import engine
+
+    source = f"range-{start:%Y%m%d%H%M%S}-{end:%Y%m%d%H%M%S}"
+    async with engine.begin() as conn:
+        exported = await export_range(conn, RawSignal.__tablename__, source, start, end, base)
+        await conn.execute(
+            text("DELETE FROM raw_signals WHERE timestamp >= :start AND timestamp < :end"),
+            {"start": start, "end": end},
+        )
+    logger.info(f"Archived and deleted {exported} raw signals in [{start.isoformat()}, {end.isoformat()})")
+    return exported
+
+
+if __name__ == "__main__":
+    def _timestamp(value: str) -> datetime:
+        return _utc(datetime.fromisoformat(value))
+
+    parser = argparse.ArgumentParser(description="Archive a raw_signals time range to Parquet")
+    parser.add_argument("--start", type=_timestamp, required=True)
+    parser.add_argument("--end", type=_timestamp, required=True)
+    parser.add_argument("--path", default=None, help="Archive root (default ARCHIVE_PATH)")
+    args = parser.parse_args()
+    if not available():
+        parser.error("pyarrow is required for archiving")
+
+    async def _main():
+        from app.core.database import engine
+        await archive_range(args.start, args.end, args.path)
+        await engine.dispose()
+
+    asyncio.run(_main())
@@ -0,0 +1,74 @@
+"""
+Totals for paginated queries (`/query/signals`, `/query/incidents`).
+
+`SELECT count(*)` over the filtered query reads every matching row, which on
+a large raw_signals range costs more than the page itself. Callers choose a
+strategy per request:
+
+- `exact`: the count, as before
+- `estimated`: the planner's row estimate for the filtered query (an
+  `EXPLAIN`, no rows read), cached for QUERY_COUNT_ESTIMATE_TTL_SECONDS.
+  Estimates below QUERY_COUNT_EXACT_BELOW are replaced by the exact count,
+  which is cheap there and where the planner is least accurate.
+- `none`: no total; the page's `has_more` says whether another one follows
+"""
+import json
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+STRATEGIES = ("exact", "estimated", "none")
+
+_estimates = TTLCache(
+    maxsize=settings.QUERY_COUNT_ESTIMATE_CACHE_SIZE,
+    ttl_seconds=settings.QUERY_COUNT_ESTIMATE_TTL_SECONDS,
+)
+
+
+class _Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON) <statement>`, with the statement's parameters bound as usual."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def count(db: AsyncSession, query, strategy: str = "exact") -> Optional[int]:
+    """
+    Total rows of `query` (a filtered, unordered select) by `strategy`.
+
+    Returns None for `none`.
+    """
+    if strategy == "none":
+        return None
+    if strategy == "exact":
+        return await _exact(db, query)
+
+    compiled = query.compile()
+    key = (str(compiled), tuple(sorted(compiled.params.items())))
+    estimate = _estimates.get(key)
+    if estimate is None:
+        plan = await db.scalar(_Explain(query))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < settings.QUERY_COUNT_EXACT_BELOW:
+            estimate = await _exact(db, query)
+        _estimates.set(key, estimate)
+    return estimate
+
+
+async def _exact(db: AsyncSession, query) -> int:
+    return await db.scalar(select(func.count()).select_from(query.subquery())) or 0
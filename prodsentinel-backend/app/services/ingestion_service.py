@@ -1,11 +1,43 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
 from app.models.raw_signal import RawSignal
+from app.models.incident import Incident, IncidentStatus, IncidentSeverity
+from app.schemas.common import BaseSignal, COLUMN_FIELDS, UNTRACED_TRACE_PREFIX, full_payload
 from app.core.logging import get_logger
+from app.core.config import settings
+from app.core.metrics import INGEST_DB_SECONDS, ANALYSIS_TRIGGERS
+from app.core.task_queue import get_redis, get_celery
+from app.services.triage import triage_engine, SEVERITY_RANK
+from app.services.rollups import update_rollups
+from app.services.response_cache import incidents_version
+from app.utils.cache import TTLCache
+from typing import Dict, List, Sequence
 from uuid import UUID
+import asyncio
+import uuid
 
 logger = get_logger(__name__)
 
+# trace_ids whose analysis was recently queued (by this or another replica)
+_recent_triggers = TTLCache(
+    maxsize=settings.ANALYSIS_DEDUP_CACHE_SIZE,
+    ttl_seconds=settings.ANALYSIS_DEDUP_TTL_SECONDS,
+)
+
+
+def signal_payload(signal: BaseSignal) -> dict:
+    """
+    Stored payload of a signal: its type-specific fields only, plus its
+    sampling rate when sampled. Fields with their own raw_signals column
+    are not repeated in the JSON.
+    """
+    payload = signal.model_dump(mode='json', exclude=COLUMN_FIELDS)
+    if signal.sample_rate < 1.0:
+        payload["sample_rate"] = signal.sample_rate
+    return payload
+
 
 async def ingest_signal(
     db: AsyncSession,
@@ -15,10 +47,13 @@ async def ingest_signal(
     service_name: str,
     timestamp,
     payload: dict,
-):
+) -> bool:
     """
     Core ingestion logic.
     Stateless, idempotent, safe to retry.
+
+    A retried signal (same `signal_id`) is skipped by the insert and does
+    not advance the incident counters a second time.
     
     Args:
         db: Database session
@@ -27,77 +62,28 @@ async def ingest_signal(
         trace_id: Correlation ID for distributed tracing
         service_name: Name of the service emitting the signal
         timestamp: Signal timestamp
-        payload: Full signal payload as dict
+        payload: Stored signal payload (see `signal_payload`)
+
+    Returns:
+        True if the signal was stored, False if it was already present
     """
     logger.debug(f"Processing {signal_type} signal: {signal_id}")
     
     try:
-        raw = RawSignal(
-            id=signal_id,
-            signal_type=signal_type,
-            trace_id=trace_id,
-            service_name=service_name,
-            timestamp=timestamp,
-            payload=payload,
-        )
+        inserted = await _store_rows(db, [{
+            "id": signal_id,
+            "signal_type": signal_type,
+            "trace_id": trace_id,
+            "service_name": service_name,
+            "timestamp": timestamp,
+            "payload": payload,
+        }])
 
-        db.add(raw)
-        
-        # 4. Handle Incident Tracking (Unified for all signals)
-        from app.models.incident import Incident, IncidentStatus, IncidentSeverity
-        from sqlalchemy import select
-        
-        # Check for existing incident
-        stmt = select(Incident).where(Incident.trace_id == trace_id)
-        result = await db.execute(stmt)
-        existing_incident = result.scalar_one_or_none()
-        
-        current_severity = IncidentSeverity.LOW
-        if signal_type == "log" and payload.get("level") in ["ERROR", "CRITICAL"]:
-            current_severity = IncidentSeverity.HIGH
-        elif signal_type == "metric" and "latency" in payload.get("metric_name", "").lower():
-            if payload.get("value", 0) >= 2000:
-                current_severity = IncidentSeverity.HIGH
-
-        if existing_incident:
-            # Update existing
-            if service_name not in existing_incident.affected_services:
-                existing_incident.affected_services = list(set(existing_incident.affected_services + [service_name]))
-            
-            existing_incident.error_count += 1
-            
-            # Upgrade severity if current signal is more severe
-            severity_order = {IncidentSeverity.LOW: 0, IncidentSeverity.MEDIUM: 1, IncidentSeverity.HIGH: 2, IncidentSeverity.CRITICAL: 3}
-            if severity_order.get(current_severity, 0) > severity_order.get(existing_incident.severity, 0):
-                existing_incident.severity = current_severity
+        if inserted:
+            logger.info(f"Signal stored and incident tracked: {signal_type} from {service_name}")
         else:
-            # Create new incident entry so it shows in charts immediately
-            new_incident = Incident(
-                trace_id=trace_id,
-                status=IncidentStatus.OPEN,
-                severity=current_severity,
-                affected_services=[service_name],
-                error_count=1
-            )
-            db.add(new_incident)
-
-        await db.commit()
-        logger.info(f"Signal stored and incident tracked: {signal_type} from {service_name}")
-        
-        # 5. Triage Layer: Trigger expensive AI analysis only for "Important" signals
-        should_trigger = False
-        
-        if current_severity == IncidentSeverity.HIGH:
-            should_trigger = True
-        elif "fail" in str(payload).lower() or "critical" in str(payload).lower():
-            should_trigger = True
-
-        if should_trigger:
-            try:
-                _trigger_analysis(trace_id)
-            except Exception as exc:
-                # Don't fail ingestion if analysis trigger fails
-                logger.error(f"Failed to trigger analysis for {trace_id}: {exc}")
+            logger.info(f"Duplicate signal ignored: {signal_id}")
+        return bool(inserted)
         
     except SQLAlchemyError as exc:
         await db.rollback()
@@ -111,51 +97,238 @@ async def ingest_signal(
 
 
 
+async def ingest_signals_batch(db: AsyncSession, signals: Sequence[BaseSignal]) -> int:
+    """
+    Bulk variant of `ingest_signal` for already-validated signals.
 
-def _trigger_analysis(trace_id: str):
+    Writes every signal with a single multi-row INSERT, upserts one incident
+    row per distinct trace_id in a second statement and commits once. Analysis triggers
+    fire after the commit, at most once per trace.
+
+    Args:
+        db: Database session
+        signals: Validated LogSignalV1 / TraceSpanV1 / MetricSampleV1 objects
+
+    Returns:
+        Number of signals newly stored; already-present signal_ids are skipped
+    """
+    if not signals:
+        return 0
+
+    logger.debug(f"Processing batch of {len(signals)} signals")
+
+    try:
+        rows = [
+            {
+                "id": signal.signal_id,
+                "signal_type": signal.signal_type.value,
+                "trace_id": signal.trace_id,
+                "service_name": signal.service_name,
+                "timestamp": signal.timestamp,
+                "payload": signal_payload(signal),
+            }
+            for signal in signals
+        ]
+        inserted = await _store_rows(db, rows)
+
+        logger.info(
+            f"Batch stored: {inserted} new signals, {len(rows) - inserted} duplicates skipped"
+        )
+        return inserted
+
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        logger.error(f"Database error during batch ingestion: {exc}", exc_info=True)
+        raise
+
+    except Exception as exc:
+        await db.rollback()
+        logger.error(f"Unexpected error during batch ingestion: {exc}", exc_info=True)
+        raise
+
+
+async def _store_rows(db: AsyncSession, rows: List[dict]) -> int:
+    """
+    Insert raw signal rows, track their incidents, commit and trigger analysis.
+
+    The insert is `ON CONFLICT (id, timestamp) DO NOTHING ... RETURNING id`
+    (the primary key includes the partition key): signals that are already
+    stored (client retries, bulk replays, duplicates within `rows`) are
+    skipped without an error, and only the rows actually inserted feed the
+    incident counters, metric rollups and analysis triggers. Untraced
+    signals (UNTRACED_TRACE_PREFIX) are stored and rolled up but have no
+    incident to track.
+
+    Returns:
+        Number of rows inserted
+    """
+    stmt = (
+        insert(RawSignal)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[RawSignal.id, RawSignal.timestamp])
+        .returning(RawSignal.id)
+    )
+    with INGEST_DB_SECONDS.labels("insert").time():
+        inserted_ids = set((await db.execute(stmt)).scalars().all())
+
+    traces = {}
+    stored = []
+    for row in rows:
+        # discard so a duplicate within `rows` is counted once
+        if row["id"] not in inserted_ids:
+            continue
+        inserted_ids.discard(row["id"])
+        stored.append(row)
+        if row["trace_id"].startswith(UNTRACED_TRACE_PREFIX):
+            continue
+
+        # Rules may match column fields too, as they did on full payloads
+        decision = triage_engine.evaluate(row["signal_type"], full_payload(
+            row["payload"], row["id"], row["trace_id"], row["service_name"],
+            row["timestamp"], row["signal_type"],
+        ))
+        trace = traces.setdefault(row["trace_id"], {
+            "services": set(),
+            "count": 0,
+            "severity": IncidentSeverity.LOW,
+            "trigger": False,
+        })
+        trace["services"].add(row["service_name"])
+        trace["count"] += 1
+        if SEVERITY_RANK[decision.severity] > SEVERITY_RANK[trace["severity"]]:
+            trace["severity"] = decision.severity
+        trace["trigger"] = trace["trigger"] or decision.trigger
+
+    with INGEST_DB_SECONDS.labels("incidents").time():
+        await _upsert_incidents(db, traces)
+    with INGEST_DB_SECONDS.labels("rollups").time():
+        await update_rollups(db, stored)
+    with INGEST_DB_SECONDS.labels("commit").time():
+        await db.commit()
+    if traces:
+        incidents_version.changed()
+
+    # Triage Layer: Trigger expensive AI analysis only for "Important" signals.
+    # Don't fail ingestion if an analysis trigger fails.
+    to_trigger = [trace_id for trace_id in sorted(traces) if traces[trace_id]["trigger"]]
+    outcomes = await asyncio.gather(
+        *(_trigger_analysis(trace_id) for trace_id in to_trigger),
+        return_exceptions=True,
+    )
+    for trace_id, outcome in zip(to_trigger, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Failed to trigger analysis for {trace_id}: {outcome}")
+
+    return len(stored)
+
+
+async def _upsert_incidents(db: AsyncSession, traces: Dict[str, dict]):
+    """
+    Create or update the incidents for a set of traces in one statement.
+
+    Runs `INSERT ... ON CONFLICT (trace_id) DO UPDATE` so that concurrent
+    signals for the same trace cannot lose updates: the counter increment,
+    the affected_services union and the severity escalation all happen
+    server-side against the current row. `GREATEST` works on severity
+    directly because the Postgres enum is declared in rank order.
+
+    Args:
+        db: Database session
+        traces: Mapping of trace_id to {"services", "count", "severity"}
+    """
+    # Sorted so concurrent upserts lock incident rows in the same order
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "trace_id": trace_id,
+            "status": IncidentStatus.OPEN,
+            "severity": traces[trace_id]["severity"],
+            "affected_services": sorted(traces[trace_id]["services"]),
+            "error_count": traces[trace_id]["count"],
+        }
+        for trace_id in sorted(traces)
+    ]
+    if not rows:
+        return
+
+    stmt = insert(Incident).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Incident.trace_id],
+        set_={
+            "error_count": func.coalesce(Incident.error_count, 0) + stmt.excluded.error_count,
+            "affected_services": literal_column(
+                "ARRAY(SELECT DISTINCT unnest("
+                "incidents.affected_services || excluded.affected_services))"
+            ),
+            "severity": func.greatest(Incident.severity, stmt.excluded.severity),
+        },
+    )
+    await db.execute(stmt)
+
+
+
+async def _trigger_analysis(trace_id: str):
     """
     Trigger async analysis via Celery (Fire and Forget).
     
-    This is called synchronously but queues the task asynchronously.
+    Uses the shared Redis pool and Celery producer created at startup.
+    Publishing to the broker is blocking (kombu), so it runs in a worker
+    thread to keep the event loop free.
     Uses a countdown to debounce multiple errors from the same trace.
     Deduplicates using Redis to ensure only one analysis task per trace_id.
+    A local cache of recently triggered traces answers repeat triggers during
+    an error storm without a Redis round trip; Redis stays authoritative
+    across replicas for traces this process has not seen yet.
     """
+    if _recent_triggers.get(trace_id):
+        ANALYSIS_TRIGGERS.labels("dedup_local").inc()
+        logger.debug(f"Analysis recently queued for trace_id: {trace_id}, skipping (local cache)")
+        return
+
+    r = get_redis()
+    key = f"analysis:triggered:{trace_id}"
+    ttl = settings.ANALYSIS_DEDUP_TTL_SECONDS
+
+    # Check if already triggered (set if Not Exists)
+    # Expires after the dedup TTL to allow re-analysis later if needed.
+    # TTL is read in the same round trip so the local entry never outlives
+    # the Redis key set by another replica.
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.set(key, "1", ex=ttl, nx=True)
+        pipe.ttl(key)
+        acquired, remaining = await pipe.execute()
+
+    _recent_triggers.set(trace_id, True, ttl_seconds=remaining if remaining > 0 else ttl)
+    if not acquired:
+        ANALYSIS_TRIGGERS.labels("dedup_redis").inc()
+        logger.debug(f"Analysis already queued for trace_id: {trace_id}, skipping duplicate trigger")
+        return
+
     try:
-        import redis
-        from celery import Celery
-        from app.core.config import settings
-        
-        # Redis-based deduplication
-        # Use a new connection for safety (or could use a connection pool)
-        r = redis.from_url(settings.REDIS_URL, decode_responses=True)
-        key = f"analysis:triggered:{trace_id}"
-        
-        # Check if already triggered (set if Not Exists)
-        # Expires in 300s (5 mins) to allow re-analysis later if needed
-        if not r.set(key, "1", ex=300, nx=True):
-            logger.debug(f"Analysis already queued for trace_id: {trace_id}, skipping duplicate trigger")
-            return
-        
-        # Create minimal Celery client (just for sending tasks)
-        celery_client = Celery(broker=settings.REDIS_URL)
-        
         # Queue analysis with 60s delay (debounce window)
-        celery_client.send_task(
+        await asyncio.to_thread(
+            get_celery().send_task,
             "analyze_trace",
             args=[trace_id],
             countdown=60
         )
         
+        ANALYSIS_TRIGGERS.labels("queued").inc()
         logger.info(f"Analysis queued for trace_id: {trace_id} (60s delay)")
         
     except Exception as exc:
         # If queuing fails, delete key so it can be retried
+        ANALYSIS_TRIGGERS.labels("failed").inc()
+        _recent_triggers.discard(trace_id)
         try:
-            r = redis.from_url(settings.REDIS_URL, decode_responses=True)
-            r.delete(f"analysis:triggered:{trace_id}")
-        except:
+            await r.delete(key)
+        except Exception:
             pass
             
         logger.error(f"Failed to queue Celery task: {exc}", exc_info=True)
         raise
 
+
+def trigger_dedup_stats() -> dict:
+    """Hit/miss counters of the local analysis-trigger dedup cache."""
+    return _recent_triggers.stats()
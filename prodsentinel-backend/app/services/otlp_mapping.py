@@ -0,0 +1,289 @@
+"""
+Map OTLP export requests onto ProdSentinel signal schemas.
+
+Works on the JSON shape of OTLP (camelCase keys, as produced by OTLP/HTTP
+JSON exporters or by `MessageToDict` on the protobuf messages). Trace and
+span IDs are hex in OTLP/JSON but base64 after `MessageToDict`; callers pass
+`id_encoding` accordingly.
+
+OTLP records carry no ProdSentinel `signal_id`, so one is derived
+deterministically from the record content: a re-sent export maps to the same
+IDs and is deduplicated rather than stored twice. Log records and metric
+points without a trace ID get `untraced:<signal_id>` (see
+UNTRACED_TRACE_PREFIX).
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from app.schemas.common import BaseSignal, UNTRACED_TRACE_PREFIX
+from app.schemas.signals import LogSignalV1, TraceSpanV1, MetricSampleV1
+
+_SIGNAL_ID_NAMESPACE = uuid.UUID("6f1c1c64-2a8e-4d0e-9a51-5a9f0e5bb1d7")
+
+# OTLP SeverityNumber ranges -> ProdSentinel levels
+_SEVERITY_LEVELS = [
+    (21, "CRITICAL"),  # FATAL..FATAL4
+    (17, "ERROR"),
+    (13, "WARNING"),
+    (9, "INFO"),
+    (5, "DEBUG"),
+    (1, "TRACE"),
+]
+
+# Severity names (SeverityNumber enum names without SEVERITY_NUMBER_ and the
+# 2-4 suffix, plus common severityText spellings) -> SeverityNumber
+_SEVERITY_NUMBERS = {
+    "TRACE": 1,
+    "DEBUG": 5,
+    "INFO": 9, "INFORMATION": 9, "NOTICE": 10,
+    "WARN": 13, "WARNING": 13,
+    "ERROR": 17, "ERR": 17,
+    "FATAL": 21, "CRITICAL": 21, "CRIT": 21, "ALERT": 22, "EMERGENCY": 23,
+}
+
+_STATUS_CODES = {
+    0: "UNSET", "STATUS_CODE_UNSET": "UNSET",
+    1: "OK", "STATUS_CODE_OK": "OK",
+    2: "ERROR", "STATUS_CODE_ERROR": "ERROR",
+}
+
+
+class OtlpMappingResult:
+    """Signals decoded from one export request plus the rejected record count."""
+
+    def __init__(self):
+        self.signals: List[BaseSignal] = []
+        self.rejected = 0
+        self.errors: List[str] = []
+
+    def reject(self, error: str):
+        self.rejected += 1
+        if len(self.errors) < 5:
+            self.errors.append(error)
+
+
+def any_value(value: Optional[Dict[str, Any]]) -> Any:
+    """Convert an OTLP AnyValue into a plain Python value."""
+    if not value:
+        return None
+    if "stringValue" in value:
+        return value["stringValue"]
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return float(value["doubleValue"])
+    if "arrayValue" in value:
+        return [any_value(v) for v in value["arrayValue"].get("values", [])]
+    if "kvlistValue" in value:
+        return attributes(value["kvlistValue"].get("values", []))
+    if "bytesValue" in value:
+        return value["bytesValue"]
+    return None
+
+
+def attributes(key_values: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    return {kv["key"]: any_value(kv.get("value")) for kv in key_values or []}
+
+
+def _hex_id(raw: Optional[str], id_encoding: str) -> Optional[str]:
+    if not raw:
+        return None
+    if id_encoding == "base64":
+        raw = base64.b64decode(raw).hex()
+    raw = raw.lower()
+    return None if not raw.strip("0") else raw
+
+
+def _timestamp(*nanos: Any) -> datetime:
+    for value in nanos:
+        if value and int(value) > 0:
+            return datetime.fromtimestamp(int(value) / 1e9, tz=timezone.utc)
+    return datetime.now(timezone.utc)
+
+
+def _signal_id(*parts: Any) -> uuid.UUID:
+    key = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return uuid.uuid5(_SIGNAL_ID_NAMESPACE, key)
+
+
+def _severity_number(value: Any) -> int:
+    """SeverityNumber from a number, numeric string or name (`SEVERITY_NUMBER_WARN`, `warn`); 0 if unknown."""
+    if isinstance(value, int):
+        return value
+    name = str(value or "").strip().upper()
+    if name.isdigit():
+        return int(name)
+    name = name.removeprefix("SEVERITY_NUMBER_").rstrip("1234")
+    return _SEVERITY_NUMBERS.get(name, 0)
+
+
+def _level(record: Dict[str, Any]) -> str:
+    """
+    Level of a log record, from one SeverityNumber table whatever the encoding.
+
+    severityNumber wins; severityText only fills in when it is unset, and
+    unrecognized severities count as INFO.
+    """
+    number = _severity_number(record.get("severityNumber")) or _severity_number(record.get("severityText"))
+    for floor, level in _SEVERITY_LEVELS:
+        if number >= floor:
+            return level
+    return "INFO"
+
+
+def _resource_context(resource: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    resource_attributes = attributes((resource or {}).get("attributes"))
+    service_name = resource_attributes.get("service.name") or "unknown_service"
+    return str(service_name), resource_attributes
+
+
+def map_logs(request: Dict[str, Any], id_encoding: str = "hex") -> OtlpMappingResult:
+    """ExportLogsServiceRequest -> LogSignalV1 list."""
+    result = OtlpMappingResult()
+    for resource_logs in request.get("resourceLogs", []):
+        service_name, resource_attributes = _resource_context(resource_logs.get("resource"))
+        for scope_logs in resource_logs.get("scopeLogs", []):
+            scope = (scope_logs.get("scope") or {}).get("name")
+            for record in scope_logs.get("logRecords", []):
+                try:
+                    trace_id = _hex_id(record.get("traceId"), id_encoding)
+                    span_id = _hex_id(record.get("spanId"), id_encoding)
+                    body = any_value(record.get("body"))
+                    message = body if isinstance(body, str) else json.dumps(body, default=str)
+                    timestamp = _timestamp(record.get("timeUnixNano"), record.get("observedTimeUnixNano"))
+                    record_attributes = {**resource_attributes, **attributes(record.get("attributes"))}
+                    if span_id:
+                        record_attributes["span_id"] = span_id
+                    if scope:
+                        record_attributes["otel.scope.name"] = scope
+
+                    signal_id = _signal_id(
+                        "log", service_name, trace_id, span_id,
+                        record.get("timeUnixNano"), message, record_attributes,
+                    )
+                    result.signals.append(LogSignalV1(
+                        signal_id=signal_id,
+                        trace_id=trace_id or f"{UNTRACED_TRACE_PREFIX}{signal_id}",
+                        service_name=service_name,
+                        timestamp=timestamp,
+                        level=_level(record),
+                        message=message,
+                        attributes=record_attributes,
+                    ))
+                except (ValueError, TypeError, KeyError) as exc:
+                    result.reject(f"log record: {exc}")
+    return result
+
+
+def map_traces(request: Dict[str, Any], id_encoding: str = "hex") -> OtlpMappingResult:
+    """ExportTraceServiceRequest -> TraceSpanV1 list."""
+    result = OtlpMappingResult()
+    for resource_spans in request.get("resourceSpans", []):
+        service_name, resource_attributes = _resource_context(resource_spans.get("resource"))
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            scope = (scope_spans.get("scope") or {}).get("name")
+            for span in scope_spans.get("spans", []):
+                try:
+                    trace_id = _hex_id(span.get("traceId"), id_encoding)
+                    span_id = _hex_id(span.get("spanId"), id_encoding)
+                    if not trace_id or not span_id:
+                        raise ValueError("span without traceId/spanId")
+
+                    start = int(span.get("startTimeUnixNano") or 0)
+                    end = int(span.get("endTimeUnixNano") or 0)
+                    status = span.get("status") or {}
+                    span_attributes = {
+                        **resource_attributes,
+                        **attributes(span.get("attributes")),
+                        "span.name": span.get("name"),
+                    }
+                    if span.get("kind") is not None:
+                        span_attributes["span.kind"] = span.get("kind")
+                    if status.get("message"):
+                        span_attributes["status.message"] = status["message"]
+                    if scope:
+                        span_attributes["otel.scope.name"] = scope
+
+                    result.signals.append(TraceSpanV1(
+                        signal_id=_signal_id("span", trace_id, span_id),
+                        trace_id=trace_id,
+                        service_name=service_name,
+                        timestamp=_timestamp(start),
+                        span_id=span_id,
+                        parent_span_id=_hex_id(span.get("parentSpanId"), id_encoding),
+                        duration_ms=max(end - start, 0) / 1e6,
+                        status=_STATUS_CODES.get(status.get("code", 0), "UNSET"),
+                        attributes=span_attributes,
+                    ))
+                except (ValueError, TypeError, KeyError) as exc:
+                    result.reject(f"span: {exc}")
+    return result
+
+
+def _data_point_value(kind: str, point: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+    """Single value for a data point plus extra aggregate attributes."""
+    if kind in ("gauge", "sum"):
+        if "asDouble" in point:
+            return float(point["asDouble"]), {}
+        return float(point.get("asInt", 0)), {}
+
+    # histogram / exponentialHistogram / summary: store the mean
+    count = int(point.get("count") or 0)
+    total = float(point.get("sum") or 0.0)
+    extra = {"count": count, "sum": total}
+    for key in ("min", "max"):
+        if key in point:
+            extra[key] = float(point[key])
+    return (total / count if count else 0.0), extra
+
+
+def map_metrics(request: Dict[str, Any], id_encoding: str = "hex") -> OtlpMappingResult:
+    """ExportMetricsServiceRequest -> MetricSampleV1 list (one per data point)."""
+    result = OtlpMappingResult()
+    for resource_metrics in request.get("resourceMetrics", []):
+        service_name, resource_attributes = _resource_context(resource_metrics.get("resource"))
+        for scope_metrics in resource_metrics.get("scopeMetrics", []):
+            for metric in scope_metrics.get("metrics", []):
+                kind = next(
+                    (k for k in ("gauge", "sum", "histogram", "exponentialHistogram", "summary") if k in metric),
+                    None,
+                )
+                if kind is None:
+                    result.reject(f"metric {metric.get('name')}: unsupported data type")
+                    continue
+
+                for point in metric[kind].get("dataPoints", []):
+                    try:
+                        value, extra = _data_point_value(kind, point)
+                        point_attributes = {
+                            **resource_attributes,
+                            **attributes(point.get("attributes")),
+                            **extra,
+                            "metric.type": kind,
+                        }
+                        exemplar_trace = next(
+                            (_hex_id(e.get("traceId"), id_encoding) for e in point.get("exemplars", []) if e.get("traceId")),
+                            None,
+                        )
+
+                        signal_id = _signal_id(
+                            "metric", service_name, metric.get("name"),
+                            point.get("timeUnixNano"), point_attributes,
+                        )
+                        result.signals.append(MetricSampleV1(
+                            signal_id=signal_id,
+                            trace_id=exemplar_trace or f"{UNTRACED_TRACE_PREFIX}{signal_id}",
+                            service_name=service_name,
+                            timestamp=_timestamp(point.get("timeUnixNano"), point.get("startTimeUnixNano")),
+                            metric_name=metric["name"],
+                            value=value,
+                            unit=metric.get("unit") or "",
+                            attributes=point_attributes,
+                        ))
+                    except (ValueError, TypeError, KeyError) as exc:
+                        result.reject(f"metric {metric.get('name')}: {exc}")
+    return result
@@ -0,0 +1,272 @@
+"""
+Partition maintenance for the range-partitioned `raw_signals` table.
+
+`raw_signals` is partitioned by `timestamp` (migration 9a7d3e5c2b18) into
+one partition per RAW_SIGNALS_PARTITION_INTERVAL ("day" or "hour"), plus a
+DEFAULT partition for rows outside every range. The maintainer:
+
+- creates partitions for the current period and the next
+  RAW_SIGNALS_PARTITIONS_AHEAD periods, moving any matching rows out of the
+  default partition first;
+- applies retention: partitions entirely older than
+  RAW_SIGNALS_RETENTION_DAYS are dropped (or only detached, leaving a
+  standalone table, with RAW_SIGNALS_RETENTION_ACTION=detach, or exported
+  to the Parquet archive first with RAW_SIGNALS_RETENTION_ACTION=archive),
+  so deleting old data never runs a row-by-row DELETE. Aged rows of the
+  default partition are deleted likewise, or moved to
+  raw_signals_default_detached with detach.
+
+It runs at startup and then every RAW_SIGNALS_MAINTENANCE_INTERVAL_SECONDS.
+Replicas serialize on a transaction-level advisory lock. Run once by hand
+with `python -m app.services.partitions`.
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import settings
+from app.core.database import engine
+from app.core.logging import get_logger
+from app.services import archive
+
+logger = get_logger(__name__)
+
+PARENT = "raw_signals"
+DEFAULT_PARTITION = "raw_signals_default"
+# Where retention moves aged default-partition rows with the detach action
+DETACHED_DEFAULT = "raw_signals_default_detached"
+INTERVALS = {"day": timedelta(days=1), "hour": timedelta(hours=1)}
+_NAME_FORMATS = {"day": "%Y%m%d", "hour": "%Y%m%d%H"}
+
+# Arbitrary constant shared by all replicas
+_ADVISORY_LOCK_KEY = 0x5261775369676E
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+Bounds = Tuple[datetime, datetime]
+
+
+def period_start(ts: datetime, interval: str) -> datetime:
+    """Start of the partition period containing `ts` (UTC)."""
+    ts = ts.astimezone(timezone.utc)
+    if interval == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    return f"{PARENT}_p{start.strftime(_NAME_FORMATS[interval])}"
+
+
+def planned_partitions(now: datetime, interval: str, ahead: int) -> List[Bounds]:
+    """Current period plus `ahead` future ones."""
+    step = INTERVALS[interval]
+    start = period_start(now, interval)
+    return [(start + step * i, start + step * (i + 1)) for i in range(ahead + 1)]
+
+
+def parse_bounds(expression: str) -> Optional[Bounds]:
+    """Bounds of a `pg_get_expr(relpartbound)` string; None for DEFAULT."""
+    match = _BOUND_RE.search(expression)
+    if not match:
+        return None
+    return tuple(datetime.fromisoformat(value) for value in match.groups())
+
+
+def overlaps(bounds: Bounds, existing: Dict[str, Bounds]) -> bool:
+    start, end = bounds
+    return any(start < other_end and other_start < end for other_start, other_end in existing.values())
+
+
+class PartitionMaintainer:
+    """Background task keeping raw_signals partitions ahead of time and pruning old ones."""
+
+    def __init__(
+        self,
+        interval: str,
+        ahead: int,
+        retention_days: int,
+        retention_action: str,
+        run_every_seconds: int,
+    ):
+        if interval not in INTERVALS:
+            raise ValueError(f"partition interval must be one of {list(INTERVALS)}")
+        if retention_action not in ("drop", "detach", "archive"):
+            raise ValueError("retention action must be 'drop', 'detach' or 'archive'")
+        self.interval = interval
+        self.ahead = ahead
+        self.retention_days = retention_days
+        self.retention_action = retention_action
+        self.run_every_seconds = run_every_seconds
+        self._task: Optional[asyncio.Task] = None
+
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.partitions_created = 0
+        self.partitions_removed = 0
+        self.rows_archived = 0
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="raw-signals-partitions")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "ahead": self.ahead,
+            "retention_days": self.retention_days,
+            "retention_action": self.retention_action,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+            "partitions_created": self.partitions_created,
+            "partitions_removed": self.partitions_removed,
+            "rows_archived": self.rows_archived,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.error(f"Partition maintenance failed: {exc}", exc_info=True)
+            await asyncio.sleep(self.run_every_seconds)
+
+    async def run_once(self, now: Optional[datetime] = None):
+        """Create upcoming partitions and apply retention, in one transaction."""
+        now = now or datetime.now(timezone.utc)
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            # Partition bounds are rendered in the session time zone
+            await conn.execute(text("SET LOCAL TimeZone = 'UTC'"))
+
+            kind = await conn.scalar(text(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(:parent)"
+            ), {"parent": PARENT})
+            if kind != "p":
+                logger.warning(f"{PARENT} is not partitioned yet (run the migrations); skipping maintenance")
+                return
+
+            existing = await self._partitions(conn)
+            for bounds in planned_partitions(now, self.interval, self.ahead):
+                if not overlaps(bounds, existing):
+                    name = partition_name(bounds[0], self.interval)
+                    await self._create(conn, name, bounds)
+                    existing[name] = bounds
+
+            if self.retention_days > 0:
+                await self._apply_retention(conn, existing, now - timedelta(days=self.retention_days))
+
+        self.last_run = now
+        self.last_error = None
+
+    async def _partitions(self, conn: AsyncConnection) -> Dict[str, Bounds]:
+        rows = await conn.execute(text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:parent)
+        """), {"parent": PARENT})
+        partitions = {}
+        for name, expression in rows:
+            bounds = parse_bounds(expression)
+            if bounds:
+                partitions[name] = bounds
+        return partitions
+
+    async def _create(self, conn: AsyncConnection, name: str, bounds: Bounds):
+        params = {"start": bounds[0], "end": bounds[1]}
+        # Postgres refuses a new range that rows in the default partition
+        # already fall into (e.g. clients with skewed clocks): move them over
+        in_default = await conn.scalar(text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            f"WHERE timestamp >= :start AND timestamp < :end)"
+        ), params)
+        if in_default:
+            await conn.execute(text(
+                f"CREATE TEMPORARY TABLE _partition_move (LIKE {PARENT}) ON COMMIT DROP"
+            ))
+            await conn.execute(text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE timestamp >= :start AND timestamp < :end RETURNING *) "
+                f"INSERT INTO _partition_move SELECT * FROM moved"
+            ), params)
+
+        # DDL takes no bind parameters; bounds are our own UTC datetimes
+        await conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARENT} "
+            f"FOR VALUES FROM ('{bounds[0].isoformat()}') TO ('{bounds[1].isoformat()}')"
+        ))
+        if in_default:
+            await conn.execute(text(f"INSERT INTO {PARENT} SELECT * FROM _partition_move"))
+            await conn.execute(text("DROP TABLE _partition_move"))
+
+        self.partitions_created += 1
+        logger.info(f"Created partition {name} [{bounds[0].isoformat()}, {bounds[1].isoformat()})")
+
+    async def _apply_retention(self, conn: AsyncConnection, existing: Dict[str, Bounds], cutoff: datetime):
+        archiving = self.retention_action == "archive"
+        if archiving and not archive.available():
+            # Never drop what cannot be archived
+            raise RuntimeError("RAW_SIGNALS_RETENTION_ACTION=archive requires pyarrow")
+
+        for name, (start, end) in sorted(existing.items(), key=lambda item: item[1]):
+            if end > cutoff:
+                continue
+            if archiving:
+                self.rows_archived += await archive.archive_partition(conn, name, start, end)
+                await conn.execute(text(f"DROP TABLE {name}"))
+                logger.info(f"Retention: archived and dropped partition {name} (ends {end.isoformat()})")
+            elif self.retention_action == "detach":
+                await conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+                logger.info(f"Retention: detached partition {name} (ends {end.isoformat()})")
+            else:
+                await conn.execute(text(f"DROP TABLE {name}"))
+                logger.info(f"Retention: dropped partition {name} (ends {end.isoformat()})")
+            self.partitions_removed += 1
+
+        # Stragglers outside every range live in the small default partition
+        params = {"cutoff": cutoff}
+        if self.retention_action == "detach":
+            # Kept like detached partitions: moved to a standalone table
+            await conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {DETACHED_DEFAULT} (LIKE {PARENT} INCLUDING DEFAULTS)"
+            ))
+            await conn.execute(text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < :cutoff RETURNING *) "
+                f"INSERT INTO {DETACHED_DEFAULT} SELECT * FROM moved"
+            ), params)
+            return
+        if archiving:
+            self.rows_archived += await archive.export_range(
+                conn, DEFAULT_PARTITION, f"{DEFAULT_PARTITION}-{cutoff:%Y%m%d%H%M%S}", None, cutoff,
+            )
+        await conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < :cutoff"), params)
+
+
+partition_maintainer = PartitionMaintainer(
+    interval=settings.RAW_SIGNALS_PARTITION_INTERVAL,
+    ahead=settings.RAW_SIGNALS_PARTITIONS_AHEAD,
+    retention_days=settings.RAW_SIGNALS_RETENTION_DAYS,
+    retention_action=settings.RAW_SIGNALS_RETENTION_ACTION,
+    run_every_seconds=settings.RAW_SIGNALS_MAINTENANCE_INTERVAL_SECONDS,
+)
+
+
+if __name__ == "__main__":
+    async def _main():
+        await partition_maintainer.run_once()
+        await engine.dispose()
+        print(partition_maintainer.stats())
+
+    asyncio.run(_main())
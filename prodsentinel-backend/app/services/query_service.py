@@ -1,10 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
-from app.models.raw_signal import RawSignal
+from sqlalchemy import select, desc, tuple_
+from app.models.raw_signal import RawSignal, PAYLOAD_FILTER_PATHS, payload_field
 from app.models.incident import Incident, AnalysisResult
+from app.services import archive, counts
+from app.utils.cursor import encode_cursor, decode_cursor
 
 from typing import Optional, List, Any
 from datetime import datetime
+import asyncio
 
 async def get_signals(
     db: AsyncSession,
@@ -13,12 +16,39 @@ async def get_signals(
     signal_type: Optional[str] = None,
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
+    level: Optional[str] = None,
+    error_code: Optional[str] = None,
+    order_id: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    count: str = "exact",
 ):
     """
     Fetch signals with filtering and pagination.
+
+    Pages are ordered by `(timestamp DESC, id DESC)`. Besides the page and
+    total, returns a `next_cursor` holding the last row's key (None on the
+    last page); passing it back as `cursor` seeks just past that row
+    through the `(timestamp, id)` index, so every page costs the same as
+    the first, where an offset has to walk past all the skipped rows.
+
+    The total is computed by the `count` strategy (see app/services/counts.py)
+    and is None for `none`.
+
+    Pass `start_time`/`end_time` where possible: they prune raw_signals
+    partitions, for the count query as well as the page.
+
+    `level`, `error_code` and `order_id` match payload fields (`level`,
+    `attributes.error_code`, `attributes.order_id`) through their
+    expression indexes.
+
+    When the range reaches back to days moved to the Parquet archive, the
+    archived matches are merged in: pages continue into them, newest first,
+    and `exact` totals include them. The archive is not read at all when
+    the page is filled by rows newer than it and no exact total is asked for.
     """
+    before = decode_cursor(cursor) if cursor else None
     query = select(RawSignal)
     
     if trace_id:
@@ -31,26 +61,96 @@ async def get_signals(
         query = query.where(RawSignal.timestamp >= start_time)
     if end_time:
         query = query.where(RawSignal.timestamp <= end_time)
+    payload_filters = {"level": level, "error_code": error_code, "order_id": order_id}
+    for name, value in payload_filters.items():
+        if value:
+            query = query.where(payload_field(RawSignal.payload, *PAYLOAD_FILTER_PATHS[name]) == value)
         
     # Count total for pagination
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-    
-    # Apply limit/offset and order
-    query = query.order_by(desc(RawSignal.timestamp)).limit(limit).offset(offset)
-    
-    result = await db.execute(query)
-    signals = result.scalars().all()
-    
-    return signals, total
+    total = await counts.count(db, query, count)
+
+    if before:
+        query = query.where(tuple_(RawSignal.timestamp, RawSignal.id) < before)
+    query = query.order_by(desc(RawSignal.timestamp), desc(RawSignal.id))
+
+    if archive.covers(start_time):
+        # Both tiers' first offset+limit+1 rows, merged in page order
+        wanted = offset + limit + 1
+        result = await db.execute(query.limit(wanted))
+        rows = result.scalars().all()
+        # Rows newer than the newest archived day all sort before the
+        # archive's: when they fill the page, it only matters for the total
+        if len(rows) == wanted and rows[-1].timestamp >= archive.newest_end():
+            wanted = 0
+        archived, archived_total = [], None
+        if wanted or count == "exact":
+            archived, archived_total = await asyncio.to_thread(
+                archive.read_signals, wanted, before=before, with_total=count == "exact",
+                trace_id=trace_id, service_name=service_name, signal_type=signal_type,
+                start_time=start_time, end_time=end_time, **payload_filters,
+            )
+        merged = sorted(
+            _dedupe([*rows, *archived]),
+            key=lambda signal: (signal.timestamp, signal.id), reverse=True,
+        )
+        signals, next_cursor = _page(merged[offset:], limit)
+        if archived_total is not None:
+            total += archived_total
+        return signals, total, next_cursor
+
+    # One row past the page tells whether there is a next one
+    result = await db.execute(query.limit(limit + 1).offset(offset))
+    signals, next_cursor = _page(result.scalars().all(), limit)
+
+    return signals, total, next_cursor
+
+
+def _page(rows: List[Any], limit: int, key: str = "timestamp"):
+    """First `limit` rows and the cursor of the last one, if more rows follow."""
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(getattr(last, key), last.id)
 
-async def get_trace_signals(db: AsyncSession, trace_id: str):
+
+def _dedupe(signals: List[RawSignal]) -> List[RawSignal]:
+    # A row can briefly exist in both tiers while its range is being archived
+    seen = set()
+    unique = []
+    for signal in signals:
+        if signal.id not in seen:
+            seen.add(signal.id)
+            unique.append(signal)
+    return unique
+
+async def get_trace_signals(
+    db: AsyncSession,
+    trace_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+):
     """
     Fetch all signals for a specific trace_id, ordered by time.
+
+    raw_signals is partitioned by timestamp: without a time window every
+    partition's trace_id index is probed, with one only the partitions
+    overlapping it are. The same window limits which archived days are
+    read when it reaches back into the Parquet archive.
     """
-    query = select(RawSignal).where(RawSignal.trace_id == trace_id).order_by(RawSignal.timestamp)
+    query = select(RawSignal).where(RawSignal.trace_id == trace_id)
+    if start_time:
+        query = query.where(RawSignal.timestamp >= start_time)
+    if end_time:
+        query = query.where(RawSignal.timestamp <= end_time)
+    query = query.order_by(RawSignal.timestamp)
     result = await db.execute(query)
-    return result.scalars().all()
+    signals = result.scalars().all()
+
+    if archive.covers(start_time):
+        archived = await asyncio.to_thread(archive.read_trace, trace_id, start_time, end_time)
+        if archived:
+            signals = sorted(_dedupe([*archived, *signals]), key=lambda signal: signal.timestamp)
+    return signals
 
 
 async def get_incidents(
@@ -58,11 +158,18 @@ async def get_incidents(
     status: Optional[str] = None,
     severity: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    count: str = "exact",
 ):
     """
     Fetch incidents with optional filtering.
+
+    Ordered by `(detected_at DESC, id DESC)` and keyset-paginated like
+    `get_signals`: returns the page, the total (by the `count` strategy)
+    and a `next_cursor`.
     """
+    before = decode_cursor(cursor) if cursor else None
     query = select(Incident)
     
     if status:
@@ -71,16 +178,18 @@ async def get_incidents(
         query = query.where(Incident.severity == severity)
         
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
+    total = await counts.count(db, query, count)
     
+    if before:
+        query = query.where(tuple_(Incident.detected_at, Incident.id) < before)
+
     # Order by most recent detection
-    query = query.order_by(desc(Incident.detected_at)).limit(limit).offset(offset)
+    query = query.order_by(desc(Incident.detected_at), desc(Incident.id)).limit(limit + 1).offset(offset)
     
     result = await db.execute(query)
-    incidents = result.scalars().all()
+    incidents, next_cursor = _page(result.scalars().all(), limit, key="detected_at")
     
-    return incidents, total
+    return incidents, total, next_cursor
 
 
 async def get_incident_analysis(db: AsyncSession, incident_id: str):
@@ -0,0 +1,222 @@
+"""
+Versioned response cache for incident reads, with ETag/304.
+
+Every write to incidents or analysis_results bumps a counter in Redis,
+INCIDENTS_VERSION_KEY: ingestion after committing incident upserts, the
+pipeline after storing an analysis. A cached `/query/incidents` or
+`/query/incidents/{id}/analysis` response is valid for exactly one value of
+that counter, so reads never need a TTL to see writes.
+
+A request costs one Redis GET of the version:
+
+- its ETag is derived from the version and the normalized parameters, so a
+  poll whose `If-None-Match` still matches gets `304 Not Modified` without
+  a body being looked up, let alone Postgres
+- otherwise the serialized body comes from the in-process LRU, from Redis
+  (QUERY_CACHE_REDIS, shared by replicas), or from the database
+
+When Redis is unreachable the cache steps aside and every request reads
+Postgres, as without it.
+"""
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import QUERY_CACHE_REQUESTS
+from app.core.task_queue import get_redis
+from app.utils.cache import TTLCache
+
+logger = get_logger(__name__)
+
+
+class IncidentsVersion:
+    """
+    Bumps INCIDENTS_VERSION_KEY after incident writes, off the request path.
+
+    Bumps are coalesced to at most one per `min_interval_ms`: during an
+    error storm every ingest batch upserts incidents, and cached reads would
+    otherwise be invalidated on every flush. Readers see a write at most
+    that much later.
+    """
+
+    def __init__(self, key: str, min_interval_ms: int, redis=None):
+        self.key = key
+        self.min_interval = min_interval_ms / 1000
+        self._redis = redis or get_redis
+        self._pending: Optional[asyncio.Task] = None
+        self._last_bump = float("-inf")
+
+        self.bumps = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def changed(self):
+        """Record that incidents changed; the bump follows within `min_interval_ms`."""
+        if self._pending is not None:
+            self.coalesced += 1
+            return
+        self._pending = asyncio.get_running_loop().create_task(self._bump())
+
+    async def _bump(self):
+        delay = self._last_bump + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Writes committed from here on schedule their own bump
+        self._pending = None
+        self._last_bump = time.monotonic()
+        try:
+            await self._redis().incr(self.key)
+            self.bumps += 1
+        except RedisError as e:
+            self.failures += 1
+            logger.warning(f"Failed to bump {self.key}: {e}")
+
+    def stats(self) -> dict:
+        return {"bumps": self.bumps, "coalesced": self.coalesced, "failures": self.failures}
+
+
+class ResponseCache:
+    """Serialized responses keyed on (normalized parameters, incidents version)."""
+
+    def __init__(
+        self,
+        enabled: bool,
+        max_entries: int,
+        ttl_seconds: float,
+        use_redis: bool,
+        version_key: str,
+        redis=None,
+        prefix: str = "query-cache",
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self.version_key = version_key
+        self.prefix = prefix
+        self._redis = redis or get_redis
+        self._local = TTLCache(maxsize=max_entries, ttl_seconds=ttl_seconds)
+
+    async def respond(
+        self,
+        request: Request,
+        key: Tuple[Hashable, ...],
+        load: Callable[[], Awaitable[Optional[BaseModel]]],
+        not_found: str = "Not found",
+    ) -> Response:
+        """
+        Response for `key`, loading it with `load` on a miss.
+
+        `load` returns the response model, or None for a 404 with `not_found`
+        as detail (cached as well, e.g. an analysis that is not written yet).
+        """
+        if not self.enabled:
+            return self._render(*await self._load(load, not_found))
+
+        try:
+            version = await self._redis().get(self.version_key) or "0"
+        except RedisError as e:
+            QUERY_CACHE_REQUESTS.labels("bypass").inc()
+            logger.debug(f"Response cache bypassed, version unavailable: {e}")
+            return self._render(*await self._load(load, not_found))
+
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+        etag = f'W/"{version}-{digest}"'
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            QUERY_CACHE_REQUESTS.labels("not_modified").inc()
+            return Response(status_code=304, headers=_headers(etag))
+
+        entry = self._local.get(digest)
+        if entry is not None and entry[0] == version:
+            QUERY_CACHE_REQUESTS.labels("hit_local").inc()
+            return self._render(*entry[1:], etag)
+
+        entry = await self._redis_get(digest, version)
+        if entry is not None:
+            QUERY_CACHE_REQUESTS.labels("hit_redis").inc()
+        else:
+            QUERY_CACHE_REQUESTS.labels("miss").inc()
+            entry = (version, *await self._load(load, not_found))
+            await self._redis_set(digest, entry)
+        self._local.set(digest, entry)
+        return self._render(*entry[1:], etag)
+
+    async def _load(self, load, not_found: str) -> Tuple[int, bytes]:
+        model = await load()
+        if model is None:
+            return 404, JSONResponse({"detail": not_found}).body
+        return 200, model.model_dump_json().encode()
+
+    @staticmethod
+    def _render(status_code: int, body: bytes, etag: Optional[str] = None) -> Response:
+        # 304s only make sense for representations a client can keep
+        headers = _headers(etag) if etag and status_code == 200 else None
+        return Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+    async def _redis_get(self, digest: str, version: str):
+        if not self.use_redis:
+            return None
+        try:
+            raw = await self._redis().get(f"{self.prefix}:{digest}")
+        except RedisError as e:
+            logger.debug(f"Response cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        # "<version>:<status>:<body>"
+        cached_version, status_code, body = raw.split(":", 2)
+        if cached_version != version:
+            return None
+        return version, int(status_code), body.encode()
+
+    async def _redis_set(self, digest: str, entry: Tuple[str, int, bytes]):
+        if not self.use_redis:
+            return
+        version, status_code, body = entry
+        try:
+            await self._redis().set(
+                f"{self.prefix}:{digest}", f"{version}:{status_code}:{body.decode()}",
+                ex=max(1, int(self.ttl_seconds)),
+            )
+        except RedisError as e:
+            logger.debug(f"Response cache write failed: {e}")
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "redis": self.use_redis, **self._local.stats()}
+
+
+def _headers(etag: str) -> dict:
+    # no-cache: browsers keep the body but revalidate with If-None-Match every time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    ours = etag.removeprefix("W/")
+    return any(
+        tag.strip() == "*" or tag.strip().removeprefix("W/") == ours
+        for tag in if_none_match.split(",")
+    )
+
+
+incidents_version = IncidentsVersion(
+    key=settings.INCIDENTS_VERSION_KEY,
+    min_interval_ms=settings.INCIDENTS_VERSION_BUMP_INTERVAL_MS,
+)
+
+response_cache = ResponseCache(
+    enabled=settings.QUERY_CACHE_ENABLED,
+    max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS,
+    use_redis=settings.QUERY_CACHE_REDIS,
+    version_key=settings.INCIDENTS_VERSION_KEY,
+)
@@ -0,0 +1,351 @@
+"""
+Multi-resolution metric rollups.
+
+Every stored metric sample is folded into `metric_rollups` at 1-minute,
+1-hour and 1-day resolution per (service_name, metric_name): count, sum,
+min, max and a LogBucketSketch for quantiles. The update is one multi-row
+`INSERT ... ON CONFLICT DO UPDATE` in the ingest transaction, so rollups
+never drift from `raw_signals`; sketches are merged server-side by summing
+bucket counts.
+
+Fine resolutions are pruned after their retention (METRIC_ROLLUP_*_RETENTION_DAYS).
+Series queries pick the finest resolution that still covers the requested
+range and fits the point budget.
+
+History ingested before rollups existed can be rebuilt with
+`python -m app.services.rollups --backfill-days N`.
+"""
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.models.metric_rollup import MetricRollup
+from app.models.raw_signal import RawSignal
+from app.utils.sketch import LogBucketSketch
+
+logger = get_logger(__name__)
+
+# Finest first
+RESOLUTIONS: Dict[str, timedelta] = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+RollupKey = Tuple[str, str, str, datetime]
+
+
+def retention_days() -> Dict[str, int]:
+    """Retention per resolution; 0 keeps forever."""
+    return {
+        "1m": settings.METRIC_ROLLUP_1M_RETENTION_DAYS,
+        "1h": settings.METRIC_ROLLUP_1H_RETENTION_DAYS,
+        "1d": settings.METRIC_ROLLUP_1D_RETENTION_DAYS,
+    }
+
+
+def bucket_start(ts: datetime, resolution: str) -> datetime:
+    ts = ts.astimezone(timezone.utc)
+    if resolution == "1m":
+        return ts.replace(second=0, microsecond=0)
+    if resolution == "1h":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class _Aggregate:
+    __slots__ = ("count", "sum", "min", "max", "sketch")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.sketch = LogBucketSketch()
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sketch.add(value)
+
+
+def aggregate_samples(
+    samples: Iterable[Tuple[str, str, datetime, float]],
+    aggregates: Optional[Dict[RollupKey, _Aggregate]] = None,
+) -> Dict[RollupKey, _Aggregate]:
+    """Fold (service_name, metric_name, timestamp, value) samples into buckets of every resolution."""
+    aggregates = {} if aggregates is None else aggregates
+    for service_name, metric_name, timestamp, value in samples:
+        for resolution in RESOLUTIONS:
+            key = (resolution, service_name, metric_name, bucket_start(timestamp, resolution))
+            aggregate = aggregates.get(key)
+            if aggregate is None:
+                aggregate = aggregates[key] = _Aggregate()
+            aggregate.add(value)
+    return aggregates
+
+
+def _metric_samples(rows: Iterable[dict]):
+    for row in rows:
+        if row["signal_type"] != "metric":
+            continue
+        payload = row["payload"]
+        try:
+            metric_name, value = payload["metric_name"], float(payload["value"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        yield row["service_name"], metric_name, row["timestamp"], value
+
+
+async def _upsert(db: AsyncSession, aggregates: Dict[RollupKey, _Aggregate]):
+    # Sorted so concurrent upserts lock rollup rows in the same order
+    values = [
+        {
+            "resolution": resolution,
+            "service_name": service_name,
+            "metric_name": metric_name,
+            "bucket_start": start,
+            "count": agg.count,
+            "sum": agg.sum,
+            "min": agg.min,
+            "max": agg.max,
+            "sketch": agg.sketch.to_dict(),
+        }
+        for (resolution, service_name, metric_name, start), agg in sorted(aggregates.items(), key=lambda item: item[0])
+    ]
+    if not values:
+        return
+
+    stmt = insert(MetricRollup).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            MetricRollup.resolution, MetricRollup.service_name,
+            MetricRollup.metric_name, MetricRollup.bucket_start,
+        ],
+        set_={
+            "count": MetricRollup.count + stmt.excluded.count,
+            "sum": MetricRollup.sum + stmt.excluded.sum,
+            "min": func.least(MetricRollup.min, stmt.excluded.min),
+            "max": func.greatest(MetricRollup.max, stmt.excluded.max),
+            "sketch": literal_column(
+                "(SELECT jsonb_object_agg(key, total) FROM ("
+                "SELECT key, sum(value::bigint) AS total FROM ("
+                "SELECT * FROM jsonb_each_text(metric_rollups.sketch) "
+                "UNION ALL SELECT * FROM jsonb_each_text(excluded.sketch)"
+                ") AS entries GROUP BY key) AS merged)"
+            ),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def update_rollups(db: AsyncSession, rows: Iterable[dict]):
+    """
+    Fold newly inserted raw_signals rows into the rollups (no commit).
+
+    Non-metric rows are ignored.
+    """
+    if not settings.METRIC_ROLLUPS_ENABLED:
+        return
+    await _upsert(db, aggregate_samples(_metric_samples(rows)))
+
+
+def choose_resolution(
+    start_time: datetime,
+    end_time: datetime,
+    max_points: int,
+    now: Optional[datetime] = None,
+) -> str:
+    """
+    Finest resolution whose retention still covers `start_time` and whose
+    bucket count over the range fits `max_points`; the coarsest one if none do.
+    """
+    now = now or datetime.now(timezone.utc)
+    retention = retention_days()
+    span = end_time - start_time
+    for resolution, step in RESOLUTIONS.items():
+        days = retention[resolution]
+        if days and start_time < now - timedelta(days=days):
+            continue
+        if span / step <= max_points:
+            return resolution
+    return list(RESOLUTIONS)[-1]
+
+
+async def get_metric_series(
+    db: AsyncSession,
+    service_name: str,
+    metric_name: str,
+    start_time: datetime,
+    end_time: datetime,
+    resolution: str,
+) -> List[dict]:
+    """
+    Points of one series at `resolution` for the buckets overlapping
+    [start_time, end_time], oldest first, with avg and sketch quantiles.
+    """
+    query = (
+        select(MetricRollup)
+        .where(
+            MetricRollup.resolution == resolution,
+            MetricRollup.service_name == service_name,
+            MetricRollup.metric_name == metric_name,
+            MetricRollup.bucket_start >= bucket_start(start_time, resolution),
+            MetricRollup.bucket_start <= end_time,
+        )
+        .order_by(MetricRollup.bucket_start)
+    )
+    result = await db.execute(query)
+    return [rollup_point(row) for row in result.scalars().all()]
+
+
+def rollup_point(row: MetricRollup) -> dict:
+    sketch = LogBucketSketch(row.sketch)
+    return {
+        "bucket_start": row.bucket_start,
+        "count": row.count,
+        "sum": row.sum,
+        "min": row.min,
+        "max": row.max,
+        "avg": row.sum / row.count if row.count else None,
+        "p50": sketch.quantile(0.5),
+        "p95": sketch.quantile(0.95),
+        "p99": sketch.quantile(0.99),
+    }
+
+
+async def prune_rollups(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """Delete rollups past their resolution's retention; returns rows deleted."""
+    now = now or datetime.now(timezone.utc)
+    deleted = 0
+    for resolution, days in retention_days().items():
+        if not days:
+            continue
+        result = await db.execute(
+            delete(MetricRollup).where(
+                MetricRollup.resolution == resolution,
+                MetricRollup.bucket_start < now - timedelta(days=days),
+            )
+        )
+        deleted += result.rowcount or 0
+    await db.commit()
+    return deleted
+
+
+class RollupMaintainer:
+    """Background task pruning expired fine-grained rollups."""
+
+    def __init__(self, run_every_seconds: int):
+        self.run_every_seconds = run_every_seconds
+        self._task: Optional[asyncio.Task] = None
+
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.rows_pruned = 0
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="metric-rollups-prune")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.METRIC_ROLLUPS_ENABLED,
+            "retention_days": retention_days(),
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+            "rows_pruned": self.rows_pruned,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.error(f"Metric rollup pruning failed: {exc}", exc_info=True)
+            await asyncio.sleep(self.run_every_seconds)
+
+    async def run_once(self, now: Optional[datetime] = None):
+        now = now or datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            pruned = await prune_rollups(db, now)
+        self.rows_pruned += pruned
+        if pruned:
+            logger.info(f"Pruned {pruned} expired metric rollup rows")
+        self.last_run = now
+        self.last_error = None
+
+
+async def backfill(days: int, now: Optional[datetime] = None):
+    """
+    Rebuild the rollups of the last `days` whole days from raw_signals.
+
+    Each day is replaced in its own transaction (delete, re-aggregate,
+    upsert). Meant for history stored before rollups existed; the current
+    day is left alone, as ingestion is still adding to it.
+    """
+    today = bucket_start(now or datetime.now(timezone.utc), "1d")
+    for offset in range(days, 0, -1):
+        day_start = today - timedelta(days=offset)
+        day_end = day_start + timedelta(days=1)
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(MetricRollup).where(
+                MetricRollup.bucket_start >= day_start,
+                MetricRollup.bucket_start < day_end,
+            ))
+            result = await db.stream(
+                select(
+                    RawSignal.signal_type, RawSignal.service_name,
+                    RawSignal.timestamp, RawSignal.payload,
+                ).where(
+                    RawSignal.signal_type == "metric",
+                    RawSignal.timestamp >= day_start,
+                    RawSignal.timestamp < day_end,
+                ).execution_options(yield_per=5000)
+            )
+            aggregates: Dict[RollupKey, _Aggregate] = {}
+            samples = 0
+            async for chunk in result.mappings().partitions():
+                aggregate_samples(_metric_samples(chunk), aggregates)
+                samples += len(chunk)
+            await _upsert(db, aggregates)
+            await db.commit()
+        logger.info(f"Backfilled metric rollups for {day_start.date()}: {samples} samples")
+
+
+rollup_maintainer = RollupMaintainer(run_every_seconds=settings.METRIC_ROLLUP_MAINTENANCE_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Metric rollup maintenance")
+    parser.add_argument("--backfill-days", type=int, default=0,
+                        help="Rebuild rollups of the last N whole days from raw_signals")
+    args = parser.parse_args()
+
+    async def _main():
+        if args.backfill_days:
+            await backfill(args.backfill_days)
+        await rollup_maintainer.run_once()
+        await engine.dispose()
+        print(rollup_maintainer.stats())
+
+    asyncio.run(_main())
@@ -0,0 +1,223 @@
+"""
+Ingest-time sampling of low-value signals.
+
+Head sampling keeps a configured fraction of signals per service and level,
+for example `{"*:INFO": 0.1, "checkout-service:DEBUG": 0}`. Keys are
+`<service>:<level>`, either side may be `*`, and the most specific match
+wins; unmatched signals are always kept. The level is the log level, the
+span status for trace spans, and `METRIC` for metric samples. Decisions hash
+the trace_id, so a kept trace keeps all of its signals of that level and
+lower rates select subsets of higher ones.
+
+Signals the triage rules flag as important (ERROR/CRITICAL logs, errored
+spans, high-latency metrics, ...) are never sampled out.
+
+In tail mode, signals not selected by the head rates are held in memory for
+`tail_window_seconds` instead of being dropped. If an important signal for
+the same trace arrives within the window, the held signals are released and
+stored with it, and the rest of the trace is kept; otherwise they expire.
+
+Every stored signal carries the probability it was kept with
+(`signal.sample_rate`, written to the payload when below 1), so volumes can
+be re-weighted in queries by summing `1 / sample_rate`.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.incident import IncidentSeverity
+from app.schemas.common import BaseSignal
+from app.services.triage import triage_engine, SEVERITY_RANK
+from app.utils.cache import TTLCache
+
+logger = get_logger(__name__)
+
+SAMPLING_MODES = ("off", "head", "tail")
+
+# Held signals per trace beyond which further ones are dropped outright
+_MAX_HELD_PER_TRACE = 1000
+
+
+def _signal_level(signal: BaseSignal) -> str:
+    level = getattr(signal, "level", None) or getattr(signal, "status", None)
+    return str(level).upper() if level else "METRIC"
+
+
+def _trace_fraction(trace_id: str) -> float:
+    """Stable pseudo-random position of a trace in [0, 1)."""
+    digest = hashlib.blake2b(trace_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+class _HeldTrace:
+    __slots__ = ("held_at", "signals")
+
+    def __init__(self, held_at: float):
+        self.held_at = held_at
+        self.signals: List[Tuple[BaseSignal, str]] = []
+
+
+class SignalSampler:
+    """Head/tail sampler applied by the ingest routes before storage."""
+
+    def __init__(
+        self,
+        mode: str,
+        head_rates: Dict[str, float],
+        tail_window_seconds: float,
+        tail_max_traces: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"sampling mode must be one of {SAMPLING_MODES}")
+        for key, rate in head_rates.items():
+            if ":" not in key or not 0 <= rate <= 1:
+                raise ValueError(f"invalid head sampling rate {key!r}: {rate!r}")
+
+        self.mode = mode
+        self.head_rates = dict(head_rates)
+        self.tail_window_seconds = tail_window_seconds
+        self.tail_max_traces = tail_max_traces
+        self._clock = clock
+
+        # Insertion order == hold order, so expiry only looks at the front
+        self._held: "OrderedDict[str, _HeldTrace]" = OrderedDict()
+        self._promoted = TTLCache(maxsize=tail_max_traces, ttl_seconds=tail_window_seconds, clock=clock)
+        self._rate_cache: Dict[Tuple[str, str], float] = {}
+
+        self.kept: Dict[str, int] = {}
+        self.dropped: Dict[str, int] = {}
+        self.promoted_traces = 0
+        self.released_signals = 0
+        self.expired_signals = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def rate(self, service_name: str, level: str) -> float:
+        """Head sampling rate for a service and level (1.0 if unconfigured)."""
+        cached = self._rate_cache.get((service_name, level))
+        if cached is not None:
+            return cached
+        rate = 1.0
+        for key in (f"{service_name}:{level}", f"{service_name}:*", f"*:{level}", "*:*"):
+            if key in self.head_rates:
+                rate = self.head_rates[key]
+                break
+        self._rate_cache[(service_name, level)] = rate
+        return rate
+
+    def sample(self, signals: List[BaseSignal]) -> List[BaseSignal]:
+        """
+        Return the signals to store now, in arrival order, with sample_rate set.
+
+        In tail mode the result may include previously held signals of a
+        trace that has just turned important.
+        """
+        if not self.enabled:
+            return signals
+
+        now = self._clock()
+        self._expire(now)
+
+        keep: List[BaseSignal] = []
+        for signal in signals:
+            level = _signal_level(signal)
+            key = f"{signal.service_name}:{level}"
+
+            if self._is_important(signal):
+                if self.mode == "tail":
+                    keep.extend(self._promote(signal.trace_id))
+                self._keep(keep, signal, key, 1.0)
+                continue
+
+            if self.mode == "tail" and self._promoted.get(signal.trace_id):
+                self._keep(keep, signal, key, 1.0)
+                continue
+
+            rate = self.rate(signal.service_name, level)
+            if rate >= 1.0 or _trace_fraction(signal.trace_id) < rate:
+                self._keep(keep, signal, key, rate)
+            elif self.mode == "tail":
+                self._hold(signal, key, now)
+            else:
+                self.dropped[key] = self.dropped.get(key, 0) + 1
+        return keep
+
+    def stats(self) -> dict:
+        stats = {
+            "mode": self.mode,
+            "kept": dict(self.kept),
+            "dropped": dict(self.dropped),
+        }
+        if self.mode == "tail":
+            stats["tail"] = {
+                "window_seconds": self.tail_window_seconds,
+                "held_traces": len(self._held),
+                "held_signals": sum(len(t.signals) for t in self._held.values()),
+                "promoted_traces": self.promoted_traces,
+                "released_signals": self.released_signals,
+                "expired_signals": self.expired_signals,
+            }
+        return stats
+
+    def _is_important(self, signal: BaseSignal) -> bool:
+        decision = triage_engine.evaluate(signal.signal_type.value, signal.model_dump(mode="json"))
+        return decision.trigger or SEVERITY_RANK[decision.severity] >= SEVERITY_RANK[IncidentSeverity.HIGH]
+
+    def _keep(self, keep: List[BaseSignal], signal: BaseSignal, key: str, rate: float):
+        signal._sample_rate = rate
+        keep.append(signal)
+        self.kept[key] = self.kept.get(key, 0) + 1
+
+    def _hold(self, signal: BaseSignal, key: str, now: float):
+        held = self._held.get(signal.trace_id)
+        if held is None:
+            if len(self._held) >= self.tail_max_traces:
+                _, evicted = self._held.popitem(last=False)
+                self._drop_held(evicted)
+            held = self._held[signal.trace_id] = _HeldTrace(now)
+        if len(held.signals) >= _MAX_HELD_PER_TRACE:
+            self.dropped[key] = self.dropped.get(key, 0) + 1
+            return
+        held.signals.append((signal, key))
+
+    def _promote(self, trace_id: str) -> List[BaseSignal]:
+        """Mark a trace as worth keeping and release what was held for it."""
+        if not self._promoted.get(trace_id):
+            self._promoted.set(trace_id, True)
+            self.promoted_traces += 1
+
+        held: Optional[_HeldTrace] = self._held.pop(trace_id, None)
+        if held is None:
+            return []
+        released = []
+        for signal, key in held.signals:
+            self._keep(released, signal, key, 1.0)
+        self.released_signals += len(released)
+        logger.debug(f"Tail sampling kept trace {trace_id}: released {len(released)} held signals")
+        return released
+
+    def _expire(self, now: float):
+        while self._held:
+            trace_id, held = next(iter(self._held.items()))
+            if now - held.held_at < self.tail_window_seconds:
+                break
+            del self._held[trace_id]
+            self._drop_held(held)
+
+    def _drop_held(self, held: _HeldTrace):
+        for _, key in held.signals:
+            self.dropped[key] = self.dropped.get(key, 0) + 1
+        self.expired_signals += len(held.signals)
+
+
+sampler = SignalSampler(
+    mode=settings.SAMPLING_MODE,
+    head_rates=settings.SAMPLING_HEAD_RATES,
+    tail_window_seconds=settings.SAMPLING_TAIL_WINDOW_SECONDS,
+    tail_max_traces=settings.SAMPLING_TAIL_MAX_TRACES,
+)
@@ -0,0 +1,366 @@
+"""
+Redis Streams ingest queue (INGEST_MODE=redis_stream).
+
+The API only validates signals and XADDs them to INGEST_REDIS_STREAM_KEY, so its
+latency no longer depends on Postgres. Separate writer processes
+(`python -m app.services.signal_stream`) consume the stream as the
+INGEST_REDIS_STREAM_GROUP consumer group: each reads up to INGEST_REDIS_STREAM_BATCH
+entries, stores them with `ingest_signals_batch` (raw_signals, incidents,
+rollups, triage and analysis triggers in one transaction) and only then
+acknowledges and deletes them. Writers scale horizontally: the group hands
+every entry to exactly one of them.
+
+An entry stays pending until it is stored. While Postgres is unavailable a
+writer backs off and retries its own pending entries; entries pending on a
+writer that died are taken over with XAUTOCLAIM once idle for
+INGEST_REDIS_STREAM_CLAIM_IDLE_MS. Entries that can never be stored (malformed, or
+rejected by the database on their own) are moved to `<stream>:dead`.
+Inserts are idempotent on signal_id, so an entry written twice (a writer
+crashing between commit and ack) is stored once.
+
+Entries are acked and deleted together, so the stream length is the
+backlog; publishing answers 503 once it exceeds INGEST_REDIS_STREAM_MAX_LEN.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from redis.exceptions import RedisError, ResponseError
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import STREAM_LAG, STREAM_PENDING, STREAM_ENTRIES, STREAM_WRITE_SECONDS
+from app.core.task_queue import get_redis
+from app.schemas.common import BaseSignal
+from app.services.spool import spool, db_unavailable, decode_record, encode_record
+
+logger = get_logger(__name__)
+
+# Stream entry field holding one spool-encoded signal
+FIELD = "s"
+
+Entry = Tuple[str, Optional[Dict[str, str]]]
+
+
+class StreamFull(Exception):
+    """Raised when the stream backlog exceeds INGEST_REDIS_STREAM_MAX_LEN."""
+
+
+# -- Publishing (API side) --------------------------------------------------
+
+class SignalStreamPublisher:
+    """XADDs signals; the backlog is re-read at most once per second, in the same round trip."""
+
+    def __init__(self, stream: str, max_len: int):
+        self.stream = stream
+        self.max_len = max_len
+        self.backlog = 0
+        self._backlog_checked = 0.0
+        self.published_total = 0
+
+    async def publish(self, signals: Sequence[BaseSignal]):
+        """
+        Raises:
+            StreamFull: If the backlog is over INGEST_REDIS_STREAM_MAX_LEN.
+            RedisError: If Redis is unavailable.
+        """
+        if not signals:
+            return
+        if self.backlog >= self.max_len:
+            raise StreamFull(f"ingest stream backlog over {self.max_len} entries")
+
+        check = time.monotonic() - self._backlog_checked >= 1.0
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for signal in signals:
+                pipe.xadd(self.stream, {FIELD: encode_record(signal)})
+            if check:
+                pipe.xlen(self.stream)
+            results = await pipe.execute()
+        if check:
+            self.backlog = results[-1]
+            self._backlog_checked = time.monotonic()
+        self.published_total += len(signals)
+
+    def stats(self) -> dict:
+        return {
+            "stream": self.stream,
+            "backlog": self.backlog,
+            "max_len": self.max_len,
+            "published_total": self.published_total,
+        }
+
+
+publisher = SignalStreamPublisher(
+    stream=settings.INGEST_REDIS_STREAM_KEY,
+    max_len=settings.INGEST_REDIS_STREAM_MAX_LEN,
+)
+
+
+async def publish_or_write(signals: Sequence[BaseSignal], write: Callable[[], Awaitable[object]]):
+    """
+    Hand validated signals to storage according to INGEST_MODE: XADD them
+    in redis_stream mode, otherwise run `write` (the database write) through the
+    spool.
+    """
+    if settings.INGEST_MODE == "redis_stream":
+        await publisher.publish(signals)
+        return
+    await spool.write_or_spool(signals, write)
+
+
+# -- Writing (consumer side) ------------------------------------------------
+
+async def _write_to_db(signals: Sequence[BaseSignal]):
+    from app.core.database import AsyncSessionLocal
+    from app.services.ingestion_service import ingest_signals_batch
+
+    async with AsyncSessionLocal() as db:
+        await ingest_signals_batch(db=db, signals=signals)
+
+
+class StreamWriter:
+    """One consumer of the writer group."""
+
+    def __init__(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        batch: int,
+        block_ms: int,
+        claim_idle_ms: int,
+        claim_interval_seconds: float,
+        retry_seconds: float = 1.0,
+        writer: Optional[Callable[[Sequence[BaseSignal]], Awaitable[object]]] = None,
+    ):
+        self.stream = stream
+        self.dead_stream = f"{stream}:dead"
+        self.group = group
+        self.consumer = consumer
+        self.batch = batch
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval_seconds = claim_interval_seconds
+        self.retry_seconds = retry_seconds
+        self._writer = writer or _write_to_db
+
+        # Own pending entries (from a failed write or a previous run) go first
+        self._retry_pending = True
+        self._last_claim = 0.0
+        self._last_lag = 0.0
+
+        self.written_total = 0
+        self.claimed_total = 0
+        self.dead_total = 0
+        self.lag: Optional[int] = None
+        self.pending: Optional[int] = None
+        self.last_error: Optional[str] = None
+
+    async def ensure_group(self):
+        try:
+            await get_redis().xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def run(self, stop: asyncio.Event):
+        await self.ensure_group()
+        logger.info(f"Stream writer {self.consumer} consuming {self.stream} as {self.group}")
+        while not stop.is_set():
+            try:
+                await self.run_once()
+            except Exception as exc:
+                self.last_error = repr(exc)
+                self._retry_pending = True
+                level = logger.warning if db_unavailable(exc) or isinstance(exc, RedisError) else logger.error
+                level(f"Stream write failed, retrying in {self.retry_seconds}s: {exc!r}")
+                try:
+                    await asyncio.wait_for(stop.wait(), self.retry_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_once(self) -> int:
+        """Reclaim if due, then read and store one batch. Returns entries handled."""
+        now = time.monotonic()
+        if now - self._last_claim >= self.claim_interval_seconds:
+            self._last_claim = now
+            await self.reclaim()
+        if now - self._last_lag >= 1.0:
+            self._last_lag = now
+            await self.refresh_lag()
+
+        redis = get_redis()
+        if self._retry_pending:
+            response = await redis.xreadgroup(self.group, self.consumer, {self.stream: "0"}, count=self.batch)
+            entries = response[0][1] if response else []
+            if not entries:
+                self._retry_pending = False
+        if not self._retry_pending:
+            response = await redis.xreadgroup(
+                self.group, self.consumer, {self.stream: ">"}, count=self.batch, block=self.block_ms,
+            )
+            entries = response[0][1] if response else []
+
+        await self._store(entries)
+        return len(entries)
+
+    async def reclaim(self) -> int:
+        """Take over entries left pending by writers that stopped, and forget idle consumers."""
+        redis = get_redis()
+        claimed = 0
+        start = "0-0"
+        while True:
+            response = await redis.xautoclaim(
+                self.stream, self.group, self.consumer, self.claim_idle_ms, start_id=start, count=self.batch,
+            )
+            start, entries = response[0], response[1]
+            if entries:
+                claimed += len(entries)
+                await self._store(entries)
+            if start in ("0-0", b"0-0"):
+                break
+        if claimed:
+            self.claimed_total += claimed
+            logger.warning(f"Reclaimed {claimed} stream entries left pending by other writers")
+
+        for consumer in await redis.xinfo_consumers(self.stream, self.group):
+            if (consumer["name"] != self.consumer and not consumer["pending"]
+                    and consumer["idle"] > self.claim_idle_ms * 10):
+                await redis.xgroup_delconsumer(self.stream, self.group, consumer["name"])
+        return claimed
+
+    async def refresh_lag(self):
+        redis = get_redis()
+        length = await redis.xlen(self.stream)
+        for group in await redis.xinfo_groups(self.stream):
+            if group["name"] == self.group:
+                self.pending = group["pending"]
+                # `lag` is Redis 7+; acked entries are deleted, so the rest of the stream is undelivered
+                lag = group.get("lag")
+                self.lag = lag if lag is not None else max(length - self.pending, 0)
+        STREAM_LAG.set(self.lag or 0)
+        STREAM_PENDING.set(self.pending or 0)
+
+    async def _store(self, entries: List[Entry]):
+        if not entries:
+            return
+        done, dead = await self.handle(entries)
+        redis = get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for entry_id, record, error in dead:
+                pipe.xadd(self.dead_stream, {FIELD: record, "id": entry_id, "error": error[:500]})
+            pipe.xack(self.stream, self.group, *done)
+            pipe.xdel(self.stream, *done)
+            await pipe.execute()
+        self.dead_total += len(dead)
+        if dead:
+            logger.error(f"Moved {len(dead)} unstorable stream entries to {self.dead_stream}")
+
+    async def handle(self, entries: List[Entry]) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+        """
+        Store the signals of `entries`.
+
+        Returns:
+            (ids to acknowledge, dead letters as (id, record, error))
+
+        Raises:
+            The write's exception when Postgres is unavailable; nothing is
+            acknowledged then, and the entries stay pending for a retry.
+        """
+        done, dead = [], []
+        signals: Dict[object, BaseSignal] = {}
+        records: Dict[object, Tuple[str, str]] = {}
+        for entry_id, fields in entries:
+            record = (fields or {}).get(FIELD)
+            signal = decode_record(record.encode()) if record else None
+            if signal is None:
+                if record:
+                    dead.append((entry_id, record, "malformed entry"))
+                done.append(entry_id)  # deleted entries come back with no fields
+                continue
+            signals[signal.signal_id] = signal
+            records[signal.signal_id] = (entry_id, record)
+            done.append(entry_id)
+
+        refused = 0
+        started = time.perf_counter()
+        try:
+            await self._writer(list(signals.values()))
+        except Exception as exc:
+            if db_unavailable(exc):
+                raise
+            # Something in the batch is refused: store one by one to isolate it
+            logger.warning(f"Batch of {len(signals)} stream entries refused ({exc!r}); retrying one by one")
+            for signal_id, signal in signals.items():
+                try:
+                    await self._writer([signal])
+                except Exception as single_exc:
+                    if db_unavailable(single_exc):
+                        raise
+                    entry_id, record = records[signal_id]
+                    dead.append((entry_id, record, repr(single_exc)))
+                    refused += 1
+        STREAM_WRITE_SECONDS.observe(time.perf_counter() - started)
+
+        stored = len(signals) - refused
+        self.written_total += stored
+        STREAM_ENTRIES.labels("written").inc(stored)
+        STREAM_ENTRIES.labels("dead").inc(len(dead))
+        return done, dead
+
+    def stats(self) -> dict:
+        return {
+            "consumer": self.consumer,
+            "group": self.group,
+            "lag": self.lag,
+            "pending": self.pending,
+            "written_total": self.written_total,
+            "claimed_total": self.claimed_total,
+            "dead_total": self.dead_total,
+            "last_error": self.last_error,
+        }
+
+
+def make_writer(consumer: Optional[str] = None) -> StreamWriter:
+    return StreamWriter(
+        stream=settings.INGEST_REDIS_STREAM_KEY,
+        group=settings.INGEST_REDIS_STREAM_GROUP,
+        consumer=consumer or settings.INGEST_REDIS_STREAM_CONSUMER or f"{socket.gethostname()}-{os.getpid()}",
+        batch=settings.INGEST_REDIS_STREAM_BATCH,
+        block_ms=settings.INGEST_REDIS_STREAM_BLOCK_MS,
+        claim_idle_ms=settings.INGEST_REDIS_STREAM_CLAIM_IDLE_MS,
+        claim_interval_seconds=settings.INGEST_REDIS_STREAM_CLAIM_INTERVAL_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    import signal as signals_module
+
+    parser = argparse.ArgumentParser(description="Consume the ingest stream into Postgres")
+    parser.add_argument("--consumer", default=None, help="Consumer name (default host-pid)")
+    parser.add_argument("--metrics-port", type=int, default=settings.INGEST_REDIS_STREAM_WRITER_METRICS_PORT,
+                        help="Serve Prometheus metrics on this port; 0 disables")
+    args = parser.parse_args()
+
+    async def _main():
+        from app.core import metrics
+        from app.core.database import engine
+        from app.core.task_queue import close_task_queue
+
+        if args.metrics_port:
+            metrics.start_http_server(args.metrics_port)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signals_module.SIGINT, signals_module.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        writer = make_writer(args.consumer)
+        try:
+            await writer.run(stop)
+        finally:
+            logger.info(f"Stream writer stopped: {writer.stats()}")
+            await close_task_queue()
+            await engine.dispose()
+
+    asyncio.run(_main())
@@ -0,0 +1,406 @@
+"""
+Durable local spool for signals Postgres cannot take right now.
+
+When a write fails because the database is unreachable, or takes longer
+than SPOOL_DB_TIMEOUT_MS, the signals are appended to an on-disk log under
+SPOOL_PATH instead of being lost, and the request is acknowledged once the
+append is fsynced. The spool then turns "degraded": later writes go to
+the spool directly, without waiting for the database to time out again,
+until a replay batch succeeds.
+
+Layout: append-only segment files `<created_ms>-<seq>.seg`, rotated at
+SPOOL_SEGMENT_MAX_BYTES. Each record is one line, `<crc32> <json>`; torn or
+corrupt lines (a crash mid-append) are skipped on replay. Concurrent
+appends within SPOOL_FSYNC_MS share one fsync.
+
+A background replayer seals the active segment and drains segments
+oldest first into Postgres in batches of SPOOL_REPLAY_BATCH, deleting a
+segment once all of it is stored. Inserts are idempotent on signal_id, so
+a segment replayed twice (crash between insert and delete) stores nothing
+twice. Degraded appends are never checked by the database, so a batch it
+refuses for reasons other than availability is replayed one record at a
+time, and the refused records are moved to `rejected.seg` (never replayed)
+instead of blocking every segment behind them.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+import zlib
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+from sqlalchemy.exc import DBAPIError, OperationalError, InterfaceError, TimeoutError as PoolTimeoutError
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.common import BaseSignal
+from app.schemas.signals import parse_signal
+
+logger = get_logger(__name__)
+
+_SEGMENT_RE = re.compile(r"^(\d{13})-(\d{6})\.seg$")
+# Quarantine of records the database refused on replay; same record format
+REJECTED_FILE = "rejected.seg"
+
+# Failures that mean "Postgres is unavailable or too slow", as opposed to
+# bad data, which would fail again on replay
+_DB_UNAVAILABLE = (OperationalError, InterfaceError, PoolTimeoutError, OSError, asyncio.TimeoutError)
+
+
+class SpoolFull(Exception):
+    """Raised when an append would exceed SPOOL_MAX_BYTES."""
+
+
+def db_unavailable(exc: BaseException) -> bool:
+    if isinstance(exc, DBAPIError) and exc.connection_invalidated:
+        return True
+    return isinstance(exc, _DB_UNAVAILABLE)
+
+
+def encode_record(signal: BaseSignal) -> bytes:
+    body = json.dumps(
+        {"signal": signal.model_dump(mode="json"), "sample_rate": signal.sample_rate},
+        separators=(",", ":"),
+    ).encode()
+    return b"%08x %s\n" % (zlib.crc32(body), body)
+
+
+def decode_record(line: bytes) -> Optional[BaseSignal]:
+    """The signal of a spool line, or None if the line is torn or corrupt."""
+    crc, _, body = line.rstrip(b"\n").partition(b" ")
+    try:
+        if int(crc, 16) != zlib.crc32(body):
+            return None
+        record = json.loads(body)
+        signal = parse_signal(record["signal"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    signal._sample_rate = record.get("sample_rate", 1.0)
+    return signal
+
+
+def _read_segment(path: str) -> Tuple[List[BaseSignal], int]:
+    signals, corrupt = [], 0
+    with open(path, "rb") as f:
+        for line in f:
+            signal = decode_record(line)
+            if signal is None:
+                corrupt += 1
+            else:
+                signals.append(signal)
+    return signals, corrupt
+
+
+def _count_lines(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+class SignalSpool:
+    """Segmented append-only spool with group fsync and a background replayer."""
+
+    def __init__(
+        self,
+        directory: str,
+        enabled: bool,
+        segment_max_bytes: int,
+        max_bytes: int,
+        fsync_ms: int,
+        db_timeout_ms: int,
+        replay_batch: int,
+        replay_interval_seconds: float,
+        writer: Optional[Callable[[Sequence[BaseSignal]], Awaitable[object]]] = None,
+    ):
+        self.directory = directory
+        self.enabled = enabled
+        self.segment_max_bytes = segment_max_bytes
+        self.max_bytes = max_bytes
+        self.fsync_ms = fsync_ms
+        self.db_timeout_ms = db_timeout_ms
+        self.replay_batch = replay_batch
+        self.replay_interval_seconds = replay_interval_seconds
+        self._writer = writer or _write_to_db
+
+        self._lock = asyncio.Lock()
+        self._file = None
+        self._active_bytes = 0
+        self._seq = 0
+        self._sync: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._opened = False
+
+        self.degraded = False
+        self.bytes = 0
+        self.records = 0
+        self.spooled_total = 0
+        self.replayed_total = 0
+        self.corrupt_records = 0
+        self.rejected_records = 0
+        self.last_error: Optional[str] = None
+
+    # -- Lifecycle ----------------------------------------------------------
+
+    async def start(self):
+        """Pick up segments left by a previous run and start the replayer."""
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self._open)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="signal-spool-replay")
+        if self.records:
+            logger.warning(f"Spool holds {self.records} signals from a previous run; replaying")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        async with self._lock:
+            self._seal()
+            self._resolve_sync()
+
+    def _open(self):
+        if self._opened:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for path in self._segments():
+            self.bytes += os.path.getsize(path)
+            self.records += _count_lines(path)
+            self._seq = max(self._seq, int(_SEGMENT_RE.match(os.path.basename(path)).group(2)))
+        self._opened = True
+
+    # -- Writing ------------------------------------------------------------
+
+    async def write_or_spool(
+        self,
+        signals: Sequence[BaseSignal],
+        write: Callable[[], Awaitable[object]],
+    ) -> bool:
+        """
+        Run `write` (the normal database write of `signals`); if Postgres is
+        unavailable or slower than SPOOL_DB_TIMEOUT_MS, spool `signals` instead.
+
+        Returns:
+            True if the signals were spooled rather than stored
+
+        Raises:
+            The write's own exception for failures that are not about
+            availability, or when the spool is disabled or full.
+        """
+        if not signals:
+            return False
+        if not self.enabled:
+            await write()
+            return False
+        if self.degraded:
+            try:
+                await self.append(signals)
+                return True
+            except SpoolFull:
+                pass  # try the database after all
+
+        try:
+            if self.db_timeout_ms:
+                await asyncio.wait_for(write(), self.db_timeout_ms / 1000)
+            else:
+                await write()
+            return False
+        except Exception as exc:
+            if not db_unavailable(exc):
+                raise
+            try:
+                await self.append(signals)
+            except SpoolFull:
+                raise exc
+            if not self.degraded:
+                logger.error(f"Database unavailable ({exc!r}); spooling signals to {self.directory}")
+            self.degraded = True
+            return True
+
+    async def append(self, signals: Sequence[BaseSignal]):
+        """Append signals and return once they are fsynced."""
+        data = b"".join(encode_record(signal) for signal in signals)
+        async with self._lock:
+            if self.bytes + len(data) > self.max_bytes:
+                raise SpoolFull(f"spool full ({self.max_bytes} bytes)")
+            if not self._opened:
+                self._open()
+            if self._file is None or self._active_bytes >= self.segment_max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._active_bytes += len(data)
+            self.bytes += len(data)
+            self.records += len(signals)
+            self.spooled_total += len(signals)
+
+            if self._sync is None:
+                self._sync = asyncio.get_running_loop().create_future()
+                asyncio.create_task(self._group_fsync())
+            sync = self._sync
+        await asyncio.shield(sync)
+
+    async def _group_fsync(self):
+        # Appends arriving during the window ride on the same fsync
+        await asyncio.sleep(self.fsync_ms / 1000)
+        async with self._lock:
+            try:
+                if self._file is not None:
+                    await asyncio.to_thread(self._fsync)
+            except Exception as exc:
+                self._resolve_sync(exc)
+            else:
+                self._resolve_sync()
+
+    def _resolve_sync(self, exc: Optional[BaseException] = None):
+        sync, self._sync = self._sync, None
+        if sync is not None and not sync.done():
+            if exc is None:
+                sync.set_result(None)
+            else:
+                sync.set_exception(exc)
+
+    def _fsync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _seal(self):
+        """Close the active segment; the next append starts a new one."""
+        if self._file is not None:
+            self._fsync()
+            self._file.close()
+            self._file = None
+
+    def _rotate(self):
+        self._seal()
+        self._seq += 1
+        name = f"{int(time.time() * 1000):013d}-{self._seq:06d}.seg"
+        self._file = open(os.path.join(self.directory, name), "ab")
+        self._active_bytes = 0
+        # Make the new directory entry durable too
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _segments(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(name for name in os.listdir(self.directory) if _SEGMENT_RE.match(name))
+        return [os.path.join(self.directory, name) for name in names]
+
+    # -- Replay -------------------------------------------------------------
+
+    async def _run(self):
+        while True:
+            if self.records:
+                try:
+                    await self.replay()
+                except Exception as exc:
+                    self.last_error = repr(exc)
+                    logger.warning(f"Spool replay failed, retrying in {self.replay_interval_seconds}s: {exc!r}")
+            await asyncio.sleep(self.replay_interval_seconds)
+
+    async def replay(self):
+        """Drain every segment into Postgres, oldest first."""
+        async with self._lock:
+            # Seal the active segment so it can be drained as well
+            self._seal()
+            sealed = self._segments()
+
+        for path in sealed:
+            signals, corrupt = await asyncio.to_thread(_read_segment, path)
+            rejected = 0
+            for start in range(0, len(signals), self.replay_batch):
+                batch = signals[start:start + self.replay_batch]
+                try:
+                    await self._replay_write(batch)
+                except Exception as exc:
+                    if db_unavailable(exc):
+                        raise
+                    # Something in the batch is refused: store one by one to isolate it
+                    logger.warning(f"Spooled batch of {len(batch)} refused ({exc!r}); replaying one by one")
+                    rejected += await self._replay_one_by_one(batch)
+                if self.degraded:
+                    logger.info("Database reachable again; new signals go to Postgres directly")
+                    self.degraded = False
+
+            size = os.path.getsize(path)
+            os.remove(path)
+            self.bytes -= size
+            self.records -= len(signals) + corrupt
+            self.replayed_total += len(signals) - rejected
+            self.corrupt_records += corrupt
+            self.last_error = None
+            logger.info(f"Replayed {len(signals) - rejected} spooled signals from {os.path.basename(path)}"
+                        + (f" ({corrupt} corrupt records skipped)" if corrupt else "")
+                        + (f" ({rejected} refused, moved to {REJECTED_FILE})" if rejected else ""))
+
+    async def _replay_write(self, batch: List[BaseSignal]):
+        await asyncio.wait_for(self._writer(batch), max(self.db_timeout_ms / 1000, 30))
+
+    async def _replay_one_by_one(self, batch: List[BaseSignal]) -> int:
+        """Returns the number of refused (quarantined) signals."""
+        rejected = []
+        for signal in batch:
+            try:
+                await self._replay_write([signal])
+            except Exception as exc:
+                if db_unavailable(exc):
+                    raise
+                logger.error(f"Spooled signal {signal.signal_id} refused by the database: {exc!r}")
+                rejected.append(signal)
+        if rejected:
+            await asyncio.to_thread(self._quarantine, rejected)
+            self.rejected_records += len(rejected)
+        return len(rejected)
+
+    def _quarantine(self, signals: List[BaseSignal]):
+        """Append refused records to REJECTED_FILE, fsynced before their segment is deleted."""
+        with open(os.path.join(self.directory, REJECTED_FILE), "ab") as f:
+            f.write(b"".join(encode_record(signal) for signal in signals))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def stats(self) -> dict:
+        segments = self._segments() if self.enabled else []
+        oldest_age = None
+        if segments:
+            created_ms = int(_SEGMENT_RE.match(os.path.basename(segments[0])).group(1))
+            oldest_age = round(max(time.time() - created_ms / 1000, 0.0), 1)
+        return {
+            "enabled": self.enabled,
+            "degraded": self.degraded,
+            "segments": len(segments),
+            "records": self.records,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "oldest_age_seconds": oldest_age,
+            "spooled_total": self.spooled_total,
+            "replayed_total": self.replayed_total,
+            "corrupt_records": self.corrupt_records,
+            "rejected_records": self.rejected_records,
+            "last_error": self.last_error,
+        }
+
+
+async def _write_to_db(signals: Sequence[BaseSignal]):
+    from app.core.database import AsyncSessionLocal
+    from app.services.ingestion_service import ingest_signals_batch
+
+    async with AsyncSessionLocal() as db:
+        await ingest_signals_batch(db=db, signals=signals)
+
+
+spool = SignalSpool(
+    directory=settings.SPOOL_PATH,
+    enabled=settings.SPOOL_ENABLED,
+    segment_max_bytes=settings.SPOOL_SEGMENT_MAX_BYTES,
+    max_bytes=settings.SPOOL_MAX_BYTES,
+    fsync_ms=settings.SPOOL_FSYNC_MS,
+    db_timeout_ms=settings.SPOOL_DB_TIMEOUT_MS,
+    replay_batch=settings.SPOOL_REPLAY_BATCH,
+    replay_interval_seconds=settings.SPOOL_REPLAY_INTERVAL_SECONDS,
+)
@@ -0,0 +1,265 @@
+"""
+Declarative triage rules.
+
+Each rule lists conditions on structured signal fields; when all of them
+match, the rule contributes a severity and/or an analysis trigger. Rules are
+compiled once into a `TriageEngine`: field paths are pre-split, rules are
+grouped by signal type, and all substring conditions on the same field share
+one case-insensitive regex, so a signal is scanned at most once per field
+instead of stringifying the whole payload.
+
+Rule format (JSON-compatible, see DEFAULT_RULES):
+
+    {
+        "name": "high-latency-metric",
+        "signal_type": "metric",            # optional, omit to match any type
+        "match": {
+            "metric_name": {"contains": ["latency"]},
+            "value": {"gte": 2000},
+        },
+        "severity": "high",                 # optional
+        "trigger": true,                    # optional, default false
+    }
+
+Supported operators: `in` (case-insensitive equality), `contains`
+(case-insensitive substring), `gt`, `gte`, `lt`, `lte` (numeric) and
+`exists` (true/false). Dotted fields such as `attributes.error_code`
+address nested payload keys.
+"""
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.incident import IncidentSeverity
+
+logger = get_logger(__name__)
+
+SEVERITY_RANK = {
+    IncidentSeverity.LOW: 0,
+    IncidentSeverity.MEDIUM: 1,
+    IncidentSeverity.HIGH: 2,
+    IncidentSeverity.CRITICAL: 3,
+}
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "error-log-level",
+        "signal_type": "log",
+        "match": {"level": {"in": ["ERROR", "CRITICAL"]}},
+        "severity": "high",
+        "trigger": True,
+    },
+    {
+        "name": "high-latency-metric",
+        "signal_type": "metric",
+        "match": {
+            "metric_name": {"contains": ["latency"]},
+            "value": {"gte": 2000},
+        },
+        "severity": "high",
+        "trigger": True,
+    },
+    {
+        "name": "failure-message",
+        "match": {"message": {"contains": ["fail", "critical"]}},
+        "trigger": True,
+    },
+    {
+        "name": "failed-span",
+        "signal_type": "trace",
+        "match": {"status": {"contains": ["fail", "error", "critical"]}},
+        "trigger": True,
+    },
+    {
+        "name": "error-code-attribute",
+        "match": {"attributes.error_code": {"exists": True}},
+        "trigger": True,
+    },
+]
+
+_NUMERIC_OPS = {
+    "gt": lambda value, bound: value > bound,
+    "gte": lambda value, bound: value >= bound,
+    "lt": lambda value, bound: value < bound,
+    "lte": lambda value, bound: value <= bound,
+}
+
+_MISSING = object()
+_NO_HITS: FrozenSet[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class TriageDecision:
+    severity: IncidentSeverity
+    trigger: bool
+    rules: Tuple[str, ...] = ()
+
+
+class _SubstringMatcher:
+    """
+    All substring needles for one field, compiled into a single regex.
+
+    A lookahead alternation finds every needle occurrence (including
+    overlapping ones) in one pass. Needles that are substrings of a longer
+    matched needle are implied via a precomputed closure.
+    """
+
+    def __init__(self, needles: Iterable[str]):
+        self.needles = sorted({n.casefold() for n in needles}, key=len, reverse=True)
+        alternation = "|".join(re.escape(n) for n in self.needles)
+        self._any = re.compile(alternation, re.IGNORECASE)
+        self._regex = re.compile(f"(?=({alternation}))", re.IGNORECASE)
+        self._implied = {
+            n: frozenset(other for other in self.needles if other in n)
+            for n in self.needles
+        }
+
+    def found(self, text: str) -> FrozenSet[str]:
+        # Most signals match nothing: a plain search bails out fastest
+        if not self._any.search(text):
+            return _NO_HITS
+        hits = set()
+        for match in self._regex.finditer(text):
+            hits |= self._implied.get(match.group(1).casefold(), frozenset())
+        return frozenset(hits)
+
+
+@dataclass(frozen=True)
+class _Condition:
+    path: Tuple[str, ...]
+    op: str
+    operand: Any
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    name: str
+    conditions: Tuple[_Condition, ...]
+    severity: Optional[IncidentSeverity]
+    trigger: bool
+
+
+def _resolve(payload: dict, path: Tuple[str, ...]) -> Any:
+    if len(path) == 1:
+        return payload.get(path[0], _MISSING)
+    value: Any = payload
+    for key in path:
+        if not isinstance(value, dict):
+            return _MISSING
+        value = value.get(key, _MISSING)
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+class TriageEngine:
+    """Evaluates compiled triage rules against signal payloads."""
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self._rules_by_type: Dict[Optional[str], List[_CompiledRule]] = {}
+        needles: Dict[Tuple[str, ...], set] = {}
+
+        for rule in rules:
+            conditions = []
+            for field, spec in rule["match"].items():
+                path = tuple(field.split("."))
+                if len(spec) != 1:
+                    raise ValueError(f"rule {rule['name']}: one operator per field")
+                (op, operand), = spec.items()
+
+                if op == "contains":
+                    operand = frozenset(str(v).casefold() for v in operand)
+                    needles.setdefault(path, set()).update(operand)
+                elif op == "in":
+                    operand = frozenset(str(v).casefold() for v in operand)
+                elif op in _NUMERIC_OPS:
+                    operand = float(operand)
+                elif op == "exists":
+                    operand = bool(operand)
+                else:
+                    raise ValueError(f"rule {rule['name']}: unknown operator {op!r}")
+                conditions.append(_Condition(path, op, operand))
+
+            severity = rule.get("severity")
+            compiled = _CompiledRule(
+                name=rule["name"],
+                conditions=tuple(conditions),
+                severity=IncidentSeverity(severity) if severity else None,
+                trigger=bool(rule.get("trigger", False)),
+            )
+            self._rules_by_type.setdefault(rule.get("signal_type"), []).append(compiled)
+
+        self._matchers = {path: _SubstringMatcher(n) for path, n in needles.items()}
+        generic = self._rules_by_type.pop(None, [])
+        self._rules_by_type = {
+            signal_type: typed + generic for signal_type, typed in self._rules_by_type.items()
+        }
+        self._generic_rules = generic
+        self.rule_count = len(rules)
+
+    @classmethod
+    def from_settings(cls) -> "TriageEngine":
+        """Build from TRIAGE_RULES_PATH if set, else the built-in rules."""
+        if settings.TRIAGE_RULES_PATH:
+            with open(settings.TRIAGE_RULES_PATH) as f:
+                rules = json.load(f)
+            logger.info(f"Loaded {len(rules)} triage rules from {settings.TRIAGE_RULES_PATH}")
+        else:
+            rules = DEFAULT_RULES
+        return cls(rules)
+
+    def evaluate(self, signal_type: str, payload: dict) -> TriageDecision:
+        """
+        Classify a signal.
+
+        Returns:
+            The highest severity among matching rules (LOW if none) and
+            whether any matching rule requests an analysis run.
+        """
+        severity = IncidentSeverity.LOW
+        trigger = False
+        matched = []
+        found: Dict[Tuple[str, ...], FrozenSet[str]] = {}
+
+        for rule in self._rules_by_type.get(signal_type, self._generic_rules):
+            if not self._matches(rule, payload, found):
+                continue
+            matched.append(rule.name)
+            trigger = trigger or rule.trigger
+            if rule.severity and SEVERITY_RANK[rule.severity] > SEVERITY_RANK[severity]:
+                severity = rule.severity
+
+        return TriageDecision(severity=severity, trigger=trigger, rules=tuple(matched))
+
+    def _matches(self, rule: _CompiledRule, payload: dict, found: dict) -> bool:
+        for condition in rule.conditions:
+            value = _resolve(payload, condition.path)
+
+            if condition.op == "exists":
+                if (value is not _MISSING and value is not None) != condition.operand:
+                    return False
+                continue
+            if value is _MISSING or value is None:
+                return False
+
+            if condition.op == "contains":
+                if condition.path not in found:
+                    found[condition.path] = self._matchers[condition.path].found(str(value))
+                if not condition.operand & found[condition.path]:
+                    return False
+            elif condition.op == "in":
+                if str(value).casefold() not in condition.operand:
+                    return False
+            else:
+                try:
+                    number = float(value)
+                except (TypeError, ValueError):
+                    return False
+                if not _NUMERIC_OPS[condition.op](number, condition.operand):
+                    return False
+        return True
+
+
+triage_engine = TriageEngine.from_settings()
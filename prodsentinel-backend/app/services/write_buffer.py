@@ -0,0 +1,195 @@
+import asyncio
+import time
+from functools import partial
+from typing import Awaitable, Callable, List, Optional, Sequence
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.schemas.common import BaseSignal
+from app.services.ingestion_service import ingest_signals_batch
+from app.services.spool import spool, db_unavailable
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class WriteBufferFull(Exception):
+    """Raised when the buffer cannot accept more signals (full or shutting down)."""
+
+
+async def _write_to_db(signals: Sequence[BaseSignal]):
+    async with AsyncSessionLocal() as db:
+        await ingest_signals_batch(db=db, signals=signals)
+
+
+class SignalWriteBuffer:
+    """
+    In-process micro-batcher in front of `ingest_signals_batch`.
+
+    Signals are queued by the request handlers and committed by a single
+    background flusher in batches of up to `max_batch` rows, or whatever has
+    accumulated `flush_ms` after the first queued signal, whichever comes
+    first. Larger batches mean fewer transactions; a longer flush window
+    means more latency before a signal is visible to queries. Batches that
+    cannot be written because Postgres is unavailable go to the spool; a
+    batch the database refuses is written one signal at a time, so only the
+    offending signals are dropped.
+    """
+
+    def __init__(
+        self,
+        max_batch: int,
+        flush_ms: int,
+        max_queue: int,
+        writer: Optional[Callable[[Sequence[BaseSignal]], Awaitable[object]]] = None,
+    ):
+        self.max_batch = max_batch
+        self.flush_ms = flush_ms
+        self.max_queue = max_queue
+        self._writer = writer or _write_to_db
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+
+        self.batches_flushed = 0
+        self.signals_flushed = 0
+        self.signals_failed = 0
+        self.signals_refused = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Create the queue and start the background flusher."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._accepting = True
+        self._task = asyncio.create_task(self._run(), name="signal-write-buffer")
+        logger.info(
+            f"Write buffer started: max_batch={self.max_batch}, "
+            f"flush_ms={self.flush_ms}, max_queue={self.max_queue}"
+        )
+
+    async def stop(self):
+        """Stop accepting signals and flush everything already queued."""
+        if not self.running:
+            return
+        self._accepting = False
+        await self._queue.put(_STOP)
+        await self._task
+        logger.info(
+            f"Write buffer stopped: flushed={self.signals_flushed}, "
+            f"failed={self.signals_failed}, refused={self.signals_refused}"
+        )
+
+    def enqueue(self, signal: BaseSignal):
+        """
+        Queue a validated signal for the next flush.
+
+        Raises:
+            WriteBufferFull: If the queue is at capacity or shutting down.
+        """
+        if not self._accepting:
+            raise WriteBufferFull("write buffer is not accepting signals")
+        try:
+            self._queue.put_nowait(signal)
+        except asyncio.QueueFull:
+            raise WriteBufferFull(f"write buffer full ({self.max_queue} signals)")
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "max_batch": self.max_batch,
+            "flush_ms": self.flush_ms,
+            "batches_flushed": self.batches_flushed,
+            "signals_flushed": self.signals_flushed,
+            "signals_failed": self.signals_failed,
+            "signals_refused": self.signals_refused,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_duration_ms": round(self.last_flush_ms, 2),
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_ms / 1000
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[BaseSignal]):
+        # A client retry can land in the same batch as the original
+        unique = list({signal.signal_id: signal for signal in reversed(batch)}.values())
+
+        started = time.perf_counter()
+        stored = len(unique)
+        try:
+            await spool.write_or_spool(unique, partial(self._writer, unique))
+        except Exception as exc:
+            if db_unavailable(exc):
+                # Unavailable and the spool is disabled or full
+                self.signals_failed += len(unique)
+                logger.error(f"Write buffer flush of {len(unique)} signals failed: {exc}")
+                return
+            # Something in the batch is refused: store one by one to isolate it
+            logger.warning(f"Write buffer batch of {len(unique)} signals refused ({exc!r}); retrying one by one")
+            stored = await self._write_one_by_one(unique)
+        finally:
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+        self.batches_flushed += 1
+        self.signals_flushed += stored
+        self.last_batch_size = len(unique)
+
+    async def _write_one_by_one(self, signals: List[BaseSignal]) -> int:
+        """Returns the number of signals stored (or spooled)."""
+        stored = 0
+        for index, signal in enumerate(signals):
+            try:
+                await spool.write_or_spool([signal], partial(self._writer, [signal]))
+            except Exception as exc:
+                if db_unavailable(exc):
+                    self.signals_failed += len(signals) - index
+                    logger.error(f"Write buffer flush of {len(signals) - index} signals failed: {exc}")
+                    break
+                self.signals_refused += 1
+                logger.error(f"Signal {signal.signal_id} refused by the database, dropped: {exc!r}")
+                continue
+            stored += 1
+        return stored
+
+
+write_buffer = SignalWriteBuffer(
+    max_batch=settings.INGEST_BUFFER_MAX_BATCH,
+    flush_ms=settings.INGEST_BUFFER_FLUSH_MS,
+    max_queue=settings.INGEST_BUFFER_MAX_QUEUE,
+)
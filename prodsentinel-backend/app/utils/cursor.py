@@ -0,0 +1,31 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    """
+    Opaque keyset cursor for the row `(timestamp, row_id)`.
+
+    The next page holds the rows strictly after it in `(timestamp DESC,
+    id DESC)` order.
+    """
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Inverse of `encode_cursor`.
+
+    Raises:
+        ValueError: The cursor was not produced by `encode_cursor`
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
@@ -0,0 +1,55 @@
+from typing import AsyncIterator, Optional, Tuple
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int,
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split an async byte stream into newline-delimited records.
+
+    Only the current partial line is held in memory, so memory use is bounded
+    by `max_line_bytes` regardless of the total stream size. Blank lines are
+    skipped but still counted.
+
+    Args:
+        chunks: Async iterator of raw body chunks (e.g. `request.stream()`)
+        max_line_bytes: Maximum size of a single line
+
+    Yields:
+        (line_number, line) tuples, 1-based. `line` is None when the line
+        exceeded `max_line_bytes`; the rest of it is discarded.
+    """
+    buffer = bytearray()
+    line_number = 0
+    discarding = False
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            newline = chunk.find(b"\n", start)
+            if newline == -1:
+                if not discarding:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        buffer.clear()
+                        discarding = True
+                break
+
+            line_number += 1
+            if discarding:
+                yield line_number, None
+                discarding = False
+            else:
+                buffer += chunk[start:newline]
+                if len(buffer) > max_line_bytes:
+                    yield line_number, None
+                elif buffer.strip():
+                    yield line_number, bytes(buffer)
+            buffer.clear()
+            start = newline + 1
+
+    if discarding:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, bytes(buffer)
@@ -0,0 +1,77 @@
+import math
+from typing import Dict, Optional, Tuple
+
+# Fixed: sketches stored with different accuracies cannot be merged
+RELATIVE_ACCURACY = 0.01
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+# Magnitudes below this are counted as zero
+_MIN_MAGNITUDE = 1e-9
+_ZERO_KEY = "z"
+
+
+def _key(value: float) -> str:
+    if abs(value) < _MIN_MAGNITUDE:
+        return _ZERO_KEY
+    index = math.ceil(math.log(abs(value)) / _LOG_GAMMA)
+    return str(index) if value > 0 else f"n{index}"
+
+
+def _order(key: str) -> Tuple[int, int]:
+    """Sort position of a bucket: negatives (largest magnitude first), zero, positives."""
+    if key == _ZERO_KEY:
+        return (1, 0)
+    if key.startswith("n"):
+        return (0, -int(key[1:]))
+    return (2, int(key))
+
+
+def _estimate(key: str) -> float:
+    if key == _ZERO_KEY:
+        return 0.0
+    index = int(key.lstrip("n"))
+    magnitude = 2 * _GAMMA ** index / (_GAMMA + 1)
+    return -magnitude if key.startswith("n") else magnitude
+
+
+class LogBucketSketch:
+    """
+    Mergeable quantile sketch over logarithmic buckets (DDSketch-style).
+
+    A value lands in bucket ceil(log_gamma |v|), so any quantile estimate is
+    within RELATIVE_ACCURACY of a true sample value. Buckets are plain
+    `{key: count}` maps, which makes two sketches mergeable by summing
+    counts per key, in Python or in SQL over JSONB.
+    """
+
+    def __init__(self, buckets: Optional[Dict[str, int]] = None):
+        self.buckets: Dict[str, int] = dict(buckets or {})
+
+    @property
+    def count(self) -> int:
+        return sum(self.buckets.values())
+
+    def add(self, value: float, count: int = 1):
+        key = _key(value)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def merge(self, other: "LogBucketSketch"):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0 <= q <= 1), or None if empty."""
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for key in sorted(self.buckets, key=_order):
+            seen += self.buckets[key]
+            if seen > rank:
+                return _estimate(key)
+        return _estimate(max(self.buckets, key=_order))
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.buckets)
@@ -0,0 +1,158 @@
+"""
+Benchmark: raw_signals size with full vs compact payloads.
+
+Usage (from prodsentinel-backend/, needs a scratch PostgreSQL database):
+    python -m benchmarks.bench_compact_payload --rows 1000000
+    python -m benchmarks.bench_compact_payload --live
+
+Seeds two scratch tables with identical fake-services-shaped rows:
+`bench_payload_full` (payload repeats signal_id, trace_id, service_name,
+timestamp and signal_type, as before migration d8a2f6b31e57) and
+`bench_payload_compact` (type-specific fields only). Both get the
+raw_signals indexes. Prints heap, TOAST and index sizes and the average
+stored payload size. The tables are dropped at the end.
+
+With --live, nothing is seeded: it reports the current size of raw_signals
+and estimates the savings of compacting the rows that still carry the
+column fields, from a 1% block sample.
+"""
+import argparse
+import asyncio
+
+import asyncpg
+
+from benchmarks.bench_payload_indexes import INDEXES, default_dsn
+
+TABLES = {"full": "bench_payload_full", "compact": "bench_payload_compact"}
+
+COLUMN_FIELDS = "ARRAY['signal_id', 'trace_id', 'service_name', 'timestamp', 'signal_type']"
+
+# Same traffic shape as bench_payload_indexes, full payloads
+SEED = """
+INSERT INTO {table} (id, trace_id, service_name, timestamp, payload)
+SELECT id, trace_id, service_name, ts,
+       jsonb_strip_nulls(jsonb_build_object(
+           'signal_id', id::text,
+           'trace_id', trace_id,
+           'service_name', service_name,
+           'timestamp', to_char(ts AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
+           'signal_type', 'log',
+           'level', CASE WHEN g % 50 = 0 THEN 'ERROR' ELSE 'INFO' END,
+           'message', CASE WHEN g % 50 = 0 THEN 'Payment gateway timeout' ELSE 'Checkout initiated' END,
+           'attributes', jsonb_strip_nulls(jsonb_build_object(
+               'order_id', 'order-' || (g % 200000),
+               'error_code', CASE WHEN g % 200 = 0 THEN 'PAY_TIMEOUT_' || (g % 17) END
+           ))
+       ))
+FROM (
+    SELECT g, gen_random_uuid() AS id, 'req-' || (g / 5) AS trace_id,
+           (ARRAY['api-gateway', 'payment-service', 'inventory-service'])[1 + g % 3] AS service_name,
+           now() - make_interval(secs => g * 0.01) AS ts
+    FROM generate_series(1, $1) AS g
+) AS s
+"""
+
+SIZES = """
+SELECT pg_relation_size(c.oid) AS heap,
+       coalesce(pg_total_relation_size(c.reltoastrelid), 0) AS toast,
+       pg_indexes_size(c.oid) AS indexes,
+       pg_total_relation_size(c.oid) AS total
+FROM pg_class c WHERE c.oid = to_regclass($1)
+"""
+
+
+async def seed(conn, rows: int):
+    for variant, table in TABLES.items():
+        print(f"Seeding {table} with {rows} rows...")
+        await conn.execute(f"DROP TABLE IF EXISTS {table}")
+        await conn.execute(f"""
+            CREATE TABLE {table} (
+                id uuid PRIMARY KEY,
+                signal_type varchar DEFAULT 'log',
+                trace_id varchar,
+                service_name varchar,
+                timestamp timestamptz,
+                payload jsonb NOT NULL
+            )
+        """)
+        await conn.execute(SEED.format(table=table), rows)
+        if variant == "compact":
+            await conn.execute(f"UPDATE {table} SET payload = payload - {COLUMN_FIELDS}")
+        for column in ("signal_type", "trace_id", "service_name", "timestamp"):
+            await conn.execute(f"CREATE INDEX ON {table} ({column})")
+        for expression in INDEXES.values():
+            await conn.execute(f"CREATE INDEX ON {table} ({expression}) WHERE {expression} IS NOT NULL")
+        # FULL, so the compact table does not keep the pre-UPDATE row versions
+        await conn.execute(f"VACUUM FULL ANALYZE {table}")
+
+
+def mb(size: int) -> str:
+    return f"{size / 1024 / 1024:,.1f} MB"
+
+
+async def compare(conn):
+    results = {}
+    for variant, table in TABLES.items():
+        sizes = dict(await conn.fetchrow(SIZES, table))
+        sizes["payload_avg"] = await conn.fetchval(f"SELECT avg(pg_column_size(payload)) FROM {table}")
+        results[variant] = sizes
+
+    print(f"\n{'':<14} {'full':>12} {'compact':>12} {'saved':>7}")
+    for key in ("heap", "toast", "indexes", "total"):
+        full, compact = results["full"][key], results["compact"][key]
+        saved = 1 - compact / full if full else 0
+        print(f"{key:<14} {mb(full):>12} {mb(compact):>12} {saved:>6.0%}")
+    full, compact = results["full"]["payload_avg"], results["compact"]["payload_avg"]
+    print(f"{'payload bytes':<14} {full:>12.0f} {compact:>12.0f} {1 - compact / full:>6.0%}")
+
+
+async def live(conn):
+    sizes = await conn.fetchrow(
+        "SELECT sum(pg_relation_size(inhrelid)) AS heap, sum(pg_indexes_size(inhrelid)) AS indexes, "
+        "sum(pg_total_relation_size(inhrelid)) AS total FROM pg_inherits "
+        "WHERE inhparent = 'raw_signals'::regclass"
+    )
+    print(f"raw_signals: heap {mb(sizes['heap'] or 0)}, indexes {mb(sizes['indexes'] or 0)}, "
+          f"total {mb(sizes['total'] or 0)}")
+
+    sample = await conn.fetchrow(f"""
+        SELECT count(*) AS rows,
+               count(*) FILTER (WHERE payload ?| {COLUMN_FIELDS}) AS full_rows,
+               coalesce(sum(pg_column_size(payload)), 0) AS bytes,
+               coalesce(sum(pg_column_size(payload - {COLUMN_FIELDS})), 0) AS compact_bytes
+        FROM raw_signals TABLESAMPLE SYSTEM (1)
+    """)
+    if not sample["rows"]:
+        print("Sample is empty (table too small or empty)")
+        return
+    saved = sample["bytes"] - sample["compact_bytes"]
+    print(f"Sampled {sample['rows']} rows, {sample['full_rows']} not compact yet")
+    print(f"Payload bytes saved by compacting: {saved / sample['rows']:.0f} per row "
+          f"({saved / sample['bytes']:.0%} of payload), ~{mb(saved * 100)} for the table")
+
+
+async def main_async(args):
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        if args.live:
+            await live(conn)
+            return
+        await seed(conn, args.rows)
+        await compare(conn)
+    finally:
+        if not args.live:
+            for table in TABLES.values():
+                await conn.execute(f"DROP TABLE IF EXISTS {table}")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=default_dsn())
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--live", action="store_true", help="Report on the real raw_signals table instead")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: bytes on the wire and ingest latency for gzip/zstd request bodies.
+
+Usage (from prodsentinel-backend/):
+    python -m benchmarks.bench_compression                       # sizes only
+    python -m benchmarks.bench_compression --url http://localhost:8000 --requests 50
+
+Without --url only payload sizes and compression CPU time are reported.
+With --url, identical /ingest/batch bodies are posted once per encoding and
+request latency percentiles are reported (each request uses fresh signal_ids).
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import zstandard
+
+SERVICES = ["api-gateway", "payment-service", "inventory-service"]
+MESSAGES = [
+    ("INFO", "Checkout initiated"),
+    ("INFO", "Payment authorized"),
+    ("INFO", "Inventory reserved"),
+    ("ERROR", "Payment gateway timeout"),
+    ("ERROR", "Checkout failed"),
+]
+
+
+def make_signal(trace_id: str) -> dict:
+    """A log shaped like the fake services' telemetry."""
+    level, message = random.choice(MESSAGES)
+    attributes = {"order_id": f"order-{random.randint(1, 10_000)}"}
+    if level == "ERROR":
+        attributes["error"] = "Server error '500 Internal Server Error' for url 'http://localhost:8004/pay'"
+    return {
+        "signal_type": "log",
+        "signal_id": str(uuid4()),
+        "trace_id": trace_id,
+        "service_name": random.choice(SERVICES),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "level": level,
+        "message": message,
+        "attributes": attributes,
+    }
+
+
+def make_batch(size: int) -> list:
+    trace_id = f"req-{uuid4().hex[:8]}"
+    return [make_signal(trace_id) for _ in range(size)]
+
+
+ENCODERS = {
+    "identity": lambda body: body,
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+    "zstd": lambda body: zstandard.ZstdCompressor(level=3).compress(body),
+}
+
+
+def report_sizes(batch_size: int):
+    single = json.dumps(make_signal("req-single"), separators=(",", ":")).encode()
+    batch = json.dumps(make_batch(batch_size), separators=(",", ":")).encode()
+
+    print(f"{'body':<22} {'encoding':<9} {'bytes':>10} {'ratio':>7} {'encode µs':>10}")
+    for label, body in (("single log", single), (f"batch of {batch_size}", batch)):
+        for encoding, encode in ENCODERS.items():
+            started = time.perf_counter()
+            encoded = encode(body)
+            elapsed_us = (time.perf_counter() - started) * 1e6
+            print(
+                f"{label:<22} {encoding:<9} {len(encoded):>10} "
+                f"{len(body) / len(encoded):>6.1f}x {elapsed_us:>10.0f}"
+            )
+
+
+def report_latency(url: str, batch_size: int, requests: int):
+    import httpx
+
+    print(f"\nPOST {url}/ingest/batch, {requests} requests x {batch_size} signals per encoding")
+    print(f"{'encoding':<9} {'avg bytes':>10} {'p50 ms':>8} {'p95 ms':>8} {'signals/s':>10}")
+    with httpx.Client(base_url=url, timeout=30.0) as client:
+        for encoding, encode in ENCODERS.items():
+            latencies, sizes = [], []
+            for _ in range(requests):
+                body = encode(json.dumps(make_batch(batch_size)).encode())
+                headers = {"Content-Type": "application/json"}
+                if encoding != "identity":
+                    headers["Content-Encoding"] = encoding
+                started = time.perf_counter()
+                response = client.post("/ingest/batch", content=body, headers=headers)
+                latencies.append((time.perf_counter() - started) * 1000)
+                sizes.append(len(body))
+                response.raise_for_status()
+
+            latencies.sort()
+            p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+            throughput = batch_size * requests / (sum(latencies) / 1000)
+            print(
+                f"{encoding:<9} {statistics.mean(sizes):>10.0f} "
+                f"{statistics.median(latencies):>8.1f} {p95:>8.1f} {throughput:>10.0f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--url", help="Backend base URL; omit to skip the latency run")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    report_sizes(args.batch_size)
+    if args.url:
+        report_latency(args.url.rstrip("/"), args.batch_size, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark: compiled triage rules vs. the legacy str(payload) scan.
+
+Usage (from prodsentinel-backend/):
+    python -m benchmarks.bench_triage [--iterations 20000]
+
+DATABASE_URL must be set (any value) because the app settings require it;
+no database connection is made.
+"""
+import argparse
+import timeit
+from uuid import uuid4
+
+from app.services.triage import TriageEngine, DEFAULT_RULES
+
+
+def legacy_triage(signal_type: str, payload: dict) -> bool:
+    """Pre-rule-engine behaviour of ingest_signal, kept for comparison."""
+    high = False
+    if signal_type == "log" and payload.get("level") in ["ERROR", "CRITICAL"]:
+        high = True
+    elif signal_type == "metric" and "latency" in payload.get("metric_name", "").lower():
+        if payload.get("value", 0) >= 2000:
+            high = True
+    if high:
+        return True
+    return "fail" in str(payload).lower() or "critical" in str(payload).lower()
+
+
+def _stack_trace(frames: int) -> str:
+    return "\n".join(
+        f'  File "/app/services/payment.py", line {i}, in authorize\n    raise GatewayTimeout()'
+        for i in range(frames)
+    )
+
+
+def sample_payloads() -> dict:
+    base = {
+        "signal_id": str(uuid4()),
+        "trace_id": f"req-{uuid4().hex[:8]}",
+        "service_name": "payment-service",
+        "timestamp": "2026-01-16T00:06:58.522757+00:00",
+    }
+    return {
+        "info log (small)": ("log", {
+            **base, "signal_type": "log", "level": "INFO",
+            "message": "Payment authorized", "attributes": {"order_id": "ord-123"},
+        }),
+        "info log (large attributes)": ("log", {
+            **base, "signal_type": "log", "level": "INFO",
+            "message": "Checkout completed",
+            "attributes": {f"attr_{i}": "x" * 64 for i in range(100)},
+        }),
+        "error log (stack trace)": ("log", {
+            **base, "signal_type": "log", "level": "ERROR",
+            "message": "Payment gateway timeout",
+            "attributes": {"stack_trace": _stack_trace(40)},
+        }),
+        "trace span": ("trace", {
+            **base, "signal_type": "trace", "span_id": "s1", "parent_span_id": None,
+            "duration_ms": 120.5, "status": "OK", "attributes": {"http.route": "/pay"},
+        }),
+        "latency metric": ("metric", {
+            **base, "signal_type": "metric", "metric_name": "http_latency_ms",
+            "value": 350.0, "unit": "ms", "attributes": {},
+        }),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = TriageEngine(DEFAULT_RULES)
+
+    print(f"{'payload':<30} {'legacy µs/op':>14} {'rules µs/op':>13} {'speedup':>9}")
+    for label, (signal_type, payload) in sample_payloads().items():
+        legacy = timeit.timeit(lambda: legacy_triage(signal_type, payload), number=args.iterations)
+        rules = timeit.timeit(lambda: engine.evaluate(signal_type, payload), number=args.iterations)
+        legacy_us = legacy / args.iterations * 1e6
+        rules_us = rules / args.iterations * 1e6
+        print(f"{label:<30} {legacy_us:>14.2f} {rules_us:>13.2f} {legacy_us / rules_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,586 @@
+"""
+Load test: sustained ingest throughput and query latency of a running backend.
+
+Usage (from prodsentinel-backend/, against `docker compose up postgres redis backend`):
+    python -m benchmarks.loadtest seed --rows 10000000
+    python -m benchmarks.loadtest run --url http://localhost:8000 --duration 60 --concurrency 32 --rps 500
+    python -m benchmarks.loadtest run --mix query --rps 0 --concurrency 16
+    python -m benchmarks.loadtest compare benchmarks/results/a.json benchmarks/results/b.json
+    python -m benchmarks.loadtest clean
+
+`seed` bulk-loads a synthetic corpus straight into raw_signals and incidents
+(server-side generate_series, no HTTP), shaped like the fake services'
+traffic: traces of 5 signals across api-gateway, payment-service and
+inventory-service, mostly INFO logs with 2% errors, plus spans and latency
+metrics, spread over --days. Seeded trace_ids start with `load-`; `clean`
+deletes them and everything the runs ingested (`loadrun-`).
+
+`run` drives the mix of operations in --mix (a preset or `op=weight,...`)
+for --duration seconds. With --rps it is open-loop: requests are scheduled
+at a fixed rate and latency is measured from the scheduled send time, so a
+saturated backend shows up as latency instead of silently lowering the
+offered load. With --rps 0 it is closed-loop: --concurrency clients send
+back to back. It reports throughput and p50/p95/p99 latency per operation,
+Postgres activity from pg_stat_database, and the CPU of the Postgres and
+backend containers sampled with `docker stats`. Results are written as
+JSON with the git commit, so `compare` can diff runs across commits.
+
+Ingested errors trigger analysis tasks like real ones do; lower
+--error-rate if no pipeline worker drains the queue.
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import re
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+import asyncpg
+
+from benchmarks.bench_payload_indexes import default_dsn
+
+SERVICES = ["api-gateway", "payment-service", "inventory-service"]
+SIGNALS_PER_TRACE = 5
+SEED_CHUNK = 1_000_000
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# g is the row number, g / 5 its trace. Per 20 rows: one metric (g % 20 = 0),
+# one span (g % 20 = 10), logs otherwise; 2% of rows are ERROR logs
+# (g % 50 = 5, the first signal of every 10th trace, which gets an incident)
+SEED = """
+INSERT INTO raw_signals (id, signal_type, trace_id, service_name, timestamp, payload)
+SELECT gen_random_uuid(),
+       (CASE WHEN g % 20 = 0 THEN 'metric' WHEN g % 20 = 10 THEN 'trace' ELSE 'log' END)::signaltypeenum,
+       'load-' || (g / 5),
+       (ARRAY['api-gateway', 'payment-service', 'inventory-service'])[1 + g % 3],
+       $3::timestamptz - make_interval(secs => (g::float8 / $2::bigint) * $4),
+       CASE
+           WHEN g % 20 = 0 THEN jsonb_build_object(
+               'metric_name', 'http_latency_ms', 'value', 20 + (g * 7919) % 480, 'unit', 'ms',
+               'attributes', jsonb_build_object('route', '/checkout'))
+           WHEN g % 20 = 10 THEN jsonb_build_object(
+               'span_id', 'span-' || g, 'parent_span_id', NULL, 'duration_ms', 5 + (g * 104729) % 995,
+               'status', CASE WHEN g % 100 = 10 THEN 'ERROR' ELSE 'OK' END,
+               'attributes', jsonb_build_object('http.route', '/pay'))
+           ELSE jsonb_build_object(
+               'level', CASE WHEN g % 50 = 5 THEN 'ERROR' ELSE 'INFO' END,
+               'message', CASE WHEN g % 50 = 5 THEN 'Payment gateway timeout' ELSE 'Checkout initiated' END,
+               'attributes', jsonb_strip_nulls(jsonb_build_object(
+                   'order_id', 'order-' || (g % 200000),
+                   'error_code', CASE WHEN g % 250 = 5 THEN 'PAY_TIMEOUT_' || (g % 17) END)))
+       END
+FROM generate_series($1::bigint, least($1::bigint + $5 - 1, $2::bigint - 1)) AS g
+"""
+
+SEED_INCIDENTS = """
+INSERT INTO incidents (id, trace_id, status, severity, detected_at, affected_services, error_count)
+SELECT gen_random_uuid(),
+       'load-' || t,
+       (CASE WHEN t % 7 = 1 THEN 'RESOLVED' ELSE 'OPEN' END)::incidentstatus,
+       (CASE WHEN t % 30 = 1 THEN 'CRITICAL' ELSE 'HIGH' END)::incidentseverity,
+       $2::timestamptz - make_interval(secs => (t::float8 * 5 / $1::bigint) * $3),
+       ARRAY['api-gateway', 'payment-service', 'inventory-service'],
+       1
+FROM generate_series(1, ($1::bigint - 1) / 5, 10) AS t
+ON CONFLICT (trace_id) DO NOTHING
+"""
+
+PG_STATS = """
+SELECT xact_commit, xact_rollback, tup_inserted, tup_returned, tup_fetched, blks_read, blks_hit
+FROM pg_stat_database WHERE datname = current_database()
+"""
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+# -- Seeding ----------------------------------------------------------------
+
+async def ensure_partitions(conn, start: datetime, end: datetime):
+    """Daily partitions for the seeded range, so history does not land in the default partition."""
+    if await conn.fetchval("SELECT relkind FROM pg_class WHERE oid = to_regclass('raw_signals')") != "p":
+        return
+    await conn.execute("SET TimeZone = 'UTC'")
+    existing = []
+    for row in await conn.fetch(
+        "SELECT pg_get_expr(c.relpartbound, c.oid) AS bound FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = 'raw_signals'::regclass"
+    ):
+        match = _BOUND_RE.search(row["bound"])
+        if match:
+            existing.append(tuple(datetime.fromisoformat(value) for value in match.groups()))
+
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        bounds = (day, day + timedelta(days=1))
+        if not any(bounds[0] < other_end and other_start < bounds[1] for other_start, other_end in existing):
+            await conn.execute(
+                f"CREATE TABLE raw_signals_p{day:%Y%m%d} PARTITION OF raw_signals "
+                f"FOR VALUES FROM ('{bounds[0].isoformat()}') TO ('{bounds[1].isoformat()}')"
+            )
+        day = bounds[1]
+
+
+async def seed(args):
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        now = datetime.now(timezone.utc)
+        span = args.days * 86400.0
+        await ensure_partitions(conn, now - timedelta(days=args.days), now + timedelta(seconds=1))
+
+        started = time.perf_counter()
+        total = args.rows + 1  # generate_series upper bound is exclusive of $2
+        for first in range(1, total, SEED_CHUNK):
+            await conn.execute(SEED, first, total, now, span, SEED_CHUNK)
+            done = min(first + SEED_CHUNK - 1, args.rows)
+            print(f"  {done:>12,} / {args.rows:,} signals  ({time.perf_counter() - started:,.0f}s)")
+        await conn.execute(SEED_INCIDENTS, total, now, span)
+
+        print("Analyzing...")
+        await conn.execute("ANALYZE raw_signals")
+        await conn.execute("ANALYZE incidents")
+        print(f"Seeded {args.rows:,} signals over {args.days} days in {time.perf_counter() - started:,.0f}s")
+        print(f"Use `run --seed-rows {args.rows}` so trace lookups hit seeded traces; "
+              f"`python -m app.services.rollups --backfill-days {args.days}` fills the metric series")
+    finally:
+        await conn.close()
+
+
+async def clean(args):
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        for table in ("raw_signals", "incidents"):
+            status = await conn.execute(
+                f"DELETE FROM {table} WHERE trace_id LIKE 'load-%' OR trace_id LIKE 'loadrun-%'"
+            )
+            print(f"{table}: {status}")
+    finally:
+        await conn.close()
+
+
+# -- Workload ---------------------------------------------------------------
+
+def make_log(trace_id: str, error_rate: float) -> dict:
+    error = random.random() < error_rate
+    attributes = {"order_id": f"order-{random.randint(1, 200_000)}"}
+    if error:
+        attributes["error_code"] = f"PAY_TIMEOUT_{random.randint(0, 16)}"
+    return {
+        "signal_type": "log",
+        "signal_id": str(uuid4()),
+        "trace_id": trace_id,
+        "service_name": random.choice(SERVICES),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "level": "ERROR" if error else "INFO",
+        "message": "Payment gateway timeout" if error else "Checkout initiated",
+        "attributes": attributes,
+    }
+
+
+def make_metric(trace_id: str) -> dict:
+    return {
+        "signal_type": "metric",
+        "signal_id": str(uuid4()),
+        "trace_id": trace_id,
+        "service_name": random.choice(SERVICES),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "metric_name": "http_latency_ms",
+        "value": random.uniform(20, 500),
+        "unit": "ms",
+        "attributes": {"route": "/checkout"},
+    }
+
+
+def run_trace_id() -> str:
+    return f"loadrun-{uuid4().hex[:12]}"
+
+
+class Workload:
+    """Builds the request for each operation; returns (method, path, params, json body, signals)."""
+
+    def __init__(self, args):
+        self.args = args
+        self.seeded_traces = max(args.seed_rows // SIGNALS_PER_TRACE, 1)
+
+    def seeded_trace(self) -> str:
+        # Incidents exist for every 10th seeded trace starting at 1
+        return f"load-{random.randrange(self.seeded_traces)}"
+
+    def since(self, hours: float) -> str:
+        return (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+
+    def ingest_log(self):
+        return "POST", "/ingest/logs", None, make_log(run_trace_id(), self.args.error_rate), 1
+
+    def ingest_metric(self):
+        return "POST", "/ingest/metrics", None, make_metric(run_trace_id()), 1
+
+    def ingest_batch(self):
+        trace_id = run_trace_id()
+        body = [make_log(trace_id, self.args.error_rate) for _ in range(self.args.batch_size)]
+        return "POST", "/ingest/batch", None, body, len(body)
+
+    def query_signals(self):
+        params = {"service_name": random.choice(SERVICES), "limit": 100}
+        return "GET", "/query/signals", params, None, 0
+
+    def query_errors(self):
+        params = {"level": "ERROR", "start_time": self.since(1), "limit": 100}
+        return "GET", "/query/signals", params, None, 0
+
+    def query_order(self):
+        params = {"order_id": f"order-{random.randint(1, 200_000)}", "limit": 100}
+        return "GET", "/query/signals", params, None, 0
+
+    def query_trace(self):
+        return "GET", f"/query/traces/{self.seeded_trace()}", None, None, 0
+
+    def query_incidents(self):
+        params = {"status": random.choice(["open", "resolved"]), "limit": 50}
+        return "GET", "/query/incidents", params, None, 0
+
+    def query_metric_series(self):
+        params = {
+            "service_name": random.choice(SERVICES), "metric_name": "http_latency_ms",
+            "start_time": self.since(24), "end_time": self.since(0),
+        }
+        return "GET", "/query/metrics/series", params, None, 0
+
+
+OPERATIONS = [name for name in vars(Workload) if name.startswith(("ingest_", "query_"))]
+
+MIXES = {
+    "ingest": "ingest_log=60,ingest_metric=20,ingest_batch=20",
+    "query": "query_signals=25,query_errors=20,query_order=15,query_trace=20,query_incidents=15,query_metric_series=5",
+    "mixed": "ingest_log=45,ingest_metric=10,ingest_batch=5,query_signals=10,query_errors=10,"
+             "query_order=5,query_trace=10,query_incidents=5",
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    spec = MIXES.get(spec, spec)
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.signals: Dict[str, int] = {}
+        self.schedule_lag: List[float] = []
+
+    def record(self, op: str, seconds: float, status: str, signals: int):
+        if status.startswith("2"):
+            self.latencies.setdefault(op, []).append(seconds)
+            self.signals[op] = self.signals.get(op, 0) + signals
+        else:
+            errors = self.errors.setdefault(op, {})
+            errors[status] = errors.get(status, 0) + 1
+
+
+def percentile(ordered: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    def latency_summary(values: List[float]) -> dict:
+        ordered = sorted(values)
+        ms = lambda v: round(v * 1000, 2) if v is not None else None
+        return {
+            "p50_ms": ms(percentile(ordered, 0.50)),
+            "p95_ms": ms(percentile(ordered, 0.95)),
+            "p99_ms": ms(percentile(ordered, 0.99)),
+            "max_ms": ms(ordered[-1] if ordered else None),
+        }
+
+    operations = {}
+    for op in sorted(set(recorder.latencies) | set(recorder.errors)):
+        ok = recorder.latencies.get(op, [])
+        operations[op] = {
+            "ok": len(ok),
+            "errors": recorder.errors.get(op, {}),
+            "rps": round(len(ok) / elapsed, 1),
+            "signals_per_second": round(recorder.signals.get(op, 0) / elapsed, 1),
+            **latency_summary(ok),
+        }
+    every = [value for values in recorder.latencies.values() for value in values]
+    return {
+        "operations": operations,
+        "totals": {
+            "ok": len(every),
+            "errors": sum(sum(errors.values()) for errors in recorder.errors.values()),
+            "rps": round(len(every) / elapsed, 1),
+            "signals_per_second": round(sum(recorder.signals.values()) / elapsed, 1),
+            **latency_summary(every),
+            "schedule_lag_p99_ms": round((percentile(sorted(recorder.schedule_lag), 0.99) or 0) * 1000, 2),
+        },
+    }
+
+
+async def sample_container_cpu(containers: List[str], samples: Dict[str, List[float]], stop: asyncio.Event):
+    """Append `docker stats` CPU% of each container about once per second until `stop`."""
+    while not stop.is_set():
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "docker", "stats", "--no-stream", "--format", "{{.Name}} {{.CPUPerc}}", *containers,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            )
+            out, _ = await proc.communicate()
+        except FileNotFoundError:
+            return  # no docker CLI
+        for line in out.decode().splitlines():
+            name, _, cpu = line.partition(" ")
+            if name in samples and cpu.endswith("%"):
+                samples[name].append(float(cpu[:-1]))
+        try:
+            await asyncio.wait_for(stop.wait(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def pg_stats(dsn: str) -> Optional[dict]:
+    try:
+        conn = await asyncpg.connect(dsn, timeout=5)
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError):
+        return None
+    try:
+        return dict(await conn.fetchrow(PG_STATS))
+    finally:
+        await conn.close()
+
+
+async def drive(args, mix: Dict[str, float], recorder: Recorder, client):
+    workload = Workload(args)
+    names = list(mix)
+    cumulative = list(accumulate(mix[name] for name in names))
+    semaphore = asyncio.Semaphore(args.concurrency)
+    loop = asyncio.get_running_loop()
+    warmup_until = loop.time() + args.warmup
+    deadline = warmup_until + args.duration
+
+    def choose() -> str:
+        return names[bisect.bisect(cumulative, random.random() * cumulative[-1])]
+
+    async def send(op: str, scheduled: float):
+        method, path, params, body, signals = getattr(workload, op)()
+        try:
+            response = await client.request(method, path, params=params, json=body)
+            status = str(response.status_code)
+        except Exception as exc:
+            status = type(exc).__name__
+        if scheduled >= warmup_until:
+            recorder.record(op, loop.time() - scheduled, status, signals)
+
+    if args.rps > 0:
+        # Open loop: one request every 1/rps seconds whatever the latency
+        interval = 1.0 / args.rps
+        tasks = set()
+
+        async def bounded(op: str, scheduled: float):
+            async with semaphore:
+                if scheduled >= warmup_until:
+                    recorder.schedule_lag.append(loop.time() - scheduled)
+                await send(op, scheduled)
+
+        scheduled = loop.time()
+        while scheduled < deadline:
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(bounded(choose(), scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            scheduled += interval
+        if tasks:
+            await asyncio.wait(tasks)
+    else:
+        async def worker():
+            while loop.time() < deadline:
+                await send(choose(), loop.time())
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+
+def git_info() -> dict:
+    def git(*cmd) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *cmd], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+async def run(args):
+    import httpx
+
+    mix = parse_mix(args.mix)
+    recorder = Recorder()
+    cpu_samples = {name: [] for name in args.container}
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_container_cpu(args.container, cpu_samples, stop))
+
+    print(f"{args.mix}: {'%s rps' % args.rps if args.rps else 'closed loop'}, "
+          f"concurrency {args.concurrency}, {args.warmup}s warmup + {args.duration}s")
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        (await client.get("/ingest/health")).raise_for_status()
+        started_at = datetime.now(timezone.utc)
+        driving = asyncio.create_task(drive(args, mix, recorder, client))
+        # Counters and the clock start once the warmup is over
+        await asyncio.sleep(args.warmup)
+        before = await pg_stats(args.dsn)
+        measure_start = time.perf_counter()
+        await driving
+        elapsed = time.perf_counter() - measure_start
+        after = await pg_stats(args.dsn)
+
+    stop.set()
+    await sampler
+
+    result = {
+        "benchmark": "loadtest",
+        "git": git_info(),
+        "started_at": started_at.isoformat(),
+        "elapsed_seconds": round(elapsed, 2),
+        "config": {key: value for key, value in vars(args).items() if key not in ("func", "dsn", "output")},
+        **summarize(recorder, elapsed),
+        "postgres": {key: after[key] - before[key] for key in after} if before and after else None,
+        "container_cpu_percent": {
+            name: {"avg": round(sum(values) / len(values), 1), "max": max(values)} if values else None
+            for name, values in cpu_samples.items()
+        },
+    }
+    if result["postgres"]:
+        result["postgres"]["commits_per_second"] = round(result["postgres"]["xact_commit"] / elapsed, 1)
+
+    print_result(result)
+    output = args.output or os.path.join(
+        RESULTS_DIR,
+        f"loadtest-{(result['git']['commit'] or 'nogit')[:10]}-{started_at:%Y%m%dT%H%M%S}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nSaved {output}")
+
+
+def print_result(result: dict):
+    print(f"\n{'operation':<22} {'ok':>8} {'err':>6} {'rps':>8} {'sig/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = list(result["operations"].items()) + [("TOTAL", result["totals"])]
+    for op, stats in rows:
+        errors = stats["errors"] if isinstance(stats["errors"], int) else sum(stats["errors"].values())
+        fmt = lambda v: f"{v:>8.1f}" if v is not None else f"{'-':>8}"
+        print(f"{op:<22} {stats['ok']:>8} {errors:>6} {stats['rps']:>8.1f} {stats['signals_per_second']:>9.0f} "
+              f"{fmt(stats['p50_ms'])} {fmt(stats['p95_ms'])} {fmt(stats['p99_ms'])}")
+    for op, stats in result["operations"].items():
+        if stats["errors"]:
+            print(f"  {op} errors: {stats['errors']}")
+    if result["totals"]["schedule_lag_p99_ms"] > 10:
+        print(f"Warning: p99 send delay {result['totals']['schedule_lag_p99_ms']} ms; "
+              f"raise --concurrency or the client is the bottleneck")
+    if result["postgres"]:
+        pg = result["postgres"]
+        hit = pg["blks_hit"] / max(pg["blks_hit"] + pg["blks_read"], 1)
+        print(f"Postgres: {pg['commits_per_second']} commits/s, {pg['tup_inserted']} rows inserted, "
+              f"{hit:.1%} buffer hit rate")
+    for name, cpu in result["container_cpu_percent"].items():
+        print(f"CPU {name}: " + (f"avg {cpu['avg']}%, max {cpu['max']}%" if cpu else "not sampled"))
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    label = lambda run: f"{(run['git']['commit'] or '?')[:10]}{'+' if run['git']['dirty'] else ''}"
+    print(f"{label(baseline)} -> {label(candidate)}")
+    print(f"{'operation':<22} {'metric':<8} {'before':>10} {'after':>10} {'change':>8}")
+    ops = sorted(set(baseline["operations"]) & set(candidate["operations"])) + ["TOTAL"]
+    for op in ops:
+        before = baseline["totals"] if op == "TOTAL" else baseline["operations"][op]
+        after = candidate["totals"] if op == "TOTAL" else candidate["operations"][op]
+        for metric in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            old, new = before.get(metric), after.get(metric)
+            change = f"{(new - old) / old:+.0%}" if old and new is not None else "-"
+            print(f"{op:<22} {metric:<8} {old if old is not None else '-':>10} "
+                  f"{new if new is not None else '-':>10} {change:>8}")
+    for name in candidate.get("container_cpu_percent", {}):
+        old = (baseline.get("container_cpu_percent") or {}).get(name)
+        new = candidate["container_cpu_percent"][name]
+        if old and new:
+            print(f"{'CPU ' + name:<31} {old['avg']:>10} {new['avg']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Bulk-load a synthetic corpus")
+    seed_parser.add_argument("--dsn", default=default_dsn())
+    seed_parser.add_argument("--rows", type=int, default=1_000_000)
+    seed_parser.add_argument("--days", type=int, default=7, help="Spread the corpus over this many days")
+    seed_parser.set_defaults(func=seed)
+
+    run_parser = commands.add_parser("run", help="Drive /ingest and /query and record latencies")
+    run_parser.add_argument("--url", default="http://localhost:8000")
+    run_parser.add_argument("--dsn", default=default_dsn(), help="For pg_stat_database deltas")
+    run_parser.add_argument("--mix", default="mixed",
+                            help=f"Preset ({', '.join(MIXES)}) or op=weight,... from: {', '.join(OPERATIONS)}")
+    run_parser.add_argument("--duration", type=float, default=60)
+    run_parser.add_argument("--warmup", type=float, default=5)
+    run_parser.add_argument("--concurrency", type=int, default=32)
+    run_parser.add_argument("--rps", type=float, default=200, help="Offered load; 0 for closed loop")
+    run_parser.add_argument("--batch-size", type=int, default=100)
+    run_parser.add_argument("--error-rate", type=float, default=0.02)
+    run_parser.add_argument("--seed-rows", type=int, default=1_000_000, help="--rows of the seed step")
+    run_parser.add_argument("--timeout", type=float, default=30)
+    run_parser.add_argument("--container", action="append",
+                            help="Container to sample CPU of (repeatable)")
+    run_parser.add_argument("--output", help=f"Result file (default: {RESULTS_DIR}/loadtest-<commit>-<time>.json)")
+    run_parser.add_argument("--random-seed", type=int, default=7)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Diff two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.set_defaults(func=compare)
+
+    clean_parser = commands.add_parser("clean", help="Delete seeded and load-test signals and incidents")
+    clean_parser.add_argument("--dsn", default=default_dsn())
+    clean_parser.set_defaults(func=clean)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        args.container = args.container or ["prodsentinel-postgres", "prodsentinel-backend"]
+        random.seed(args.random_seed)
+    if asyncio.iscoroutinefunction(args.func):
+        asyncio.run(args.func(args))
+    else:
+        args.func(args)
+
+
+if __name__ == "__main__":
+    main()
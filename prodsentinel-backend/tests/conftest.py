@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime, timezone
+import pytest
+
+from app.schemas.signals import LogSignalV1
+
+
+@pytest.fixture
+def log():
+    """Factory of valid LogSignalV1 signals, each with a fresh signal_id."""
+
+    def make(
+        trace_id: str = "req-42",
+        level: str = "INFO",
+        message: str = "Checkout initiated",
+        service_name: str = "payment-service",
+    ) -> LogSignalV1:
+        return LogSignalV1(
+            signal_id=uuid.uuid4(),
+            trace_id=trace_id,
+            service_name=service_name,
+            timestamp=datetime.now(timezone.utc),
+            level=level,
+            message=message,
+        )
+
+    return make
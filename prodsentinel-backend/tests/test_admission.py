@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from app.core.admission import AdmissionController, AdmissionRejected, HIGH, LOW
+
+
+def make_controller(**overrides):
+    options = dict(
+        max_in_flight=2,
+        max_queue=2,
+        queue_timeout_ms=200,
+        low_priority_share=0.5,
+        pool_wait_shed_ms=100,
+        retry_after_seconds=3,
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+@pytest.mark.asyncio
+async def test_reserved_slots_for_high_priority_and_fast_shedding():
+    controller = make_controller(max_queue=0)
+
+    async with controller.admit(LOW):
+        # Low-priority share (1 of 2 slots) is used up, the queue is disabled
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with controller.admit(LOW):
+                pass
+        assert exc_info.value.retry_after == 3
+
+        async with controller.admit(HIGH):
+            assert controller.in_flight == 2
+
+    assert controller.in_flight == 0
+    assert controller.stats()["shed"] == {"low:queue_full": 1}
+
+
+@pytest.mark.asyncio
+async def test_queued_high_priority_is_woken_first():
+    controller = make_controller(max_in_flight=1, low_priority_share=1.0)
+    order = []
+
+    async def work(priority):
+        async with controller.admit(priority):
+            order.append(priority)
+            await asyncio.sleep(0)
+
+    async with controller.admit(HIGH):
+        low = asyncio.create_task(work(LOW))
+        await asyncio.sleep(0)
+        high = asyncio.create_task(work(HIGH))
+        await asyncio.sleep(0)
+        assert controller.queued == 2
+
+    await asyncio.gather(low, high)
+    assert order == [HIGH, LOW]
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_and_pool_wait_shedding():
+    now = [0.0]
+    controller = make_controller(max_in_flight=1, queue_timeout_ms=10, clock=lambda: now[0])
+
+    async with controller.admit(HIGH):
+        with pytest.raises(AdmissionRejected):
+            async with controller.admit(HIGH):
+                pass
+    assert controller.queued == 0
+    assert controller.in_flight == 0
+
+    for _ in range(20):
+        controller.record_pool_wait(1000)
+    with pytest.raises(AdmissionRejected) as exc_info:
+        async with controller.admit(LOW):
+            pass
+    assert exc_info.value.reason == "pool_wait"
+
+    # Errors still get through while the pool is slow
+    async with controller.admit(HIGH):
+        pass
+
+    # Without new samples the average decays and low priority is admitted again
+    now[0] += 10
+    async with controller.admit(LOW):
+        pass
@@ -0,0 +1,149 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.services import archive
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def write_day(base, day, rows):
+    """Archive rows the way export_range does: ordered by service, trace, time."""
+    writer = archive._Writer(str(base), "raw_signals_p" + day.strftime("%Y%m%d"))
+    for row in sorted(rows, key=lambda r: (r["service_name"], r["trace_id"], r["timestamp"])):
+        row = dict(row)
+        service_name = row.pop("service_name")
+        writer.add(day.date().isoformat(), service_name, row)
+    writer.close()
+    return writer.files
+
+
+def signal(trace_id, service_name, timestamp, level="INFO"):
+    return {
+        "id": str(uuid.uuid4()),
+        "signal_type": "log",
+        "trace_id": trace_id,
+        "service_name": service_name,
+        "timestamp": timestamp,
+        "payload": json.dumps({"level": level, "message": "Checkout initiated"}),
+        "level": level,
+        "error_code": None,
+        "order_id": None,
+    }
+
+
+@pytest.fixture
+def archived(tmp_path):
+    for day in (utc(2026, 1, 10), utc(2026, 1, 11)):
+        rows = [
+            signal(f"trace-{day.day}-{i % 5}", service, day + timedelta(minutes=i), "ERROR" if i % 10 == 0 else "INFO")
+            for i, service in enumerate(["payment-service", "api gateway/eu"] * 20)
+        ]
+        files = write_day(tmp_path, day, rows)
+        assert len(files) == 2
+    return tmp_path
+
+
+def test_archive_layout_and_coverage(archived):
+    assert archive.archived_days(str(archived)) == [utc(2026, 1, 10).date(), utc(2026, 1, 11).date()]
+    assert (archived / "raw_signals" / "day=2026-01-11" / "service_name=api%20gateway%2Feu").is_dir()
+
+    assert archive.covers(None, str(archived))
+    assert archive.covers(utc(2026, 1, 11, 23), str(archived))
+    assert not archive.covers(utc(2026, 1, 12), str(archived))
+
+
+def test_read_signals_pages_newest_first_with_filters(archived):
+    base = str(archived)
+    signals, total = archive.read_signals(5, base=base)
+    assert total == 80
+    assert [s.timestamp for s in signals] == [utc(2026, 1, 11, 0, 39 - i) for i in range(5)]
+
+    errors, total = archive.read_signals(100, base=base, level="ERROR", service_name="payment-service")
+    assert total == len(errors) == 8
+    assert all(s.payload["level"] == "ERROR" and s.service_name == "payment-service" for s in errors)
+
+    window, total = archive.read_signals(
+        100, base=base, start_time=utc(2026, 1, 10, 0, 30), end_time=utc(2026, 1, 10, 23),
+    )
+    assert total == len(window) == 10
+    assert all(s.timestamp.day == 10 for s in window)
+
+
+def test_read_trace_prunes_by_trace_and_time(archived):
+    base = str(archived)
+    trace = archive.read_trace("trace-10-3", base=base)
+    assert len(trace) == 8
+    assert trace == sorted(trace, key=lambda s: s.timestamp)
+    assert {s.service_name for s in trace} == {"payment-service", "api gateway/eu"}
+
+    assert archive.read_trace("trace-10-3", start_time=utc(2026, 1, 11), base=base) == []
+
+
+def test_read_signals_continues_after_a_cursor(archived):
+    base = str(archived)
+    everything, total = archive.read_signals(100, base=base)
+    assert total == 80
+
+    # Crossing the day boundary, with the cursor row itself excluded
+    last = everything[39]
+    page, total = archive.read_signals(3, base=base, before=(last.timestamp, last.id))
+    assert total == 80
+    assert [s.id for s in page] == [s.id for s in everything[40:43]]
+
+
+def test_read_signals_without_total_stops_once_the_page_is_full(archived):
+    base = str(archived)
+    page, total = archive.read_signals(5, base=base, with_total=False)
+    assert total is None
+    assert [s.timestamp for s in page] == [utc(2026, 1, 11, 0, 39 - i) for i in range(5)]
+    assert archive.read_signals(0, base=base) == ([], 80)
+
+
+@pytest.mark.asyncio
+async def test_signal_pages_only_read_the_archive_when_needed(archived, monkeypatch):
+    from types import SimpleNamespace
+    from app.core.config import settings
+    from app.services import query_service
+
+    class FakeSession:
+        def __init__(self, rows):
+            self.rows = rows
+
+        async def scalar(self, statement):
+            return len(self.rows)
+
+        async def execute(self, statement):
+            rows = self.rows[:statement._limit]
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+    reads = []
+    read_signals = archive.read_signals
+
+    def recording_read_signals(limit, **kwargs):
+        reads.append((limit, kwargs["with_total"]))
+        return read_signals(limit, **kwargs)
+
+    monkeypatch.setattr(settings, "ARCHIVE_PATH", str(archived))
+    monkeypatch.setattr(archive, "read_signals", recording_read_signals)
+
+    recent = [
+        SimpleNamespace(id=uuid.uuid4(), timestamp=utc(2026, 1, 12, 1) - timedelta(minutes=i)) for i in range(3)
+    ]
+    page, total, next_cursor = await query_service.get_signals(FakeSession(recent), limit=2, count="none")
+    assert page == recent[:2] and total is None and next_cursor
+    assert reads == []
+
+    page, total, _ = await query_service.get_signals(FakeSession(recent), limit=2, count="exact")
+    assert page == recent[:2] and total == 3 + 80
+    assert reads == [(0, True)]
+
+    # Postgres runs out: the page continues into the archive, still without counting it
+    page, total, _ = await query_service.get_signals(FakeSession(recent), limit=5, count="none")
+    assert page[:3] == recent and page[3].timestamp == utc(2026, 1, 11, 0, 39)
+    assert total is None and reads[-1] == (6, False)
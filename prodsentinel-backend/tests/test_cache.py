@@ -0,0 +1,49 @@
+from app.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    """
+    Test that entries are served until their TTL elapses and then count as misses.
+    """
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl_seconds=300, clock=clock)
+    cache.set("trace-1", True)
+
+    clock.now = 299
+    assert cache.get("trace-1") is True
+    clock.now = 300
+    assert cache.get("trace-1") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_per_entry_ttl_overrides_default():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl_seconds=300, clock=clock)
+    cache.set("trace-1", True, ttl_seconds=5)
+
+    clock.now = 6
+    assert cache.get("trace-1") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    """
+    Test that reading an entry protects it from eviction when the cache is full.
+    """
+    cache = TTLCache(maxsize=2, ttl_seconds=300, clock=FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
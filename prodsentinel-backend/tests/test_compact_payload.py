@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime, timezone
+from app.models.raw_signal import RawSignal
+from app.schemas.common import COLUMN_FIELDS
+from app.schemas.query import SignalRead
+from app.schemas.signals import LogSignalV1, MetricSampleV1
+from app.services.ingestion_service import signal_payload
+
+
+def stored(signal, payload):
+    return RawSignal(
+        id=signal.signal_id,
+        signal_type=signal.signal_type.value,
+        trace_id=signal.trace_id,
+        service_name=signal.service_name,
+        timestamp=signal.timestamp,
+        payload=payload,
+    )
+
+
+def test_stored_payload_omits_column_fields_and_reads_back_in_full():
+    signal = LogSignalV1(
+        signal_id=uuid.uuid4(),
+        trace_id="req-42",
+        service_name="payment-service",
+        timestamp=datetime.now(timezone.utc),
+        level="ERROR",
+        message="Payment gateway timeout",
+        attributes={"error_code": "PAY_TIMEOUT"},
+    )
+    payload = signal_payload(signal)
+    assert not COLUMN_FIELDS & payload.keys()
+    assert payload == {"level": "ERROR", "message": "Payment gateway timeout", "attributes": {"error_code": "PAY_TIMEOUT"}}
+
+    read = SignalRead.model_validate(stored(signal, payload)).model_dump(mode="json")
+    full = signal.model_dump(mode="json")
+    assert read["payload"] == full
+    assert list(read["payload"]) == list(full)
+
+
+def test_rows_stored_before_compaction_read_the_same():
+    signal = MetricSampleV1(
+        signal_id=uuid.uuid4(),
+        trace_id="req-7",
+        service_name="inventory-service",
+        timestamp=datetime.now(timezone.utc),
+        metric_name="latency_ms",
+        value=812.5,
+        unit="ms",
+    )
+    legacy = signal.model_dump(mode="json")
+    read = SignalRead.model_validate(stored(signal, legacy)).model_dump(mode="json")
+    assert read["payload"] == legacy
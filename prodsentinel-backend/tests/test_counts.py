@@ -0,0 +1,49 @@
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.models.incident import Incident
+from app.services import counts
+
+
+class FakeSession:
+    """Answers EXPLAIN with a plan of `plan_rows` rows and count(*) with `exact`."""
+
+    def __init__(self, plan_rows, exact):
+        self.plan_rows = plan_rows
+        self.exact = exact
+        self.statements = []
+
+    async def scalar(self, statement):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        if sql.startswith("EXPLAIN"):
+            return [{"Plan": {"Plan Rows": self.plan_rows}}]
+        return self.exact
+
+
+@pytest.mark.asyncio
+async def test_estimated_totals_come_from_the_plan_and_are_cached():
+    query = select(Incident).where(Incident.severity == "HIGH", Incident.status == "OPEN")
+    db = FakeSession(plan_rows=250_000, exact=249_312)
+
+    assert await counts.count(db, query, "estimated") == 250_000
+    assert await counts.count(db, query, "estimated") == 250_000
+    assert len(db.statements) == 1
+    assert db.statements[0].startswith("EXPLAIN (FORMAT JSON) SELECT incidents.id")
+    assert "count(" not in db.statements[0]
+
+    assert await counts.count(db, query, "exact") == 249_312
+    assert await counts.count(db, query, "none") is None
+    assert len(db.statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_small_estimates_are_replaced_by_the_exact_count():
+    query = select(Incident).where(Incident.trace_id == "trace-small")
+    db = FakeSession(plan_rows=settings.QUERY_COUNT_EXACT_BELOW - 1, exact=3)
+
+    assert await counts.count(db, query, "estimated") == 3
+    assert db.statements[-1].startswith("SELECT count(*)")
@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import query_service
+from app.utils.cursor import encode_cursor, decode_cursor
+
+
+class FakeSession:
+    """Records statements; returns `rows` (cut to the statement's LIMIT) for selects."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def scalar(self, statement):
+        return len(self.rows)
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        rows = self.rows[:statement._limit]
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    timestamp = datetime(2026, 10, 17, 12, 30, 1, 250, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+    cursor = encode_cursor(timestamp, row_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, row_id)
+
+    for garbage in ("", "not a cursor", encode_cursor(timestamp, row_id)[:-4] + "!!!!"):
+        with pytest.raises(ValueError):
+            decode_cursor(garbage)
+
+
+@pytest.mark.asyncio
+async def test_incident_pages_seek_past_the_cursor():
+    start = datetime(2026, 10, 17, tzinfo=timezone.utc)
+    rows = [SimpleNamespace(id=uuid.uuid4(), detected_at=start - timedelta(minutes=i)) for i in range(3)]
+    db = FakeSession(rows)
+
+    page, total, next_cursor = await query_service.get_incidents(db, limit=2)
+    assert page == rows[:2] and total == 3
+    assert decode_cursor(next_cursor) == (rows[1].detected_at, rows[1].id)
+    assert "ORDER BY incidents.detected_at DESC, incidents.id DESC" in db.statements[-1]
+
+    db.rows = rows[2:]
+    page, _, next_cursor = await query_service.get_incidents(db, limit=2, cursor=next_cursor)
+    assert page == rows[2:] and next_cursor is None
+    assert "WHERE (incidents.detected_at, incidents.id) < (" in db.statements[-1]
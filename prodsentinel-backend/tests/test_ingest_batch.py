@@ -0,0 +1,73 @@
+import uuid
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.core.database import get_db
+from app.routers import ingest
+from app.services.spool import spool
+
+
+@pytest.fixture
+def item(log):
+    """JSON batch items of ERROR logs."""
+    return lambda **fields: log(level="ERROR", **fields).model_dump(mode="json")
+
+
+class FakeSession:
+    async def connection(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """The ingest router over a fake database that refuses "poison" messages."""
+    database = {"up": True, "stored": set(), "writes": []}
+
+    async def ingest_signals_batch(db, signals):
+        database["writes"].append(len(signals))
+        if not database["up"]:
+            raise OperationalError("INSERT ...", {}, ConnectionRefusedError("connection refused"))
+        if any(signal.message == "poison" for signal in signals):
+            raise IntegrityError("INSERT ...", {}, ValueError("invalid byte sequence"))
+        database["stored"].update(signal.signal_id for signal in signals)
+
+    monkeypatch.setattr(ingest, "ingest_signals_batch", ingest_signals_batch)
+    monkeypatch.setattr(spool, "enabled", False)
+    app = FastAPI()
+    app.include_router(ingest.router)
+    app.dependency_overrides[get_db] = FakeSession
+    return TestClient(app), database
+
+
+def test_only_the_refused_items_of_a_batch_are_rejected(client, item):
+    client, database = client
+    resent = item()
+    items = [item(), item(message="poison"), {"signal_type": "log"}, resent, resent]
+
+    response = client.post("/ingest/batch", json=items)
+    assert response.status_code == 202
+    body = response.json()
+    assert (body["accepted"], body["rejected"], body["failed"]) == (3, 2, 0)
+    assert [r["status"] for r in body["results"]] == ["accepted", "rejected", "rejected", "accepted", "accepted"]
+    assert body["results"][1]["error"].startswith("refused by storage: invalid byte sequence")
+    # The batch, then each of its three distinct signals on its own
+    assert database["writes"] == [3, 1, 1, 1]
+    assert database["stored"] == {uuid.UUID(items[0]["signal_id"]), uuid.UUID(resent["signal_id"])}
+
+    # Already stored: accepted again, the insert skips it
+    assert client.post("/ingest/batch", json=[resent]).json()["accepted"] == 1
+
+
+def test_an_unavailable_database_fails_the_valid_items(client, item):
+    client, database = client
+    database["up"] = False
+
+    response = client.post("/ingest/batch", json=[item(), item(message="poison"), {"signal_type": "log"}])
+    assert response.status_code == 503
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == ["failed", "failed", "rejected"]
+    assert body["results"][0]["error"] == "storage unavailable"
+    assert database["writes"] == [2]
@@ -0,0 +1,88 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.models.incident import IncidentSeverity
+from app.schemas.signals import LogSignalV1, MetricSampleV1
+from app.services import ingestion_service
+
+
+class FakeSession:
+    """Compiles every statement; the raw_signals insert returns the ids not stored before."""
+
+    def __init__(self):
+        self.stored = set()
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        self.statements.append(str(compiled))
+        ids = set()
+        if str(compiled).startswith("INSERT INTO raw_signals"):
+            ids = {value for key, value in compiled.params.items() if key.startswith("id_m")} - self.stored
+            self.stored |= ids
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: list(ids)))
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def signals():
+    now = datetime.now(timezone.utc)
+    common = dict(trace_id="req-42", service_name="payment-service", timestamp=now)
+    return [
+        LogSignalV1(signal_id=uuid.uuid4(), level="ERROR", message="Payment gateway timeout", **common),
+        MetricSampleV1(signal_id=uuid.uuid4(), metric_name="latency_ms", value=120.0, unit="ms", **common),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resent_signals_insert_nothing_and_touch_nothing_else(monkeypatch):
+    triggered, bumps = [], []
+
+    async def trigger_analysis(trace_id):
+        triggered.append(trace_id)
+
+    monkeypatch.setattr(ingestion_service, "_trigger_analysis", trigger_analysis)
+    monkeypatch.setattr(ingestion_service.incidents_version, "changed", lambda: bumps.append(1))
+    monkeypatch.setattr(settings, "METRIC_ROLLUPS_ENABLED", True)
+    db = FakeSession()
+    batch = signals()
+
+    assert await ingestion_service.ingest_signals_batch(db, batch) == 2
+    tables = [sql.split()[2] for sql in db.statements]
+    assert tables == ["raw_signals", "incidents", "metric_rollups"]
+    assert triggered == ["req-42"] and bumps == [1]
+
+    # A client retry of the same batch: the insert returns no ids
+    assert await ingestion_service.ingest_signals_batch(db, batch) == 0
+    assert [sql.split()[2] for sql in db.statements[3:]] == ["raw_signals"]
+    assert triggered == ["req-42"] and bumps == [1]
+    assert db.commits == 2
+
+
+@pytest.mark.asyncio
+async def test_incident_upsert_merges_counts_services_and_severity_server_side():
+    db = FakeSession()
+    await ingestion_service._upsert_incidents(db, {
+        "req-42": {"services": {"payment-service", "api-gateway"}, "count": 3, "severity": IncidentSeverity.HIGH},
+        "req-7": {"services": {"inventory-service"}, "count": 1, "severity": IncidentSeverity.LOW},
+    })
+
+    sql = db.statements[0]
+    assert sql.startswith("INSERT INTO incidents")
+    assert "ON CONFLICT (trace_id) DO UPDATE SET" in sql
+    assert "error_count = (coalesce(incidents.error_count, " in sql and "+ excluded.error_count" in sql
+    assert "affected_services = ARRAY(SELECT DISTINCT unnest(incidents.affected_services || excluded.affected_services))" in sql
+    assert "severity = greatest(incidents.severity, excluded.severity)" in sql
+
+    await ingestion_service._upsert_incidents(db, {})
+    assert len(db.statements) == 1
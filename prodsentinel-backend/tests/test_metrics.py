@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_request_latency_is_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.RequestMetricsMiddleware)
+
+    @app.get("/things/{thing_id}")
+    async def get_thing(thing_id: str):
+        return {"id": thing_id}
+
+    labels = {"method": "GET", "route": "/things/{thing_id}", "status": "200"}
+    before = sample("prodsentinel_http_request_duration_seconds_count", **labels)
+    unmatched = sample("prodsentinel_http_request_duration_seconds_count",
+                       method="GET", route="unmatched", status="404")
+
+    client = TestClient(app)
+    for thing_id in ("a", "b", "c"):
+        assert client.get(f"/things/{thing_id}").status_code == 200
+    assert client.get("/nowhere").status_code == 404
+
+    assert sample("prodsentinel_http_request_duration_seconds_count", **labels) == before + 3
+    assert sample("prodsentinel_http_request_duration_seconds_count",
+                  method="GET", route="unmatched", status="404") == unmatched + 1
+
+
+def test_pool_gauges_follow_checkout_and_checkin():
+    engine = create_engine("sqlite://", poolclass=QueuePool)
+    metrics.instrument_pool(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert sample("prodsentinel_db_pool_checked_out") == 1
+    assert sample("prodsentinel_db_pool_checked_out") == 0
+
+    body, content_type = metrics.render()
+    assert content_type.startswith("text/plain")
+    assert b"prodsentinel_db_pool_overflow" in body
@@ -0,0 +1,29 @@
+import pytest
+from app.utils.ndjson import iter_ndjson_lines
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(*parts: bytes, max_line_bytes: int = 1024):
+    return [item async for item in iter_ndjson_lines(_chunks(*parts), max_line_bytes)]
+
+
+@pytest.mark.asyncio
+async def test_lines_split_across_chunks():
+    """
+    Test that records spanning chunk boundaries are reassembled and blank lines skipped.
+    """
+    lines = await _collect(b'{"a": 1}\n{"b"', b': 2}\n\n{"c": 3}')
+    assert lines == [(1, b'{"a": 1}'), (2, b'{"b": 2}'), (4, b'{"c": 3}')]
+
+
+@pytest.mark.asyncio
+async def test_oversized_line_is_dropped():
+    """
+    Test that a line over the limit is reported as None and parsing resumes after it.
+    """
+    lines = await _collect(b"x" * 8, b"x" * 8 + b"\nok\n", max_line_bytes=10)
+    assert lines == [(1, None), (2, b"ok")]
@@ -0,0 +1,90 @@
+from app.services.otlp_mapping import map_logs, map_traces, map_metrics
+
+RESOURCE = {"attributes": [{"key": "service.name", "value": {"stringValue": "payment-service"}}]}
+
+
+def test_log_records_map_to_log_signals():
+    """
+    Test that OTLP/JSON log records become LogSignalV1 with severity mapped to level.
+    """
+    request = {"resourceLogs": [{"resource": RESOURCE, "scopeLogs": [{"logRecords": [{
+        "timeUnixNano": "1700000000000000000",
+        "severityNumber": 21,
+        "body": {"stringValue": "Payment gateway timeout"},
+        "traceId": "5B8EFFF798038103D269B633813FC60C",
+        "attributes": [{"key": "order_id", "value": {"stringValue": "o-1"}}],
+    }]}]}]}
+
+    result = map_logs(request)
+    (signal,) = result.signals
+    assert result.rejected == 0
+    assert signal.service_name == "payment-service"
+    assert signal.trace_id == "5b8efff798038103d269b633813fc60c"
+    assert signal.level == "CRITICAL"
+    assert signal.attributes["order_id"] == "o-1"
+    # Re-sent exports map to the same signal_id
+    assert map_logs(request).signals[0].signal_id == signal.signal_id
+
+
+def test_span_ids_decoded_from_base64():
+    request = {"resourceSpans": [{"resource": RESOURCE, "scopeSpans": [{"spans": [{
+        "traceId": "W47/95gDgQPSabYzgT/GDA==",
+        "spanId": "7uGbfsPBsXQ=",
+        "name": "authorize",
+        "startTimeUnixNano": "1700000000000000000",
+        "endTimeUnixNano": "1700000000250000000",
+        "status": {"code": "STATUS_CODE_ERROR"},
+    }]}]}]}
+
+    (span,) = map_traces(request, id_encoding="base64").signals
+    assert span.trace_id == "5b8efff798038103d269b633813fc60c"
+    assert span.span_id == "eee19b7ec3c1b174"
+    assert span.duration_ms == 250.0
+    assert span.status == "ERROR"
+
+
+def test_histogram_points_store_mean_and_reject_unknown_types():
+    request = {"resourceMetrics": [{"resource": RESOURCE, "scopeMetrics": [{"metrics": [
+        {"name": "http_latency", "unit": "ms", "histogram": {"dataPoints": [
+            {"count": "4", "sum": 10.0, "timeUnixNano": "1700000000000000000"},
+        ]}},
+        {"name": "mystery"},
+    ]}]}]}
+
+    result = map_metrics(request)
+    (sample,) = result.signals
+    assert sample.value == 2.5
+    assert sample.attributes["count"] == 4
+    assert result.rejected == 1
+
+
+def test_records_without_trace_id_get_their_own_untraced_id():
+    records = [
+        {"timeUnixNano": str(1700000000000000000 + i), "severityText": "ERROR",
+         "body": {"stringValue": f"disk full {i}"}}
+        for i in range(2)
+    ]
+    logs = map_logs({"resourceLogs": [{"resource": RESOURCE, "scopeLogs": [{"logRecords": records}]}]}).signals
+    metrics = map_metrics({"resourceMetrics": [{"resource": RESOURCE, "scopeMetrics": [{"metrics": [
+        {"name": "queue_depth", "gauge": {"dataPoints": [{"asInt": "7", "timeUnixNano": "1700000000000000000"}]}},
+    ]}]}]}).signals
+
+    assert [s.trace_id for s in logs] == [f"untraced:{s.signal_id}" for s in logs]
+    assert len({s.trace_id for s in logs}) == 2
+    assert metrics[0].trace_id == f"untraced:{metrics[0].signal_id}"
+
+
+def test_every_severity_encoding_maps_to_one_level():
+    def level(**record):
+        request = {"resourceLogs": [{"resource": RESOURCE, "scopeLogs": [{"logRecords": [
+            {"timeUnixNano": "1700000000000000000", "body": {"stringValue": "x"}, **record},
+        ]}]}]}
+        return map_logs(request).signals[0].level
+
+    assert level(severityNumber=13) == level(severityNumber="SEVERITY_NUMBER_WARN") == "WARNING"
+    assert level(severityNumber="SEVERITY_NUMBER_WARN3") == level(severityText="warn") == "WARNING"
+    assert level(severityText="Warning") == level(severityNumber=15, severityText="whatever") == "WARNING"
+    assert level(severityNumber="SEVERITY_NUMBER_FATAL") == level(severityText="FATAL") == "CRITICAL"
+    assert level(severityNumber="SEVERITY_NUMBER_TRACE") == "TRACE"
+    assert level(severityNumber="SEVERITY_NUMBER_UNSPECIFIED") == level(severityText="verbose-ish") == "INFO"
+    assert level(severityNumber=0, severityText="ERROR") == "ERROR"
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+import pytest
+from app.services.partitions import (
+    PartitionMaintainer, parse_bounds, partition_name, planned_partitions, overlaps,
+)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_planned_partitions_cover_current_and_upcoming_periods():
+    now = utc(2026, 10, 17, 13, 45)
+
+    daily = planned_partitions(now, "day", ahead=2)
+    assert daily == [
+        (utc(2026, 10, 17), utc(2026, 10, 18)),
+        (utc(2026, 10, 18), utc(2026, 10, 19)),
+        (utc(2026, 10, 19), utc(2026, 10, 20)),
+    ]
+    assert partition_name(daily[0][0], "day") == "raw_signals_p20261017"
+
+    hourly = planned_partitions(now, "hour", ahead=1)
+    assert hourly == [
+        (utc(2026, 10, 17, 13), utc(2026, 10, 17, 14)),
+        (utc(2026, 10, 17, 14), utc(2026, 10, 17, 15)),
+    ]
+    assert partition_name(hourly[1][0], "hour") == "raw_signals_p2026101714"
+
+
+def test_existing_partition_bounds_are_parsed_and_respected():
+    bounds = parse_bounds("FOR VALUES FROM ('2026-10-17 00:00:00+00') TO ('2026-10-18 00:00:00+00')")
+    assert bounds == (utc(2026, 10, 17), utc(2026, 10, 18))
+    assert parse_bounds("DEFAULT") is None
+
+    existing = {"raw_signals_p20261017": bounds}
+    # An hour inside an existing daily partition is already covered
+    assert overlaps((utc(2026, 10, 17, 13), utc(2026, 10, 17, 14)), existing)
+    assert not overlaps((utc(2026, 10, 18), utc(2026, 10, 18, 1)), existing)
+
+
+def test_invalid_configuration_is_rejected():
+    with pytest.raises(ValueError):
+        PartitionMaintainer("week", 3, 0, "drop", 60)
+    with pytest.raises(ValueError):
+        PartitionMaintainer("day", 3, 30, "truncate", 60)
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+
+@pytest.mark.asyncio
+async def test_retention_keeps_default_partition_rows_when_detaching():
+    existing = {"raw_signals_p20261001": (utc(2026, 10, 1), utc(2026, 10, 2))}
+
+    for action, kept in (("drop", False), ("detach", True)):
+        conn = RecordingConnection()
+        maintainer = PartitionMaintainer("day", 3, 7, action, 60)
+        await maintainer._apply_retention(conn, existing, utc(2026, 10, 10))
+
+        default_sql = [sql for sql in conn.statements if "raw_signals_default" in sql]
+        assert default_sql[-1].startswith("WITH moved AS (DELETE") == kept
+        assert ("INSERT INTO raw_signals_default_detached" in default_sql[-1]) == kept
+        assert maintainer.partitions_removed == 1
@@ -0,0 +1,113 @@
+import asyncio
+from typing import Optional
+import pytest
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.services.response_cache import ResponseCache, IncidentsVersion
+
+VERSION_KEY = "test:incidents:version"
+
+
+class FakeRedis:
+    """The GET/SET/INCR subset used here, decoded like the shared client."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+class Item(BaseModel):
+    name: str
+
+
+def make_app(cache: ResponseCache, loads: list, items: dict):
+    app = FastAPI()
+
+    @app.get("/items/{name}")
+    async def get_item(request: Request, name: str):
+        async def load() -> Optional[Item]:
+            loads.append(name)
+            return Item(name=items[name]) if name in items else None
+        return await cache.respond(request, ("items", name), load, not_found="No such item")
+
+    return TestClient(app)
+
+
+def make_cache(redis, use_redis=False):
+    return ResponseCache(
+        enabled=True, max_entries=16, ttl_seconds=60, use_redis=use_redis,
+        version_key=VERSION_KEY, redis=lambda: redis,
+    )
+
+
+def test_unchanged_polls_are_not_modified_until_the_version_moves():
+    redis, loads = FakeRedis(), []
+    items = {"a": "first"}
+    client = make_app(make_cache(redis), loads, items)
+
+    response = client.get("/items/a")
+    assert response.status_code == 200 and response.json() == {"name": "first"}
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    assert client.get("/items/a", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/items/a").json() == {"name": "first"}  # from the LRU
+    assert loads == ["a"]
+
+    items["a"] = "second"
+    asyncio.run(redis.incr(VERSION_KEY))
+    response = client.get("/items/a", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json() == {"name": "second"}
+    assert response.headers["etag"] != etag
+    assert loads == ["a", "a"]
+
+    # Pending analyses: the 404 is cached too, without an ETag
+    assert client.get("/items/b").status_code == 404
+    response = client.get("/items/b")
+    assert response.status_code == 404 and response.json() == {"detail": "No such item"}
+    assert "etag" not in response.headers
+    assert loads == ["a", "a", "b"]
+
+
+def test_replicas_share_bodies_through_redis():
+    redis, loads = FakeRedis(), []
+    items = {"a": "first"}
+    replica_1 = make_app(make_cache(redis, use_redis=True), loads, items)
+    replica_2 = make_app(make_cache(redis, use_redis=True), loads, items)
+
+    etag = replica_1.get("/items/a").headers["etag"]
+    response = replica_2.get("/items/a")
+    assert response.json() == {"name": "first"} and response.headers["etag"] == etag
+    assert replica_2.get("/items/a", headers={"If-None-Match": etag}).status_code == 304
+    assert loads == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_version_bumps_are_coalesced():
+    redis = FakeRedis()
+    version = IncidentsVersion(VERSION_KEY, min_interval_ms=50, redis=lambda: redis)
+
+    version.changed()
+    await asyncio.sleep(0.01)
+    assert redis.data[VERSION_KEY] == "1"
+
+    # Within the interval: one more bump for all of them, after it
+    for _ in range(5):
+        version.changed()
+    await asyncio.sleep(0.01)
+    assert redis.data[VERSION_KEY] == "1"
+    await asyncio.sleep(0.06)
+    assert redis.data[VERSION_KEY] == "2"
+    assert version.stats() == {"bumps": 2, "coalesced": 4, "failures": 0}
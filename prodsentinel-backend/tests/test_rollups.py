@@ -0,0 +1,69 @@
+import random
+from datetime import datetime, timedelta, timezone
+from app.services.rollups import aggregate_samples, choose_resolution, _metric_samples
+from app.utils.sketch import LogBucketSketch, RELATIVE_ACCURACY
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_sketch_quantiles_are_within_relative_accuracy_and_mergeable():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 1.2) for _ in range(20000)]
+    left, right = LogBucketSketch(), LogBucketSketch()
+    for i, value in enumerate(values):
+        (left if i % 2 else right).add(value)
+
+    # Merging the stored form is how the SQL upsert combines sketches
+    merged = LogBucketSketch(left.to_dict())
+    merged.merge(LogBucketSketch(right.to_dict()))
+    assert merged.count == len(values)
+
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(merged.quantile(q) - exact) <= 2 * RELATIVE_ACCURACY * exact
+
+    mixed = LogBucketSketch()
+    for value in (-10, -1, 0, 1, 10):
+        mixed.add(value)
+    assert mixed.quantile(0) < mixed.quantile(0.25) < mixed.quantile(0.5) == 0 < mixed.quantile(1)
+    assert LogBucketSketch().quantile(0.5) is None
+
+
+def test_samples_are_aggregated_at_every_resolution():
+    rows = [
+        {"signal_type": "metric", "service_name": "payment-service", "timestamp": utc(2026, 10, 17, 13, 45, s),
+         "payload": {"metric_name": "latency_ms", "value": value}}
+        for s, value in ((1, 100.0), (30, 300.0))
+    ] + [
+        {"signal_type": "metric", "service_name": "payment-service", "timestamp": utc(2026, 10, 17, 13, 46),
+         "payload": {"metric_name": "latency_ms", "value": 200.0}},
+        {"signal_type": "log", "service_name": "payment-service", "timestamp": utc(2026, 10, 17, 13, 46),
+         "payload": {"level": "INFO", "message": "ok"}},
+    ]
+    aggregates = aggregate_samples(_metric_samples(rows))
+
+    minute = aggregates[("1m", "payment-service", "latency_ms", utc(2026, 10, 17, 13, 45))]
+    assert (minute.count, minute.sum, minute.min, minute.max) == (2, 400.0, 100.0, 300.0)
+
+    hour = aggregates[("1h", "payment-service", "latency_ms", utc(2026, 10, 17, 13))]
+    day = aggregates[("1d", "payment-service", "latency_ms", utc(2026, 10, 17))]
+    assert hour.count == day.count == 3
+    assert hour.sketch.count == 3
+    assert len(aggregates) == 4
+
+
+def test_resolution_fits_point_budget_and_retention():
+    now = utc(2026, 10, 17, 12)
+    # 2h at 1m = 120 points
+    assert choose_resolution(now - timedelta(hours=2), now, 500, now=now) == "1m"
+    assert choose_resolution(now - timedelta(hours=2), now, 60, now=now) == "1h"
+    # 3 days at 1m = 4320 points
+    assert choose_resolution(now - timedelta(days=3), now, 5000, now=now) == "1m"
+    # 1m rollups are kept 7 days, 1h 90 days by default
+    assert choose_resolution(now - timedelta(days=10), now - timedelta(days=9), 5000, now=now) == "1h"
+    assert choose_resolution(now - timedelta(days=200), now, 5000, now=now) == "1d"
+    # Nothing fits: coarsest
+    assert choose_resolution(now - timedelta(days=400), now, 10, now=now) == "1d"
@@ -0,0 +1,70 @@
+import pytest
+from app.services.sampling import SignalSampler
+
+
+def test_head_rates_are_deterministic_per_trace_and_never_drop_errors(log):
+    sampler = SignalSampler(
+        mode="head",
+        head_rates={"*:INFO": 0.25, "payment-service:DEBUG": 0.0},
+        tail_window_seconds=30,
+        tail_max_traces=100,
+    )
+    assert sampler.rate("payment-service", "INFO") == 0.25
+    assert sampler.rate("payment-service", "WARNING") == 1.0
+
+    traces = [f"trace-{i}" for i in range(2000)]
+    kept = sampler.sample([log(trace_id=t) for t in traces])
+    assert 400 < len(kept) < 600
+    assert all(signal.sample_rate == 0.25 for signal in kept)
+
+    # Same traces, same decisions
+    again = sampler.sample([log(trace_id=t) for t in traces])
+    assert [s.trace_id for s in again] == [s.trace_id for s in kept]
+
+    assert sampler.sample([log(trace_id="t", level="DEBUG")]) == []
+    errors = sampler.sample([log(trace_id=t, level="ERROR") for t in traces[:50]])
+    assert len(errors) == 50 and all(s.sample_rate == 1.0 for s in errors)
+
+    stats = sampler.stats()
+    assert stats["kept"]["payment-service:INFO"] == 2 * len(kept)
+    assert stats["dropped"]["payment-service:DEBUG"] == 1
+
+
+def test_tail_mode_releases_held_signals_when_trace_turns_important(log):
+    now = [0.0]
+    sampler = SignalSampler(
+        mode="tail",
+        head_rates={"*:INFO": 0.0},
+        tail_window_seconds=10,
+        tail_max_traces=100,
+        clock=lambda: now[0],
+    )
+    first, second = log(trace_id="t-1"), log(trace_id="t-1")
+    assert sampler.sample([first, log(trace_id="t-2")]) == []
+    assert sampler.sample([second]) == []
+
+    now[0] = 5
+    error = log(trace_id="t-1", level="ERROR")
+    kept = sampler.sample([error])
+    assert kept == [first, second, error]
+    assert all(s.sample_rate == 1.0 for s in kept)
+
+    # Rest of an important trace is kept while the window lasts
+    follow_up = log(trace_id="t-1")
+    assert sampler.sample([follow_up]) == [follow_up]
+
+    # t-2 never turned important and expires
+    now[0] = 20
+    assert sampler.sample([]) == []
+    stats = sampler.stats()
+    assert stats["tail"]["promoted_traces"] == 1
+    assert stats["tail"]["released_signals"] == 2
+    assert stats["tail"]["expired_signals"] == 1
+    assert stats["tail"]["held_traces"] == 0
+
+
+def test_invalid_configuration_is_rejected():
+    with pytest.raises(ValueError):
+        SignalSampler(mode="reservoir", head_rates={}, tail_window_seconds=1, tail_max_traces=1)
+    with pytest.raises(ValueError):
+        SignalSampler(mode="head", head_rates={"*:INFO": 2}, tail_window_seconds=1, tail_max_traces=1)
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.services.signal_stream import FIELD, StreamWriter
+from app.services.spool import encode_record
+
+
+def entry(entry_id, signal):
+    # Redis hands fields back decoded (decode_responses=True)
+    return entry_id, {FIELD: encode_record(signal).decode()}
+
+
+def make_writer(writer):
+    return StreamWriter(
+        stream="signals:test", group="writers", consumer="w1", batch=100,
+        block_ms=10, claim_idle_ms=1000, claim_interval_seconds=60, writer=writer,
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_stores_batch_once_and_dead_letters_malformed_entries(log):
+    batches = []
+
+    async def writer(signals):
+        batches.append(list(signals))
+
+    first, second = log(), log()
+    entries = [
+        entry("1-0", first),
+        entry("2-0", first),  # redelivered duplicate
+        entry("3-0", second),
+        ("4-0", {FIELD: "deadbeef {not json}\n"}),
+        ("5-0", None),  # deleted while pending
+    ]
+    done, dead = await make_writer(writer).handle(entries)
+
+    assert len(batches) == 1
+    assert {s.signal_id for s in batches[0]} == {first.signal_id, second.signal_id}
+    assert done == ["1-0", "2-0", "3-0", "4-0", "5-0"]
+    assert [d[0] for d in dead] == ["4-0"]
+
+
+@pytest.mark.asyncio
+async def test_handle_isolates_refused_signal_and_keeps_entries_pending_when_db_is_down(log):
+    poison = log(message="poison")
+
+    async def refusing(signals):
+        if any(s.message == "poison" for s in signals):
+            raise IntegrityError("INSERT ...", {}, Exception("bad row"))
+
+    good = log()
+    stream_writer = make_writer(refusing)
+    done, dead = await stream_writer.handle([entry("1-0", good), entry("2-0", poison)])
+    assert done == ["1-0", "2-0"]
+    assert [d[0] for d in dead] == ["2-0"]
+    assert stream_writer.written_total == 1
+
+    async def unavailable(signals):
+        raise OperationalError("INSERT ...", {}, ConnectionRefusedError("connection refused"))
+
+    with pytest.raises(OperationalError):
+        await make_writer(unavailable).handle([entry("1-0", good)])
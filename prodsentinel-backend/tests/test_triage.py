@@ -0,0 +1,58 @@
+import pytest
+from app.models.incident import IncidentSeverity
+from app.services.triage import TriageEngine, DEFAULT_RULES
+
+
+@pytest.fixture
+def engine():
+    return TriageEngine(DEFAULT_RULES)
+
+
+def test_error_log_is_high_and_triggers(engine):
+    decision = engine.evaluate("log", {"level": "ERROR", "message": "Payment declined"})
+    assert decision.severity == IncidentSeverity.HIGH
+    assert decision.trigger
+
+
+def test_info_log_with_failure_message_triggers_without_escalating(engine):
+    decision = engine.evaluate("log", {"level": "INFO", "message": "Retry after FAILURE"})
+    assert decision.severity == IncidentSeverity.LOW
+    assert decision.trigger
+    assert decision.rules == ("failure-message",)
+
+
+def test_latency_threshold(engine):
+    """
+    Test that only latency metrics at or above 2000 escalate severity.
+    """
+    slow = engine.evaluate("metric", {"metric_name": "http_latency_ms", "value": 2000})
+    fast = engine.evaluate("metric", {"metric_name": "http_latency_ms", "value": 1999})
+    other = engine.evaluate("metric", {"metric_name": "queue_depth", "value": 5000})
+    assert slow.severity == IncidentSeverity.HIGH and slow.trigger
+    assert fast.severity == IncidentSeverity.LOW and not fast.trigger
+    assert not other.trigger
+
+
+def test_attributes_are_not_scanned_for_keywords(engine):
+    """
+    Test that keywords buried in unrelated attributes no longer trigger analysis.
+    """
+    payload = {"level": "INFO", "message": "ok", "attributes": {"note": "critical path"}}
+    assert not engine.evaluate("log", payload).trigger
+    payload["attributes"]["error_code"] = "E42"
+    assert engine.evaluate("log", payload).trigger
+
+
+def test_overlapping_substrings_all_match():
+    engine = TriageEngine([
+        {"name": "long", "match": {"message": {"contains": ["failure"]}}, "trigger": True},
+        {"name": "short", "match": {"message": {"contains": ["fail"]}}, "severity": "medium"},
+    ])
+    decision = engine.evaluate("log", {"message": "total FAILURE"})
+    assert decision.rules == ("long", "short")
+    assert decision.severity == IncidentSeverity.MEDIUM
+
+
+def test_unknown_operator_is_rejected():
+    with pytest.raises(ValueError):
+        TriageEngine([{"name": "bad", "match": {"level": {"like": "ERR%"}}}])
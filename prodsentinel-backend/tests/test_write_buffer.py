@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.services.spool import spool
+from app.services.write_buffer import SignalWriteBuffer
+
+
+def ids(signals):
+    return {signal.signal_id for signal in signals}
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    """A buffer whose writer records batches and refuses "poison" messages."""
+    monkeypatch.setattr(spool, "enabled", False)
+    batches = []
+
+    async def writer(signals):
+        if any(signal.message == "poison" for signal in signals):
+            raise IntegrityError("INSERT ...", {}, ValueError("invalid byte sequence"))
+        batches.append({signal.signal_id for signal in signals})
+
+    def make(max_batch=3, flush_ms=10_000):
+        return SignalWriteBuffer(max_batch=max_batch, flush_ms=flush_ms, max_queue=100, writer=writer)
+
+    return make, batches
+
+
+@pytest.mark.asyncio
+async def test_flushes_once_the_batch_is_full(buffer, log):
+    make, batches = buffer
+    write_buffer = make(max_batch=3)
+    await write_buffer.start()
+    signals = [log() for _ in range(4)]
+    for signal in signals:
+        write_buffer.enqueue(signal)
+
+    await asyncio.sleep(0.05)
+    assert batches == [ids(signals[:3])]  # the 4th waits for its deadline
+    await write_buffer.stop()
+    assert batches == [ids(signals[:3]), ids(signals[3:])]
+
+
+@pytest.mark.asyncio
+async def test_flushes_what_accumulated_by_the_deadline(buffer, log):
+    make, batches = buffer
+    write_buffer = make(max_batch=100, flush_ms=30)
+    await write_buffer.start()
+    signals = [log(), log()]
+    for signal in signals:
+        write_buffer.enqueue(signal)
+
+    await asyncio.sleep(0.01)
+    assert batches == []
+    await asyncio.sleep(0.05)
+    assert batches == [ids(signals)]
+    await write_buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_the_queue_and_refuses_new_signals(buffer, log):
+    make, batches = buffer
+    write_buffer = make(max_batch=2)
+    await write_buffer.start()
+    signals = [log() for _ in range(5)]
+    for signal in signals:
+        write_buffer.enqueue(signal)
+
+    await write_buffer.stop()
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert set().union(*batches) == ids(signals)
+    assert write_buffer.stats()["signals_flushed"] == 5
+    with pytest.raises(Exception, match="not accepting"):
+        write_buffer.enqueue(log())
+
+
+@pytest.mark.asyncio
+async def test_refused_batches_are_written_one_by_one(buffer, log):
+    make, batches = buffer
+    write_buffer = make(max_batch=3)
+    await write_buffer.start()
+    signals = [log(), log(message="poison"), log()]
+    for signal in signals:
+        write_buffer.enqueue(signal)
+
+    await write_buffer.stop()
+    assert [len(batch) for batch in batches] == [1, 1]
+    assert set().union(*batches) == ids(signals[::2])
+    stats = write_buffer.stats()
+    assert (stats["signals_flushed"], stats["signals_refused"], stats["signals_failed"]) == (2, 1, 0)
@@ -3,6 +3,8 @@ Send telemetry to ProdSentinel Ingestion API.
 """
 import httpx
 import asyncio
+import gzip
+import json
 from datetime import datetime, timezone
 from uuid import uuid4
 from dotenv import load_dotenv
@@ -13,6 +15,30 @@ load_dotenv()
 
 PRODSENTINEL_URL = os.getenv("PRODSENTINEL_URL", "http://localhost:8000")
 
+# Request body compression: "gzip", "zstd" or empty for none
+PRODSENTINEL_COMPRESSION = os.getenv("PRODSENTINEL_COMPRESSION", "").strip().lower()
+
+
+def encode_body(payload, compression: str = PRODSENTINEL_COMPRESSION):
+    """
+    Serialize a JSON payload, optionally compressed for the wire.
+
+    Returns:
+        (body bytes, extra request headers)
+    """
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    headers = {"Content-Type": "application/json"}
+
+    if compression == "gzip":
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    elif compression == "zstd":
+        import zstandard
+        body = zstandard.ZstdCompressor(level=3).compress(body)
+        headers["Content-Encoding"] = "zstd"
+
+    return body, headers
+
 async def send_log_to_prodsentinel(
     service_name: str,
     trace_id: str,
@@ -40,13 +66,23 @@ async def send_log_to_prodsentinel(
         "attributes": attributes or {}
     }
     
+    body, headers = encode_body(payload)
+    
     try:
         async with httpx.AsyncClient() as client:
             response = await client.post(
                 f"{PRODSENTINEL_URL}/ingest/logs",
-                json=payload,
+                content=body,
+                headers=headers,
                 timeout=10.0  # Increased timeout for cloud backend latency
             )
+            if response.status_code == 429:
+                # Backend is shedding load; drop rather than hold the request open
+                print(
+                    f"[TELEMETRY] Backend overloaded, dropped log "
+                    f"(Retry-After: {response.headers.get('Retry-After')}s)"
+                )
+                return
             response.raise_for_status()
             print(f"[TELEMETRY] Sent log to backend: {service_name} - {message}")
     except Exception as e:
@@ -31,7 +31,7 @@ export const Overview = () => {
         queryKey: ['raw_signals', 'status'],
         queryFn: async () => {
             const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
-            const res = await axios.get(`${API_URL}/query/signals?limit=1`);
+            const res = await axios.get(`${API_URL}/query/signals?limit=1&count=none`);
             return res.data;
         },
         refetchInterval: 10000 // Poll every 10s for status
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { Incident, AnalysisResult, PaginatedResponse } from '../types';
+import type { Incident, AnalysisResult, PaginatedResponse, CountStrategy } from '../types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -7,10 +7,10 @@ const api = axios.create({
     baseURL: API_URL,
 });
 
-export const getIncidents = async (page = 1, limit = 50): Promise<PaginatedResponse<Incident>> => {
+export const getIncidents = async (page = 1, limit = 50, count: CountStrategy = 'exact'): Promise<PaginatedResponse<Incident>> => {
     const offset = (page - 1) * limit;
     const response = await api.get('/query/incidents', {
-        params: { limit, offset }
+        params: { limit, offset, count }
     });
     return response.data;
 };
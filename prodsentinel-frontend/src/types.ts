@@ -38,9 +38,14 @@ export interface AnalysisResult {
     generated_at: string;
 }
 
+// How the backend computes `total`: `none` returns null and relies on `has_more`
+export type CountStrategy = 'exact' | 'estimated' | 'none';
+
 export interface PaginatedResponse<T> {
     items: T[];
-    total: number;
+    total: number | null;
     limit: number;
     offset: number;
+    next_cursor?: string | null;
+    has_more: boolean;
 }
@@ -1,5 +1,7 @@
 from celery import Celery
+from celery.signals import worker_init, worker_ready
 from app.core.config import settings
+from app.core import metrics
 
 # Initialize Celery app
 celery_app = Celery(
@@ -23,3 +25,15 @@ celery_app.conf.update(
     redis_backend_health_check_interval=30,
     broker_connection_retry_on_startup=True,
 )
+
+
+@worker_init.connect
+def _reset_metrics(**kwargs):
+    # Parent process, before the pool forks
+    metrics.reset_multiprocess_dir()
+
+
+@worker_ready.connect
+def _serve_metrics(**kwargs):
+    if settings.WORKER_METRICS_PORT:
+        metrics.start_http_server(settings.WORKER_METRICS_PORT)
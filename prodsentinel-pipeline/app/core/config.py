@@ -31,6 +31,18 @@ class Settings(BaseSettings):
             return urlunparse(u._replace(query=urlencode(query, doseq=True)))
         return v
     
+    # Only signals this recent are fetched for analysis, so the query prunes
+    # raw_signals partitions; 0 disables the bound
+    ANALYSIS_SIGNAL_LOOKBACK_HOURS: int = 24
+    
+    # Port on which the Celery worker serves Prometheus metrics; 0 disables
+    # (see app/core/metrics.py; needs PROMETHEUS_MULTIPROC_DIR with the prefork pool)
+    WORKER_METRICS_PORT: int = 0
+    
+    # Bumped after each stored analysis so the backend's cached incident
+    # reads are refreshed; must match the backend's INCIDENTS_VERSION_KEY
+    INCIDENTS_VERSION_KEY: str = "prodsentinel:incidents:version"
+    
     # AI Config
     GOOGLE_API_KEY: str
 
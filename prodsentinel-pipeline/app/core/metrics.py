@@ -0,0 +1,95 @@
+"""
+Prometheus metrics for the analysis worker.
+
+Celery's prefork pool runs tasks in child processes, so the worker uses
+prometheus_client's multiprocess mode: set PROMETHEUS_MULTIPROC_DIR to a
+directory the children can write to. With WORKER_METRICS_PORT set, the
+worker's parent process serves the summed samples of all children on that
+port; the management API's `/metrics` reports the same when it shares the
+directory. Without prometheus_client installed every metric is a no-op.
+"""
+import glob
+import os
+from contextlib import nullcontext
+from typing import Tuple
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # optional dependency
+    prometheus_client = None
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# An analysis is dominated by the LLM round trips: seconds to minutes
+_ANALYSIS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, amount):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def time(self):
+        return nullcontext()
+
+
+def _metric(kind: str, name: str, documentation: str, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+ANALYSIS_PHASE_SECONDS = _metric(
+    "Histogram", "prodsentinel_analysis_phase_duration_seconds",
+    "analyze_trace time by phase: fetch, summarize, llm, persist",
+    ("phase",), buckets=_ANALYSIS_BUCKETS,
+)
+ANALYSIS_SECONDS = _metric(
+    "Histogram", "prodsentinel_analysis_duration_seconds",
+    "End-to-end analyze_trace time by outcome: success, no_signals, error",
+    ("outcome",), buckets=_ANALYSIS_BUCKETS,
+)
+LLM_SECONDS = _metric(
+    "Histogram", "prodsentinel_llm_request_duration_seconds",
+    "Latency of one LLM conversation by model and outcome: ok, empty, error",
+    ("model", "outcome"), buckets=_ANALYSIS_BUCKETS,
+)
+
+
+def available() -> bool:
+    return prometheus_client is not None
+
+
+def registry():
+    if MULTIPROCESS:
+        collector_registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(collector_registry)
+        return collector_registry
+    return prometheus_client.REGISTRY
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition body and content type for every metric of every process."""
+    return prometheus_client.generate_latest(registry()), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def reset_multiprocess_dir():
+    """Remove samples left by a previous worker run (call before forking)."""
+    if MULTIPROCESS:
+        directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+
+
+def start_http_server(port: int):
+    """Serve `/metrics` from the current process on `port`."""
+    if prometheus_client is not None:
+        prometheus_client.start_http_server(port, registry=registry())
+
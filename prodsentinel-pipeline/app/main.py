@@ -1,7 +1,8 @@
 from fastapi import FastAPI, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from app.core.logging import setup_logging, get_logger
 from app.core.config import settings
+from app.core import metrics
 from app.tasks.analysis import analyze_trace
 
 # Initialize logging
@@ -37,6 +38,21 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Prometheus exposition of the analysis metrics.
+    Reports the worker's samples when PROMETHEUS_MULTIPROC_DIR is shared with it.
+    """
+    if not metrics.available():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"error": "prometheus_client is not installed"}
+        )
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
 @app.post("/debug/analyze/{trace_id}", status_code=status.HTTP_202_ACCEPTED)
 async def debug_analyze(trace_id: str):
     """
@@ -74,6 +90,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "debug_analyze": "/debug/analyze/{trace_id}"
         }
     }
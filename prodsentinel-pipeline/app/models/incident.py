@@ -27,7 +27,7 @@ class Incident(Base):
     __tablename__ = "incidents"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    trace_id = Column(String, index=True, nullable=False)
+    trace_id = Column(String, index=True, unique=True, nullable=False)
     status = Column(SQLEnum(IncidentStatus), default=IncidentStatus.OPEN)
     severity = Column(SQLEnum(IncidentSeverity), default=IncidentSeverity.MEDIUM)
     detected_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Enum, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Enum
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from .base import Base
 import enum
 
@@ -20,5 +20,5 @@ class RawSignal(Base):
     signal_type = Column(Enum(SignalTypeEnum), index=True)
     trace_id = Column(String, index=True)
     service_name = Column(String, index=True)
-    timestamp = Column(DateTime(timezone=True), index=True)
-    payload = Column(JSON, nullable=False)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, index=True)
+    payload = Column(JSONB, nullable=False)
@@ -1,8 +1,10 @@
 import json
+import time
 from typing import Dict, Any
 from autogen import AssistantAgent, UserProxyAgent
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import LLM_SECONDS
 
 logger = get_logger(__name__)
 
@@ -20,9 +22,10 @@ def generate_trace_report(summarized_data: Dict[str, Any]) -> str:
     logger.info("Initializing AutoGen agents for analysis")
     
     # Configure Gemini model (AutoGen 0.4.x format)
+    model = "gemini-2.5-flash"
     llm_config = {
         "config_list": [{
-            "model": "gemini-2.5-flash",
+            "model": model,
             "api_key": settings.GOOGLE_API_KEY,
             "api_type": "google"
         }]
@@ -80,10 +83,16 @@ Format as clean Markdown. Use headers for each section. Ensure the fields 'Sever
     
     # Execute analysis
     logger.info("Starting AutoGen conversation")
-    report_generator.initiate_chat(analyzer, message=prompt)
+    start = time.perf_counter()
+    try:
+        report_generator.initiate_chat(analyzer, message=prompt)
+    except Exception:
+        LLM_SECONDS.labels(model, "error").observe(time.perf_counter() - start)
+        raise
     
     # Extract the response
     messages = report_generator.chat_messages[analyzer]
+    LLM_SECONDS.labels(model, "ok" if messages else "empty").observe(time.perf_counter() - start)
     if messages:
         report = messages[-1]["content"]
         logger.info("Analysis complete")
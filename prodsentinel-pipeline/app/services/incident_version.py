@@ -0,0 +1,24 @@
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def bump_incidents_version():
+    """
+    Invalidate the backend's cached incident reads after an analysis write.
+
+    Increments the counter the backend's response cache is keyed on
+    (prodsentinel-backend app/services/response_cache.py). A failure is
+    logged only: the analysis is stored, and the next ingest of an error
+    bumps the version anyway.
+    """
+    client = aioredis.from_url(settings.REDIS_URL)
+    try:
+        await client.incr(settings.INCIDENTS_VERSION_KEY)
+    except RedisError as e:
+        logger.warning(f"Failed to bump {settings.INCIDENTS_VERSION_KEY}: {e}")
+    finally:
+        await client.aclose()
@@ -1,10 +1,16 @@
-from sqlalchemy import select
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 from app.celery_app import celery_app
+from app.core.config import settings
 from app.core.database import get_engine, get_session_factory
 from app.core.logging import get_logger
+from app.core.metrics import ANALYSIS_PHASE_SECONDS, ANALYSIS_SECONDS
 from app.models.raw_signal import RawSignal
 from app.services.summarizer import summarize_signals
 from app.services.analyzer import generate_trace_report
+from app.services.incident_version import bump_incidents_version
 
 logger = get_logger(__name__)
 
@@ -13,16 +19,20 @@ logger = get_logger(__name__)
 def analyze_trace(self, trace_id: str):
     # ... (unchanged task wrapper) ...
     import asyncio
+    import time
     
     logger.info(f"Starting analysis for trace_id: {trace_id}")
+    start = time.perf_counter()
     
     try:
         # Run async logic in sync Celery task
         result = asyncio.run(_analyze_trace_async(trace_id))
+        ANALYSIS_SECONDS.labels(result["status"]).observe(time.perf_counter() - start)
         logger.info(f"Analysis complete for trace_id: {trace_id}")
         return result
         
     except Exception as exc:
+        ANALYSIS_SECONDS.labels("error").observe(time.perf_counter() - start)
         logger.error(f"Analysis failed for trace_id {trace_id}: {exc}", exc_info=True)
         # Don't retry - let it fail permanently to avoid duplicate analysis
         raise
@@ -36,12 +46,16 @@ async def _analyze_trace_async(trace_id: str) -> dict:
     AsyncSessionLocal = get_session_factory(engine)
     
     try:
-        # 1. Fetch signals from DB
         # 1. Fetch signals from DB
         async with AsyncSessionLocal() as db:
-            query = select(RawSignal).where(RawSignal.trace_id == trace_id).order_by(RawSignal.timestamp)
-            result = await db.execute(query)
-            signals = result.scalars().all()
+            query = select(RawSignal).where(RawSignal.trace_id == trace_id)
+            if settings.ANALYSIS_SIGNAL_LOOKBACK_HOURS > 0:
+                since = datetime.now(timezone.utc) - timedelta(hours=settings.ANALYSIS_SIGNAL_LOOKBACK_HOURS)
+                query = query.where(RawSignal.timestamp >= since)
+            query = query.order_by(RawSignal.timestamp)
+            with ANALYSIS_PHASE_SECONDS.labels("fetch").time():
+                result = await db.execute(query)
+                signals = result.scalars().all()
         
             if not signals:
                 logger.warning(f"No signals found for trace_id: {trace_id}")
@@ -51,16 +65,20 @@ async def _analyze_trace_async(trace_id: str) -> dict:
             logger.info(f"Found {len(signals)} signals for trace_id: {trace_id}")
             
             # 2. Summarize signals
-            summarized = summarize_signals(signals)
+            with ANALYSIS_PHASE_SECONDS.labels("summarize").time():
+                summarized = summarize_signals(signals)
             summarized["trace_id"] = trace_id
             
             logger.info(f"Summarized to {summarized['summarized_count']} signals")
             
             # 3. Run AI analysis
-            report = generate_trace_report(summarized)
+            with ANALYSIS_PHASE_SECONDS.labels("llm").time():
+                report = generate_trace_report(summarized)
             
             # 4. Save to DB
             import re
+            import time
+            persist_start = time.perf_counter()
             from app.models.incident import Incident, AnalysisResult, IncidentStatus, IncidentSeverity
             
             # Simple parsing logic for Confidence and Severity
@@ -78,32 +96,33 @@ async def _analyze_trace_async(trace_id: str) -> dict:
             # Determine affected services from signals
             affected_services_list = list(set(s.service_name for s in signals if s.service_name))
             
-            # Check for existing incident
-            stmt = select(Incident).where(Incident.trace_id == trace_id)
-            existing_incident = (await db.execute(stmt)).scalar_one_or_none()
-            
-            incident_id = None
-            if existing_incident:
-                logger.info(f"Updating existing incident for trace_id: {trace_id}")
-                existing_incident.error_count = len(signals)
-                # Update services if new ones appeared
-                existing_incident.affected_services = list(set(existing_incident.affected_services + affected_services_list))
-                # Update severity to AI-determined value
-                existing_incident.severity = severity
-                incident_id = existing_incident.id
-            else:
-                logger.info(f"Creating new incident for trace_id: {trace_id}")
-                new_incident = Incident(
-                    trace_id=trace_id,
-                    status=IncidentStatus.OPEN,
-                    severity=severity,
-                    affected_services=affected_services_list,
-                    error_count=len(signals)
-                )
-                db.add(new_incident)
-                await db.flush()
-                incident_id = new_incident.id
-                
+            # Create the incident or update its analysis fields in one
+            # statement. error_count belongs to ingestion, which increments it
+            # atomically per stored signal; the signals read here are limited
+            # by the lookback window, so they only ever raise it.
+            stmt = insert(Incident).values(
+                id=uuid.uuid4(),
+                trace_id=trace_id,
+                status=IncidentStatus.OPEN,
+                severity=severity,
+                affected_services=sorted(affected_services_list),
+                error_count=len(signals),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Incident.trace_id],
+                set_={
+                    "error_count": func.greatest(func.coalesce(Incident.error_count, 0), stmt.excluded.error_count),
+                    "affected_services": literal_column(
+                        "ARRAY(SELECT DISTINCT unnest("
+                        "incidents.affected_services || excluded.affected_services))"
+                    ),
+                    # AI-determined severity replaces the ingest-time estimate
+                    "severity": stmt.excluded.severity,
+                },
+            ).returning(Incident.id)
+            incident_id = (await db.execute(stmt)).scalar_one()
+            logger.info(f"Upserted incident {incident_id} for trace_id: {trace_id}")
+
             # Create Analysis Result
             analysis_entry = AnalysisResult(
                 incident_id=incident_id,
@@ -114,6 +133,8 @@ async def _analyze_trace_async(trace_id: str) -> dict:
             )
             db.add(analysis_entry)
             await db.commit()
+            await bump_incidents_version()
+            ANALYSIS_PHASE_SECONDS.labels("persist").observe(time.perf_counter() - persist_start)
             
             logger.info(f"Saved analysis result for incident_id: {incident_id}")
             